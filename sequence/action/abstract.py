@@ -23,7 +23,13 @@ import __builtin__
 
 
 # Imports from constants
-from sequence.common.constant import LOGGER
+from sequence.common.constant import EVT
+from sequence.common import event
+from sequence.common.table import open_table, TableError
+from sequence.common.expression import Expression, ExpressionError
+from sequence.common.expression import is_expression
+from sequence.core.observer import notify
+from sequence.core.eventlog import EVENT_RING
 from sequence import action as action_package
 from sequence.action import user as user_action_package
 
@@ -105,28 +111,44 @@ def process_module(module_name, with_parameters=True):
 
 
 # Create action definition
-def create_action(xml_block):
+def create_action(xml_block, iteration=None, tick=None):
     """
     Create an action from an xml block
+    The iteration and tick default to the block properties.
     """
     # Get data
     name = xml_block.block_id
     module_name = xml_block.properties.module
-    iteration = xml_block.properties.iteration
-    tick = xml_block.properties.tick
+    if iteration is None:
+        iteration = xml_block.properties.iteration
+    if tick is None:
+        tick = xml_block.properties.tick
     # Process the module
     action_class, default_parameters = process_module(module_name)
     if default_parameters:
         action_class.set_default_parameters(default_parameters)
     parameters = cast_parameters(xml_block, default_parameters)
+    # Open the parameter table (one row per iteration)
+    table = None
+    if getattr(xml_block.properties, 'table', None):
+        try:
+            table = open_table(xml_block.properties.table, default_parameters)
+        except (TableError, EnvironmentError) as exc:
+            msg = u"Action '{}' has an invalid table: {}"
+            raise ActionCreationError(msg.format(name, exc))
+        iteration = len(table)
     # Create action
     action = action_class(name, module_name, iteration, tick, parameters)
+    if table is not None:
+        action.set_table(table)
     return action
 
 
 def cast_parameters(xml_block, default_parameters):
     """
     Cast parameters of an xml block with the default parameters
+    The values containing ${...} expressions are compiled, they are
+    evaluated and cast before each execution.
     """
     result = ODict(default_parameters)
     for name, value in xml_block.parameters.items():
@@ -134,22 +156,23 @@ def cast_parameters(xml_block, default_parameters):
                 msg = "Action '{}' has no parameters called '{}'"
                 msg = msg.format(xml_block.block_id, name)
                 raise ActionCreationError(msg)
+            if isinstance(value, Expression):
+                result[name] = value
+                continue
+            if is_expression(value):
+                try:
+                    result[name] = Expression(value)
+                except ExpressionError as exc:
+                    msg = u"Action '{}' has an invalid parameter '{}': {}"
+                    msg = msg.format(xml_block.block_id, name, exc)
+                    raise ActionCreationError(msg)
+                continue
             try:
-                if isinstance(default_parameters[name], bool) and \
-                   isinstance(value, basestring):
-                    if value.lower() in ["true", "1"]:
-                        cast_value = True
-                    elif value.lower() in ["false", "0"]:
-                        cast_value = False
-                    else:
-                        raise Exception()
-                else:
-                    cast_value = type(default_parameters[name])(value)
+                result[name] = cast_value(value, default_parameters[name])
             except:
                 msg = "Error while casting parameters '{}' of action '{}'"
                 msg = msg.format(name, xml_block.block_id)
                 raise ActionCreationError(msg)
-            result[name] = cast_value
     # Save values
     xml_block.parameters = ODict(result)
     # Cast Enum to string
@@ -159,6 +182,19 @@ def cast_parameters(xml_block, default_parameters):
     return result
 
 
+def cast_value(value, default):
+    """
+    Cast a value to the type of the default value of a parameter
+    """
+    if isinstance(default, bool) and isinstance(value, basestring):
+        if value.lower() in ["true", "1"]:
+            return True
+        if value.lower() in ["false", "0"]:
+            return False
+        raise ValueError('{} is not a valid bool'.format(value))
+    return type(default)(value)
+
+
 def parse_value(value, vtype):
     """
     Return a value for two strings (value and type)
@@ -239,6 +275,14 @@ class AbstractAction(object):
 
     _default_parameters = {}
 
+    # Set to True for the actions without side effects, so that their
+    # result is reused for the same parameters during cache_ttl seconds
+    cacheable = False
+    cache_ttl = 60.0
+
+    # Maximum number of iterations given to run_batch at once
+    batch_size = 1000
+
     @classmethod
     def set_default_parameters(cls, params):
         """
@@ -255,49 +299,256 @@ class AbstractAction(object):
                 raise ActionCreationError(msg)
             setattr(cls, name, value)
 
+    @classmethod
+    def uses_blackboard(cls):
+        """
+        Class method returning True if the methods of the action refer to
+        the blackboard (publish, consume or blackboard)
+        """
+        names = set(['publish', 'consume', 'blackboard'])
+        for klass in cls.__mro__:
+            if klass is AbstractAction:
+                return False
+            for value in vars(klass).values():
+                value = getattr(value, '__func__', value)
+                code = getattr(value, '__code__', None)
+                if code is not None and names.intersection(code.co_names):
+                    return True
+        return False
+
     @property
     def interrupted(self):
         return self._stop_thread and self._stop_thread.is_set()
 
+    @property
+    def blackboard(self):
+        """ Blackboard shared by the actions of the execution """
+        return self._stop_thread.main_thread.blackboard
+
     def __init__(self, name, module, iteration, tick, parameters):
         """
         Initialize action
         """
         # Set properties
-        self._log_dict = None
-        self._stop_thread = None
         self._name = name
         self._module = module
         self._iteration = iteration
         self._tick = tick
         self._parameters = parameters
-        # Set flags
+        self._setup_flag = False
+        # Setup and Teardown are only logged if they are overridden
+        cls = type(self)
+        self._log_setup = \
+            cls.setup.__func__ is not AbstractAction.setup.__func__
+        self._log_teardown = \
+            cls.teardown.__func__ is not AbstractAction.teardown.__func__
+        self._persistent = False
+        self._predicate = False
+        self._table = None
+        self._expressions = [(key, value) for key, value in parameters.items()
+                             if isinstance(value, Expression)]
+        self._values = None
+        # Set flags and parameters
+        self.reset()
+
+    def reset(self):
+        """
+        Restore the flags and the parameters before a new run
+        (the resources opened by Setup are kept)
+        """
+        self._log_dict = None
+        self._stop_thread = None
+        self._observers = None
+        self._publications = []
         self._valid_pre_run_flag = False
         self._valid_run_count = 0
-        # Set parameters
-        for name, value in parameters.items():
+        self._warm_pre_run_flag = None
+        for name, value in self._parameters.items():
+            setattr(self, name, value)
+
+    def get_key(self):
+        """
+        Return a hashable identifying the module and the cast parameters
+        """
+        return (self._module, self._iteration, self._tick,
+                tuple(self._parameters.items()),
+                self._table is not None and self._table.path)
+
+    def get_cache_key(self):
+        """
+        Return a hashable identifying the module and the parameters,
+        including the values of the evaluated expressions
+        """
+        return self.get_key(), self._values
+
+    def is_equivalent(self, action):
+        """
+        Return True if another action has the same module and parameters
+        """
+        return self.get_key() == action.get_key()
+
+    def skip(self):
+        """
+        Discard the warm-up of an execution which has been skipped
+        (the result was in the cache)
+        """
+        self._warm_pre_run_flag = None
+        if not self._persistent:
+            self.close()
+
+    def evaluate(self, scope, log_dict):
+        """
+        Set the parameters given by expressions, evaluated in the scope
+        of the calling macros
+        Return False if an expression cannot be evaluated.
+        """
+        if not self._expressions:
+            return True
+        self._log_dict = log_dict
+        values = []
+        for name, expression in self._expressions:
+            try:
+                value = cast_value(expression.evaluate(scope),
+                                   self._default_parameters[name])
+            except ExpressionError as exc:
+                self.error(u"Parameter '{}': {}".format(name, exc))
+                return False
+            except Exception as exc:
+                msg = u"Parameter '{}': cannot cast the value of '{}': {!r}"
+                self.error(msg.format(name, expression, exc))
+                return False
+            if isinstance(value, BaseEnum):
+                value = unicode(value)
+            setattr(self, name, value)
+            values.append(value)
+        # Reopen the resources of Setup if the values changed
+        values = tuple(values)
+        if self._values is not None and values != self._values:
+            self.close()
+        self._values = values
+        return True
+
+    def set_table(self, table):
+        """
+        Set the table giving the parameters of each iteration
+        """
+        self._table = table
+
+    def set_row(self, index):
+        """
+        Set the parameters given by a row of the table
+        """
+        for name, value in self._table.get_row(index):
+            value = cast_value(value, self._parameters[name])
+            if isinstance(value, BaseEnum):
+                value = unicode(value)
             setattr(self, name, value)
 
+    def set_persistent(self, persistent):
+        """
+        Keep the resources opened by Setup after the execution
+        (the Teardown method is then called by close)
+        """
+        self._persistent = persistent
+
+    def set_predicate(self, predicate):
+        """
+        Use the action as the predicate of a control block
+        (returning False is then a normal result)
+        """
+        self._predicate = predicate
+
+    def report_false(self, msg):
+        """
+        Log a False result, as a warning unless the action is a predicate
+        """
+        if self._predicate:
+            self.info(msg)
+        else:
+            self.warning(msg)
+
+    def open(self):
+        """
+        Run Setup if it has not been run yet
+        Return False if Setup failed.
+        """
+        if self._setup_flag:
+            return True
+        try:
+            if self._log_setup:
+                self.debug('Setup')
+            self.setup()
+        except Exception as exc:
+            self.error('Setup failed:')
+            self.error(repr(exc))
+            return False
+        self._setup_flag = True
+        return True
+
+    def close(self):
+        """
+        Run Teardown if Setup has been run
+        """
+        if not self._setup_flag:
+            return
+        self._setup_flag = False
+        try:
+            if self._log_teardown:
+                self.debug('Teardown')
+            self.teardown()
+        except Exception as exc:
+            self.error('Teardown failed:')
+            self.error(repr(exc))
+
     def execute(self, stop_thread, log_dict):
         """
         Execute action and log it with the stop mecanism and logging dictionary
         """
+        try:
+            return self.execute_steps(stop_thread, log_dict)
+        finally:
+            # Keep the resources of the persistent actions
+            if not self._persistent:
+                self.close()
+
+    def execute_steps(self, stop_thread, log_dict):
+        """
+        Run the PreRun, Run and PostRun steps of the action
+        """
         self._log_dict = log_dict
         self._stop_thread = stop_thread
+        self._observers = stop_thread.main_thread.observers
+        # Reset flags (the action can be executed several times)
+        self._valid_pre_run_flag = False
+        self._valid_run_count = 0
+        # Keep the publications of a PreRun done at warm-up
+        if self._warm_pre_run_flag is None:
+            self._publications = []
         # Stop thread activated case
         if self._stop_thread.is_set():
             self.warning('The stop mecanism has been activated before Pre_run')
             return False
-        # Try PreRun
-        try:
-            self.info('PreRun')
-            self._valid_pre_run_flag = self.pre_run()
-        except Exception as exc:
-            self.error('PreRun failed:')
-            self.error(repr(exc))
+        # Use the PreRun result of the warm-up
+        if self._warm_pre_run_flag is not None:
+            self.info('PreRun (done at warm-up)')
+            self._valid_pre_run_flag = self._warm_pre_run_flag
+            self._warm_pre_run_flag = None
+        # Try PreRun (once the session-scoped resources are opened)
+        elif self.open():
+            if self._observers:
+                self.notify_phase(EVT.PHASE_START, 'PreRun')
+            try:
+                self.info('PreRun')
+                self._valid_pre_run_flag = self.pre_run()
+            except Exception as exc:
+                self.error('PreRun failed:')
+                self.error(repr(exc))
+            if self._observers:
+                self.notify_phase(EVT.PHASE_END, 'PreRun',
+                                  bool(self._valid_pre_run_flag))
         # Warning if PreRun returned False
         if not self._valid_pre_run_flag:
-            self.warning('PreRun returned False')
+            self.report_false('PreRun returned False')
         # Stop thread activated case
         elif self.interrupted:
             self.warning('The stop mecanism has been activated during PreRun')
@@ -308,50 +559,152 @@ class AbstractAction(object):
                 self.info('Run')
             else:
                 self.info('Run ({} iterations)'.format(self._iteration))
-            # Run Loop
-            for i in range(self._iteration):
-                # Try Run
-                try:
-                    run_result = self.run()
-                except Exception as exc:
-                    self.error('Run failed on execution {}:'.format(i+1))
-                    self.error(repr(exc))
-                    break
-                # Break if Run returned False
-                if not run_result:
-                    msg = 'Run returned False on execution {}'.format(i+1)
-                    self.warning(msg)
-                    break
-                # Break if stop thread activated
-                if self.interrupted and i != self._iteration-1:
-                    msg = 'The stop mecanism has been activated during Run'
-                    msg += ' (execution {})'.format(i+1)
-                    self.warning(msg)
-                    break
-                # Sleep
-                self._valid_run_count += 1
-                sleep(self._tick)
-                # Break if stop thread activated
-                if self.interrupted and i != self._iteration-1:
-                    msg = 'The stop mecanism has been activated during Run'
-                    msg += ' (tick {})'.format(i+1)
-                    self.warning(msg)
-                    break
+            if self._observers:
+                self.notify_phase(EVT.PHASE_START, 'Run')
+            # Run Loop (by batches if there is no tick between iterations
+            # and no parameter table)
+            if not self._tick and self._table is None and self.has_run_batch():
+                self.run_batches()
+            else:
+                self.run_iterations()
+            if self._observers:
+                self.notify_phase(EVT.PHASE_END, 'Run',
+                                  self._valid_run_count == self._iteration)
         # Try Post run
+        if self._observers:
+            self.notify_phase(EVT.PHASE_START, 'PostRun')
         try:
             self.info('PostRun')
             result = self.post_run()
         except Exception as exc:
             self.error('PostRun failed:')
             self.error(repr(exc))
+            if self._observers:
+                self.notify_phase(EVT.PHASE_END, 'PostRun', False)
             return False
+        if self._observers:
+            self.notify_phase(EVT.PHASE_END, 'PostRun', bool(result))
         # Error if PostRun returned False
         if not result:
-            self.warning('PostRun returned False')
+            self.report_false('PostRun returned False')
         # Return result
         return result
 
+    def notify_phase(self, kind, phase, result=None):
+        """
+        Send a phase event to the observers of the execution
+        """
+        notify(self._observers, self._log_dict, kind, phase, result)
+
+    def run_iterations(self):
+        """
+        Call Run once per iteration, with a tick between the iterations
+        """
+        for i in xrange(self._iteration):
+            # Try Run (with the parameters of the table row)
+            try:
+                if self._table is not None:
+                    self.set_row(i)
+                run_result = self.run()
+            except Exception as exc:
+                self.error('Run failed on execution {}:'.format(i+1))
+                self.error(repr(exc))
+                return
+            # Break if Run returned False
+            if not run_result:
+                msg = 'Run returned False on execution {}'.format(i+1)
+                self.report_false(msg)
+                return
+            # Break if stop thread activated
+            if self.interrupted and i != self._iteration-1:
+                msg = 'The stop mecanism has been activated during Run'
+                msg += ' (execution {})'.format(i+1)
+                self.warning(msg)
+                return
+            # Sleep
+            self._valid_run_count += 1
+            sleep(self._tick)
+            # Break if stop thread activated
+            if self.interrupted and i != self._iteration-1:
+                msg = 'The stop mecanism has been activated during Run'
+                msg += ' (tick {})'.format(i+1)
+                self.warning(msg)
+                return
+
+    def has_run_batch(self):
+        """
+        Return True if the action overrides the RunBatch method
+        """
+        return getattr(type(self).run_batch, 'im_func', None) \
+            is not AbstractAction.run_batch.im_func
+
+    def run_batches(self):
+        """
+        Call RunBatch with up to batch_size iterations at once,
+        checking the stop mecanism between the batches
+        """
+        while self._valid_run_count < self._iteration:
+            count = min(self.batch_size,
+                        self._iteration - self._valid_run_count)
+            first = self._valid_run_count + 1
+            # Try RunBatch
+            try:
+                done = max(0, min(count, int(self.run_batch(count))))
+            except Exception as exc:
+                msg = 'Run failed on executions {} to {}:'
+                self.error(msg.format(first, first+count-1))
+                self.error(repr(exc))
+                return
+            self._valid_run_count += done
+            # Break if an iteration failed
+            if done < count:
+                msg = 'Run returned False on execution {}'
+                self.report_false(msg.format(self._valid_run_count+1))
+                return
+            # Break if stop thread activated
+            if self.interrupted and self._valid_run_count != self._iteration:
+                msg = 'The stop mecanism has been activated during Run'
+                msg += ' (execution {})'.format(self._valid_run_count)
+                self.warning(msg)
+                return
+
+    def warm_up(self, log_dict):
+        """
+        Run PreRun ahead of the execution, to establish the connections
+        before the action is reached
+        The next execution uses the result instead of running PreRun.
+        The actions with expressions are skipped: their parameters are
+        only known when the execution is reached.
+        """
+        if self._expressions:
+            return True
+        self._log_dict = log_dict
+        if not self.open():
+            self._warm_pre_run_flag = False
+            return False
+        try:
+            self.info('PreRun (warm-up)')
+            self._warm_pre_run_flag = bool(self.pre_run())
+        except Exception as exc:
+            self.error('PreRun failed during warm-up:')
+            self.error(repr(exc))
+            self._warm_pre_run_flag = False
+        return self._warm_pre_run_flag
+
     # Methods to override
+    def setup(self):
+        """
+        Open the resources kept across the runs of a session
+        (called once before the first PreRun)
+        """
+        pass
+
+    def teardown(self):
+        """
+        Release the resources opened by setup
+        """
+        pass
+
     def pre_run(self):
         """ Pre-run execution """
         return True
@@ -360,10 +713,57 @@ class AbstractAction(object):
         """ Run execution """
         return True
 
+    def run_batch(self, count):
+        """
+        Run several iterations at once (used instead of Run when there is
+        no tick between the iterations)
+        Return the number of successful iterations: the iteration
+        following them is considered failed.
+        """
+        for i in xrange(count):
+            if not self.run():
+                return i
+        return count
+
     def post_run(self):
         """ Post-run execution """
         return self.all_ok()
 
+    # Data channel methods
+    def publish(self, name, value):
+        """
+        Publish a value on a channel shared with the other actions
+        The value is passed by reference and should not be modified.
+        """
+        self.blackboard.publish(name, value)
+        # Replayed when the result is reused from the cache
+        if self.cacheable:
+            self._publications.append((name, value))
+
+    def get_publications(self):
+        """
+        Return the (name, value) publications of the last execution
+        (only recorded for the cacheable actions)
+        """
+        return list(self._publications)
+
+    def consume(self, name, timeout=None):
+        """
+        Return the value of a channel shared with the other actions,
+        waiting for its first publication if required
+        Raise an error on timeout or if the execution is stopped.
+        """
+        return self.blackboard.consume(name, timeout, self._stop_thread)
+
+    # Named event methods
+    def set_event(self, name):
+        """ Set a named event, waking up the trigger blocks waiting for it """
+        event.set_event(name)
+
+    def clear_event(self, name):
+        """ Clear a named event """
+        event.clear_event(name)
+
     # Test methods
     def all_ok(self):
         """ Return True if everything went good """
@@ -376,23 +776,23 @@ class AbstractAction(object):
     # Logging methods
     def debug(self, msg):
         """ Logging method with debug level """
-        LOGGER.debug(msg, extra=self._log_dict)
+        EVENT_RING.debug(msg, self._log_dict)
 
     def info(self, msg):
         """ Logging method with info level """
-        LOGGER.info(msg, extra=self._log_dict)
+        EVENT_RING.info(msg, self._log_dict)
 
     def warning(self, msg):
         """ Logging method with warning level """
-        LOGGER.warning(msg, extra=self._log_dict)
+        EVENT_RING.warning(msg, self._log_dict)
 
     def error(self, msg):
         """ Logging method with error level """
-        LOGGER.error(msg, extra=self._log_dict)
+        EVENT_RING.error(msg, self._log_dict)
 
     def critical(self, msg):
         """ Logging method with critical level """
-        LOGGER.critical(msg, extra=self._log_dict)
+        EVENT_RING.critical(msg, self._log_dict)
 
 
 # Action Creation Error class definition
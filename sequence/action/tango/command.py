@@ -18,6 +18,15 @@ timeout : 15.0 : float
 
 class CommandeTango(AbstractAction):
 
+    def setup(self):
+        # Connect to the device once for all the runs of a session
+        try:
+            self.device = PyTango.DeviceProxy(self.device_name)
+        except:
+            msg = u"Device {} not defined in the database".format(self.device_name)
+            self.error(msg)
+            raise
+
     def pre_run(self):
         if self.arg_enabled:
             # Test le paramètre 'arg_type'
@@ -57,7 +66,6 @@ class CommandeTango(AbstractAction):
             self.error(msg)
             return False
         # Test le paramètre 'device_name'
-        self.device = PyTango.DeviceProxy(self.device_name)
         if self.start_state != "ANY" and self.device.State() != self.start_state:
             msg = u"L'état du device server doit être l'état de départ"
             self.error(msg)
@@ -17,14 +17,17 @@ class WaitTangoAttr(AbstractAction):
     Used to wait for a Tango Attribute to reach a value 
     """
 
-    def pre_run(self):
-        # Test le paramètre 'device_name'
+    def setup(self):
+        # Connect to the device once for all the runs of a session
         try:
             self.device = PyTango.DeviceProxy(self.device_name)
         except:
             msg = u"Device {} not defined in the database".format(self.device_name)
             self.error(msg)
-            return False
+            raise
+
+    def pre_run(self):
+        # Test le paramètre 'device_name'
         try:
             self.device.ping()
         except:
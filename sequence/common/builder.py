@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+
+""" Module for building sequences without XML files """
+
+#-------------------------------------------------------------------------------
+# Name:        SequenceBuilder
+# Purpose:     Build XMLSequence objects in memory
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+from collections import OrderedDict
+from sequence.common.constant import XBM, XSA, BPL
+from sequence.common.parser import (XMLSequence, XMLBlock, BlockProperties,
+                                    SequenceSynthaxError, assert_valid_id)
+
+
+# Property names
+PROPERTY_NAMES = {attr: name
+                  for name, attr in BlockProperties.ATTR_DICT.items()}
+
+
+# Sequence builder class definition
+class SequenceBuilder():
+    """
+    Class to describe a sequence in python and build the corresponding
+    XMLSequence, as if it had been parsed from a file
+
+    The blocks are declared with their properties as keyword arguments
+    (module, iteration, time, ...) and linked in their execution order::
+
+        builder = SequenceBuilder(u"Main")
+        sub = builder.subsequence(u"Sub")
+        sub.link(sub.begin(), sub.action(u"Print", u"PrintAction"), sub.end())
+        builder.link(builder.begin(), builder.macro(u"Macro", sub),
+                     builder.end())
+        engine.load_sequence(builder.build())
+
+    The build applies the checks of the parser, creates the actions and
+    returns a sequence ready for the engine. The XML file is only written
+    on export.
+    """
+
+    def __init__(self, sequence_id):
+        """
+        Initialize the builder
+
+        :param sequence_id: str -- ID of the sequence
+        """
+        assert_valid_id(sequence_id, XSA.SEQUENCEID)
+        self.sequence_id = sequence_id
+        self.blocks = OrderedDict()
+        self.links = []
+        self.subsequences = OrderedDict()
+        self.backup = None
+        self.backup_policy = BPL.EAGER
+        self.resources = OrderedDict()
+        self.extra = {}
+
+    @classmethod
+    def from_sequence(cls, xml_sequence):
+        """
+        Return a builder holding a copy of a parsed or edited sequence
+
+        The properties, parameters and links are copied, so the sequence
+        can be modified afterwards without changing the builder nor the
+        sequences it builds.
+        """
+        builder = cls(xml_sequence.sequence_id)
+        builder.extra.update(xml_sequence.extra)
+        builder.resources.update(xml_sequence.resources)
+        for block in xml_sequence.blocks:
+            if block.block_id in builder.blocks:
+                msg = u"More than one block with the ID : {}"
+                raise SequenceSynthaxError(msg.format(block.block_id))
+            attrib = block.properties.get_dictionnary()
+            builder.blocks[block.block_id] = (block.block_type, attrib,
+                                              dict(block.parameters),
+                                              dict(block.extra))
+            for out in block.outputs or []:
+                out_id = out.block_id if isinstance(out, XMLBlock) else out
+                builder.links.append((block.block_id, out_id))
+        for subsequence in xml_sequence.subsequences:
+            builder.add_subsequence(cls.from_sequence(subsequence))
+        if xml_sequence.backup is not None:
+            backup = builder.subsequences.get(xml_sequence.backup.sequence_id)
+            if backup is None:
+                backup = cls.from_sequence(xml_sequence.backup)
+            builder.set_backup(backup, xml_sequence.backup_policy)
+        return builder
+
+    #### Blocks ####
+
+    def add_block(self, block_id, block_type, parameters=None, extra=None,
+                  **properties):
+        """
+        Declare a block and return its ID
+
+        :param block_id: str -- ID of the block
+        :param block_type: str -- type of the block (XBM)
+        :param parameters: dict -- parameters of the action
+        :param extra: dict -- extra attributes of the block
+        :param properties: properties of the block, by attribute name
+                           (a SequenceBuilder can be given as sequence_id)
+        """
+        if block_type not in XMLSequence.VALID_BLOCKS:
+            msg = u"Unknow block type : {}".format(block_type)
+            raise SequenceSynthaxError(msg)
+        if block_id in self.blocks:
+            msg = u"More than one block with the ID : {}".format(block_id)
+            raise SequenceSynthaxError(msg)
+        attrib = {}
+        for attr, value in properties.items():
+            if attr not in PROPERTY_NAMES:
+                msg = u"Unknow property : {}".format(attr)
+                raise SequenceSynthaxError(msg)
+            if isinstance(value, SequenceBuilder):
+                value = self.add_subsequence(value).sequence_id
+            attrib[PROPERTY_NAMES[attr]] = value
+        self.blocks[block_id] = (block_type, attrib, dict(parameters or {}),
+                                 dict(extra or {}))
+        return block_id
+
+    def begin(self, block_id=u"Begin"):
+        """ Declare the Begin block """
+        return self.add_block(block_id, XBM.BEGIN)
+
+    def end(self, block_id=u"End"):
+        """ Declare an End block """
+        return self.add_block(block_id, XBM.END)
+
+    def action(self, block_id, module, parameters=None, **properties):
+        """ Declare an Action block running an action module """
+        return self.add_block(block_id, XBM.ACTION, parameters,
+                              module=module, **properties)
+
+    def macro(self, block_id, subsequence, parameters=None, **properties):
+        """ Declare a Macro block running a subsequence (or its ID) """
+        return self.add_block(block_id, XBM.MACRO, parameters,
+                              sequence_id=subsequence, **properties)
+
+    def wait(self, block_id, time, **properties):
+        """ Declare a Wait block (absolute time by default) """
+        return self.add_block(block_id, XBM.WAIT, time=time, **properties)
+
+    def branch(self, block_id):
+        """ Declare a Branch block """
+        return self.add_block(block_id, XBM.BRANCH)
+
+    def time_init(self, block_id=u"TimeInit"):
+        """ Declare a TimeInit block """
+        return self.add_block(block_id, XBM.TIMEINIT)
+
+    def link(self, *block_ids):
+        """
+        Link the blocks in the given order
+        """
+        for block_id in block_ids:
+            if block_id not in self.blocks:
+                msg = u"There is no block called {}".format(block_id)
+                raise SequenceSynthaxError(msg)
+        self.links.extend(zip(block_ids, block_ids[1:]))
+
+    #### Sequence ####
+
+    def subsequence(self, sequence_id):
+        """
+        Create and return the builder of a new subsequence
+        """
+        return self.add_subsequence(SequenceBuilder(sequence_id))
+
+    def add_subsequence(self, builder):
+        """
+        Add the builder of a subsequence and return it
+        """
+        current = self.subsequences.get(builder.sequence_id)
+        if current is not None and current is not builder:
+            msg = u"More than one subsequence with the ID : {}"
+            raise SequenceSynthaxError(msg.format(builder.sequence_id))
+        self.subsequences[builder.sequence_id] = builder
+        return builder
+
+    def set_backup(self, builder, policy=BPL.EAGER):
+        """
+        Set a subsequence as the backup of the sequence
+        """
+        if policy not in (BPL.EAGER, BPL.LAZY, BPL.PREWARM):
+            msg = u"Invalid backup policy : {}".format(policy)
+            raise SequenceSynthaxError(msg)
+        self.backup = self.add_subsequence(builder)
+        self.backup_policy = policy
+
+    def add_resource(self, name, capacity=1, rate=0.0):
+        """
+        Declare a resource shared by the blocks of the sequence
+        """
+        if capacity < 1 or rate < 0:
+            msg = u"Invalid capacity or rate for the resource {}"
+            raise SequenceSynthaxError(msg.format(name))
+        self.resources[name] = int(capacity), float(rate)
+
+    #### Build ####
+
+    def build(self, max_depth=None, execution=True):
+        """
+        Build and return the XMLSequence
+
+        :param max_depth: int -- maximum depth for sequence creation
+        :param execution: bool -- check the sequence and create the actions
+        """
+        max_depth = max_depth if max_depth else float('inf')
+        return self.create_sequence(0, 0, execution, max_depth)
+
+    def export(self, file_name, pretty=True, defaults=True):
+        """
+        Export the sequence to an XML file
+
+        :param defaults: bool -- export the block properties with their
+                                 default value (False for shorter files)
+        """
+        self.build(execution=False).xml_export(file_name, pretty, defaults)
+
+    def create_sequence(self, depth, level, execution, max_depth):
+        """
+        Create the XMLSequence with the same steps as the parser
+        """
+        sequence = XMLSequence(self.sequence_id, depth=depth, level=level,
+                               execution=execution)
+        sequence.extra.update(self.extra)
+        sequence.resources.update(self.resources)
+        # Index the links by block
+        inputs = {}
+        outputs = {}
+        for first, second in self.links:
+            outputs.setdefault(first, []).append(second)
+            inputs.setdefault(second, []).append(first)
+        # Create blocks
+        for block_id, (block_type, attrib, parameters, extra) in \
+                self.blocks.items():
+            block = XMLBlock(block_id, block_type)
+            properties = block.properties.cast_dictionary(attrib)
+            block.properties.set_dictionary(properties)
+            block.parameters = dict(parameters)
+            block.extra = dict(extra)
+            if block_id in inputs:
+                block.inputs = inputs[block_id]
+            if block_id in outputs:
+                block.outputs = outputs[block_id]
+            block.check_type()
+            sequence.blocks.append(block)
+        # Create links
+        sequence.create_links()
+        # Check sequence
+        if execution:
+            sequence.check_sequence()
+        # Create actions
+        sequence.create_actions()
+        # Create subsequences
+        self.create_subsequences(sequence, execution, max_depth)
+        # Create backup
+        if self.backup is not None and depth < max_depth:
+            sequence.backup_policy = self.backup_policy
+            backup = next((sub for sub in sequence.subsequences
+                           if sub.sequence_id == self.backup.sequence_id
+                           and not execution), None)
+            if backup is None:
+                backup = self.backup.create_sequence(depth+1, level+1,
+                                                     execution, max_depth)
+                sequence.subsequences.append(backup)
+            sequence.backup = backup
+        return sequence
+
+    def create_subsequences(self, sequence, execution, max_depth):
+        """
+        Create the subsequences used by the blocks
+        (and the other ones if the sequence is not for execution)
+        """
+        created = {}
+        def get_subsequence(sub_id):
+            if sub_id in created:
+                return created[sub_id]
+            if sub_id in self.subsequences:
+                builder = self.subsequences[sub_id]
+                subsequence = builder.create_sequence(0, sequence.level+1,
+                                                      execution, max_depth)
+                sequence.subsequences.append(subsequence)
+                created[sub_id] = subsequence
+                return subsequence
+            if sub_id != BlockProperties.DEFAULT_VALUES[XSA.SEQUENCEID]:
+                msg = u"There is no subsequence called {}"
+                raise SequenceSynthaxError(msg.format(sub_id))
+        for block in sequence.blocks:
+            if block.block_type in (XBM.MACRO, XBM.LOOP, XBM.IF):
+                block.subsequence = get_subsequence(
+                    block.properties.sequence_id)
+            if block.block_type == XBM.IF:
+                block.else_subsequence = get_subsequence(
+                    block.properties.else_sequence_id)
+        if not execution:
+            for sub_id in self.subsequences:
+                get_subsequence(sub_id)
@@ -45,7 +45,9 @@ XSM = enum(SEQUENCE = 'Sequence',
            INPUTOUTPUT = 'InputOutput',
            PROPERTIES = 'Properties',
            PARAMETERS = 'Parameters',
-           EXTRA = 'Extra')
+           EXTRA = 'Extra',
+           RESOURCES = 'Resources',
+           RESOURCE = 'Resource')
 
 
 # XML BLOCK MARKUPS:
@@ -55,7 +57,10 @@ XBM = enum(BEGIN = 'Begin',
            MACRO = 'Macro',
            BRANCH = 'Branch',
            TIMEINIT = 'TimeInit',
-           WAIT = 'Wait')
+           WAIT = 'Wait',
+           LOOP = 'Loop',
+           IF = 'If',
+           TRIGGER = 'Trigger')
 
 
 # XML SEQUENCE ATTRIBUTES:
@@ -67,10 +72,41 @@ XSA = enum(SEQUENCEID = 'SequenceID',
            ITERATION = 'Iteration',
            TICK = 'Tick',
            TIME = 'Time',
-           ABSOLUTE = 'Absolute')
+           ABSOLUTE = 'Absolute',
+           REMOTE = 'Remote',
+           ELSE = 'Else',
+           RESOURCE = 'Resource',
+           NAME = 'Name',
+           CAPACITY = 'Capacity',
+           RATE = 'Rate',
+           SOURCE = 'Source',
+           TIMEOUT = 'Timeout',
+           POLICY = 'Policy',
+           TABLE = 'Table',
+           MODE = 'Mode',
+           CONCURRENCY = 'Concurrency')
+
+# BACKUP POLICIES:
+BPL = enum(EAGER = 'eager',      # Built at load
+           LAZY = 'lazy',        # Built when required
+           PREWARM = 'prewarm')  # Built and pre-run at load
+
+# MACRO MODES:
+MMD = enum(SEQUENTIAL = 'sequential',  # One iteration after the other
+           PARALLEL = 'parallel',      # Concurrent iterations
+           PIPELINED = 'pipelined')    # Concurrent iterations entering
+                                       # each block in order
 
 # BLOCK EXECUTION STATE:
 BES = enum(OK = 'OK',
            KO = 'KO',
            BG = 'BG',  # BeGin
            NP = 'NP',) # Not Passed
+
+# EXECUTION EVENT KINDS:
+EVT = enum(BLOCK_START = 'block_start',
+           BLOCK_END = 'block_end',
+           PHASE_START = 'phase_start',  # PreRun, Run or PostRun
+           PHASE_END = 'phase_end',
+           STOP = 'stop',
+           BACKUP_START = 'backup_start')
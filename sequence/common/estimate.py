@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+""" Module for static sequence duration estimation """
+
+#-------------------------------------------------------------------------------
+# Name:        SequenceEstimate
+# Purpose:     Estimate the duration and the critical path of a sequence
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+import json
+import math
+from sequence.common.constant import XBM
+from sequence.common.table import get_row_count
+
+
+# Block estimate class definition
+class BlockEstimate():
+    """
+    Class to store the estimated timing of a block
+    """
+
+    def __init__(self, block, start, finish, ref, previous=None, detail=None):
+        """
+        Initialize the block estimate
+
+        :param block: XMLBlock -- block concerned by the estimate
+        :param start: float -- estimated start time of the block
+        :param finish: float -- estimated finish time of the block
+        :param ref: float -- time reference when the block finishes
+        :param previous: BlockEstimate -- input bounding the start time
+        :param detail: SequenceEstimate -- estimate of a subsequence
+        """
+        self.block = block
+        self.start = start
+        self.finish = finish
+        self.ref = ref
+        self.previous = previous
+        self.detail = detail
+
+    @property
+    def duration(self):
+        """ Estimated duration of the block """
+        return self.finish - self.start
+
+
+# Sequence estimate class definition
+class SequenceEstimate():
+    """
+    Class to store the estimated duration of a sequence
+    and its critical path
+    """
+
+    def __init__(self, xml_sequence, blocks, last):
+        """
+        Initialize the sequence estimate
+
+        :param xml_sequence: XMLSequence -- sequence concerned by the estimate
+        :param blocks: dict -- block estimates indexed by block ID
+        :param last: BlockEstimate -- End block finishing last
+        """
+        self.xml_sequence = xml_sequence
+        self.blocks = blocks
+        self.duration = last.finish if last else 0.0
+        self.critical_path = []
+        while last:
+            self.critical_path.insert(0, last)
+            last = last.previous
+
+    def format(self, indent=0):
+        """
+        Return a list of lines describing the critical path
+        """
+        lines = []
+        for estimate in self.critical_path:
+            line = u"{}{:16} | {:8} | {:>10} | {:>10}"
+            line = line.format(u" "*indent, estimate.block.block_id,
+                               estimate.block.block_type,
+                               format_duration(estimate.start),
+                               format_duration(estimate.finish))
+            lines.append(line)
+            if estimate.detail and estimate.duration:
+                lines.extend(estimate.detail.format(indent+2))
+        return lines
+
+
+# Sequence estimator class definition
+class SequenceEstimator():
+    """
+    Class to compute sequence estimates from XML sequences
+    """
+
+    def __init__(self, history=None):
+        """
+        Initialize the estimator
+
+        :param history: dict -- historical durations (in seconds)
+                                of one action iteration, indexed by module
+        """
+        self.history = history or {}
+        self.cache = {}
+
+    def estimate(self, xml_sequence):
+        """
+        Return the estimate of an XML sequence
+        """
+        # Use cached estimate if available (subsequences can be shared)
+        if id(xml_sequence) in self.cache:
+            return self.cache[id(xml_sequence)]
+        # Get begin block
+        begin = xml_sequence.begin
+        if begin is None:
+            begin = next((block for block in xml_sequence.blocks
+                          if block.block_type == XBM.BEGIN), None)
+        # Visit blocks in topological order
+        estimates = {}
+        last = None
+        for block in topological_order(begin):
+            estimate = self.estimate_block(block, estimates)
+            estimates[block.block_id] = estimate
+            if block.block_type == XBM.END and \
+               (last is None or estimate.finish > last.finish):
+                last = estimate
+        # Save and return
+        result = SequenceEstimate(xml_sequence, estimates, last)
+        self.cache[id(xml_sequence)] = result
+        return result
+
+    def estimate_block(self, block, estimates):
+        """
+        Return the estimate of a block, given the estimates of its inputs
+        """
+        # Get start time and time reference from the inputs
+        start, ref, previous = 0.0, 0.0, None
+        for inp in block.inputs or []:
+            estimate = estimates[inp.block_id]
+            ref = max(ref, estimate.ref)
+            if previous is None or estimate.finish > start:
+                start, previous = estimate.finish, estimate
+        # Compute the finish time
+        finish, detail = start, None
+        properties = block.properties
+        if block.block_type == XBM.TIMEINIT:
+            ref = start
+        elif block.block_type == XBM.WAIT:
+            if properties.absolute:
+                finish = max(start, ref + properties.time)
+            else:
+                finish = start + properties.time
+        elif block.block_type == XBM.ACTION:
+            run_time = self.history.get(properties.module, 0.0)
+            # A parameter table gives the number of iterations
+            iteration = properties.iteration
+            if properties.table:
+                iteration = get_row_count(properties.table) or iteration
+            finish = start + repeat(iteration, run_time + properties.tick)
+        elif block.block_type == XBM.MACRO:
+            sub_time = 0.0
+            if block.subsequence:
+                detail = self.estimate(block.subsequence)
+                sub_time = detail.duration
+            finish = start + repeat(properties.iteration,
+                                    sub_time + properties.tick)
+        elif block.block_type == XBM.LOOP:
+            sub_time = self.history.get(properties.module, 0.0)
+            if block.subsequence:
+                detail = self.estimate(block.subsequence)
+                sub_time += detail.duration
+            # A loop without iteration count runs until it is stopped
+            if properties.iteration:
+                finish = start + repeat(properties.iteration,
+                                        sub_time + properties.tick)
+            else:
+                finish = float('inf')
+        elif block.block_type == XBM.IF:
+            # Assume the longest branch is chosen
+            sub_time = 0.0
+            for subsequence in (block.subsequence, block.else_subsequence):
+                if subsequence:
+                    sub_estimate = self.estimate(subsequence)
+                    if detail is None or sub_estimate.duration > sub_time:
+                        detail, sub_time = sub_estimate, sub_estimate.duration
+            finish = start + self.history.get(properties.module, 0.0) + sub_time
+        return BlockEstimate(block, start, finish, ref, previous, detail)
+
+
+# Repeated duration
+def repeat(iteration, duration):
+    """
+    Return the duration of several iterations
+    (no iteration lasts 0s, even if the duration is unbounded)
+    """
+    if not iteration:
+        return 0.0
+    return iteration * duration
+
+
+# Topological order
+def topological_order(begin):
+    """
+    Return the blocks reachable from the begin block in topological order
+    """
+    if begin is None:
+        return []
+    # Count the reachable inputs of each block
+    counts = {}
+    stack = [begin]
+    while stack:
+        block = stack.pop()
+        for out in block.outputs or []:
+            if out.block_id not in counts:
+                stack.append(out)
+            counts[out.block_id] = counts.get(out.block_id, 0) + 1
+    # Visit a block once all its inputs have been visited
+    result = []
+    stack = [begin]
+    while stack:
+        block = stack.pop()
+        result.append(block)
+        for out in block.outputs or []:
+            counts[out.block_id] -= 1
+            if not counts[out.block_id]:
+                stack.append(out)
+    return result
+
+
+# Estimate a sequence
+def estimate_sequence(xml_sequence, history=None):
+    """
+    Estimate the duration and the critical path of an XML sequence
+
+    :param xml_sequence: XMLSequence -- the sequence to estimate
+    :param history: dict -- historical durations of one action iteration
+    :return: the SequenceEstimate corresponding
+    """
+    return SequenceEstimator(history).estimate(xml_sequence)
+
+
+# Load an history file
+def load_history(file_name):
+    """
+    Load historical per-module durations from a JSON file
+
+    The file contains a dictionary mapping module names to the duration
+    (in seconds) of one iteration of the corresponding action.
+    """
+    with open(file_name) as history_file:
+        history = json.load(history_file)
+    return {unicode(key): float(value) for key, value in history.items()}
+
+
+# Format a duration
+def format_duration(seconds):
+    """
+    Return a human readable string for a duration in seconds
+    """
+    if math.isnan(seconds):
+        return u"unknown"
+    if math.isinf(seconds):
+        return u"unbounded"
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    if hours:
+        return u"{}h{:02}m{:04.1f}s".format(hours, minutes, seconds)
+    if minutes:
+        return u"{}m{:04.1f}s".format(minutes, seconds)
+    return u"{:.1f}s".format(seconds)
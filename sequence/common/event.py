@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+
+""" Module for waiting on external triggers """
+
+#-------------------------------------------------------------------------------
+# Name:        Event
+# Purpose:     Named events and file descriptor based triggers
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+import os
+import sys
+import errno
+import socket
+import math
+import select
+import ctypes
+import ctypes.util
+from threading import Lock
+from timeit import default_timer as time
+
+# Imports from sequence
+from sequence.common.protocol import parse_address
+
+
+# Trigger schemes
+SCHEMES = ['event', 'file', 'fifo', 'socket']
+
+# Polling period when inotify is not available
+POLLING_PERIOD = 0.1
+
+
+# File descriptor event class definition
+class FdEvent():
+    """
+    Event backed by a pipe, so that it can be waited with poll
+    """
+
+    def __init__(self):
+        """
+        Initialize the event
+        """
+        self.lock = Lock()
+        self.flag = False
+        self.read_fd, self.write_fd = os.pipe()
+
+    def __del__(self):
+        """
+        Close the pipe
+        """
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """
+        Close the pipe (the event cannot be used anymore)
+        """
+        with self.lock:
+            if self.read_fd is not None:
+                os.close(self.read_fd)
+                os.close(self.write_fd)
+                self.read_fd = self.write_fd = None
+
+    def fileno(self):
+        """
+        Return the file descriptor readable while the event is set
+        """
+        return self.read_fd
+
+    def is_set(self):
+        """
+        Return True if the event is set
+        """
+        return self.flag
+
+    def set(self):
+        """
+        Set the event
+        """
+        with self.lock:
+            if not self.flag:
+                self.flag = True
+                os.write(self.write_fd, b'x')
+
+    def clear(self):
+        """
+        Clear the event
+        """
+        with self.lock:
+            if self.flag:
+                self.flag = False
+                os.read(self.read_fd, 1)
+
+    def wait(self, timeout=None):
+        """
+        Wait for the event, return True if it is set
+        """
+        wait_readable([self], timeout)
+        return self.flag
+
+
+# Named events
+_EVENTS = {}
+_EVENTS_LOCK = Lock()
+
+def get_event(name):
+    """
+    Return the named event shared by all the sequences of the process
+    """
+    with _EVENTS_LOCK:
+        if name not in _EVENTS:
+            _EVENTS[name] = FdEvent()
+        return _EVENTS[name]
+
+def set_event(name):
+    """
+    Set a named event
+    """
+    get_event(name).set()
+
+def clear_event(name):
+    """
+    Clear a named event
+    """
+    get_event(name).clear()
+
+
+# Wait for readable objects
+def wait_readable(objects, timeout=None):
+    """
+    Wait for one of the objects to be readable, return the readable ones
+    (an empty list if the timeout expired)
+
+    The objects are file descriptors or have a fileno method. They are
+    waited with poll, which is not limited to FD_SETSIZE descriptors
+    (select is only used on the platforms without poll).
+    """
+    if not hasattr(select, 'poll'):
+        return wait_readable_select(objects, timeout)
+    poller = select.poll()
+    objects_by_fd = {}
+    for obj in objects:
+        fd = obj if isinstance(obj, (int, long)) else obj.fileno()
+        objects_by_fd[fd] = obj
+        poller.register(fd, select.POLLIN | select.POLLPRI)
+    if timeout is not None:
+        timeout = int(math.ceil(timeout * 1000))
+    while True:
+        try:
+            events = poller.poll(timeout)
+        except select.error as exc:
+            if exc.args[0] != errno.EINTR:
+                raise
+        else:
+            return [objects_by_fd[fd] for fd, _ in events]
+
+
+def wait_readable_select(objects, timeout=None):
+    """
+    Wait for one of the objects to be readable with select
+    """
+    while True:
+        try:
+            return select.select(objects, [], [], timeout)[0]
+        except select.error as exc:
+            if exc.args[0] != errno.EINTR:
+                raise
+
+
+# Parse a trigger source
+def parse_source(source):
+    """
+    Parse a trigger source string, return a (scheme, target) tuple
+
+    The valid sources are "event:name", "file:path", "fifo:path" and
+    "socket:address" (host:port or unix socket path).
+    """
+    scheme, sep, target = source.partition(':')
+    if not sep or scheme not in SCHEMES or not target:
+        msg = u"Invalid trigger source '{}' (expected {}:...)"
+        raise TriggerError(msg.format(source, "|".join(SCHEMES)))
+    return scheme, target
+
+
+# Inotify
+class Inotify():
+    """
+    Minimal inotify binding to watch the creation of files in a directory
+    """
+
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.inotify_init1
+    except (OSError, AttributeError):
+        libc = None
+
+    def __init__(self, directory):
+        """
+        Watch a directory, raise OSError if not available
+        """
+        if self.libc is None:
+            raise OSError(errno.ENOSYS, "inotify not available")
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_CREATE | self.IN_MOVED_TO | self.IN_CLOSE_WRITE
+        if isinstance(directory, unicode):
+            directory = directory.encode(sys.getfilesystemencoding())
+        if self.libc.inotify_add_watch(self.fd, directory, mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, "inotify_add_watch failed")
+
+    def fileno(self):
+        """
+        Return the inotify file descriptor
+        """
+        return self.fd
+
+    def drain(self):
+        """
+        Discard the pending notifications
+        """
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except OSError as exc:
+            if exc.errno != errno.EAGAIN:
+                raise
+
+    def close(self):
+        """
+        Close the inotify file descriptor
+        """
+        os.close(self.fd)
+
+
+# Trigger class definition
+class Trigger():
+    """
+    Class to wait for an external trigger without polling
+
+    The wait is interrupted when the stop event is set.
+    """
+
+    def __init__(self, source, stop_event):
+        """
+        Initialize the trigger
+
+        :param source: str -- trigger source (see parse_source)
+        :param stop_event: FdEvent -- event interrupting the wait
+        """
+        self.source = source
+        self.scheme, self.target = parse_source(source)
+        self.stop_event = stop_event
+
+    def wait(self, timeout=None):
+        """
+        Wait for the trigger
+        Return True if triggered, False on timeout or stop
+        """
+        deadline = None if timeout is None else time() + timeout
+        method = getattr(self, 'wait_' + self.scheme)
+        return method(deadline)
+
+    def remaining(self, deadline):
+        """
+        Return the remaining time before the deadline (None if no deadline)
+        """
+        if deadline is None:
+            return None
+        return max(0, deadline - time())
+
+    def wait_objects(self, objects, deadline):
+        """
+        Wait for one of the objects or the stop event
+        Return True if one of the objects is readable
+        """
+        readable = wait_readable(objects + [self.stop_event],
+                                 self.remaining(deadline))
+        return bool(readable) and not self.stop_event.is_set()
+
+    def wait_event(self, deadline):
+        """
+        Wait for a named event
+        """
+        return self.wait_objects([get_event(self.target)], deadline)
+
+    def wait_file(self, deadline):
+        """
+        Wait for a file to exist
+        """
+        try:
+            watcher = Inotify(os.path.dirname(self.target) or os.curdir)
+        except OSError:
+            watcher = None
+        try:
+            while not os.path.exists(self.target):
+                if self.stop_event.is_set():
+                    return False
+                if deadline is not None and time() >= deadline:
+                    return False
+                if watcher:
+                    wait_readable([watcher, self.stop_event],
+                                  self.remaining(deadline))
+                    watcher.drain()
+                else:
+                    timeout = POLLING_PERIOD
+                    if deadline is not None:
+                        timeout = min(timeout, self.remaining(deadline))
+                    wait_readable([self.stop_event], timeout)
+            return not self.stop_event.is_set()
+        finally:
+            if watcher:
+                watcher.close()
+
+    def wait_fifo(self, deadline):
+        """
+        Wait for data in a named pipe
+        """
+        fd = os.open(self.target, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            return self.wait_objects([fd], deadline)
+        finally:
+            os.close(fd)
+
+    def wait_socket(self, deadline):
+        """
+        Listen to a socket address and wait for a connection
+        """
+        family, address = parse_address(self.target)
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.remove(address)
+        server = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server.bind(address)
+            server.listen(1)
+            if not self.wait_objects([server], deadline):
+                return False
+            server.accept()[0].close()
+            return True
+        finally:
+            server.close()
+            if family == socket.AF_UNIX and os.path.exists(address):
+                os.remove(address)
+
+
+# Trigger Error class definition
+class TriggerError(StandardError):
+    """ Custom error raised when a trigger is invalid """
+
+    def __init__(self, strerror):
+        StandardError.__init__(self, strerror)
+        self.strerror = strerror
+
+    def __str__(self):
+        return self.strerror
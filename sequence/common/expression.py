@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+""" Module for the expressions of the macro arguments """
+
+#-------------------------------------------------------------------------------
+# Name:        Expression
+# Purpose:     Compile and evaluate the ${...} expressions of the parameters
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+import re
+import ast
+import math
+
+
+# Expression pattern
+PATTERN = re.compile(r'\$\{(.*?)\}')
+
+# Names available in the expressions
+GLOBALS = {'__builtins__': {'abs': abs, 'min': min, 'max': max,
+                            'round': round, 'int': int, 'float': float,
+                            'bool': bool, 'len': len,
+                            'True': True, 'False': False, 'None': None}}
+GLOBALS.update((name, getattr(math, name))
+               for name in dir(math) if not name.startswith('_'))
+
+
+# Test a value
+def is_expression(value):
+    """
+    Return True if the value is a string containing an expression
+    """
+    return isinstance(value, basestring) and PATTERN.search(value) is not None
+
+
+# Compile the arguments of a macro
+def compile_arguments(parameters):
+    """
+    Return a dictionary of the macro arguments: the expressions are
+    compiled, the other values are python literals or strings
+    """
+    arguments = {}
+    for name, value in parameters.items():
+        if isinstance(value, Expression):
+            arguments[name] = value
+        elif is_expression(value):
+            arguments[name] = Expression(value)
+        else:
+            try:
+                arguments[name] = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                arguments[name] = value
+    return arguments
+
+
+# Scope class definition
+class Scope(dict):
+    """
+    Dictionary of the names available in a subsequence, falling back
+    on the scope of the calling sequence
+    """
+
+    def __init__(self, parent=None, *args, **kwargs):
+        """
+        Initialize the scope with its parent
+        """
+        dict.__init__(self, *args, **kwargs)
+        self.parent = parent
+
+    def __missing__(self, name):
+        """
+        Look for a name in the parent scopes
+        """
+        if self.parent is None:
+            raise KeyError(name)
+        return self.parent[name]
+
+    def flatten(self):
+        """
+        Return the names of the scope and of its parents in a dictionary
+        """
+        names = self.parent.flatten() if self.parent is not None else {}
+        names.update(self)
+        return names
+
+
+# Expression class definition
+class Expression(object):
+    """
+    Class for a parameter value containing ${...} expressions
+
+    The expressions are compiled once. A value made of a single expression
+    keeps the type of its result, the other values are formatted as
+    strings. The original text is kept for the export.
+    """
+
+    def __init__(self, text):
+        """
+        Compile the expressions of the text
+        """
+        self.text = text
+        self.parts = []
+        try:
+            match = PATTERN.match(text)
+            if match and match.end() == len(text):
+                self.code = self.compile(match.group(1))
+            else:
+                self.code = None
+                position = 0
+                for match in PATTERN.finditer(text):
+                    self.parts.append(text[position:match.start()])
+                    self.parts.append(self.compile(match.group(1)))
+                    position = match.end()
+                self.parts.append(text[position:])
+        except SyntaxError as exc:
+            msg = u"Invalid expression '{}': {}"
+            raise ExpressionError(msg.format(text, exc.msg))
+
+    @staticmethod
+    def compile(source):
+        """
+        Compile the source of an expression
+        """
+        return compile(source.strip(), '<expression>', 'eval')
+
+    def evaluate(self, scope):
+        """
+        Evaluate the expression in a scope
+        """
+        try:
+            if self.code is not None:
+                return eval(self.code, GLOBALS, scope)
+            return u''.join(part if isinstance(part, basestring)
+                            else unicode(eval(part, GLOBALS, scope))
+                            for part in self.parts)
+        except Exception as exc:
+            msg = u"Cannot evaluate '{}': {!r}"
+            raise ExpressionError(msg.format(self.text, exc))
+
+    def __eq__(self, other):
+        return isinstance(other, Expression) and self.text == other.text
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.text)
+
+    def __unicode__(self):
+        return unicode(self.text)
+
+    def __str__(self):
+        return self.text.encode('utf-8')
+
+    def __repr__(self):
+        return u"Expression({!r})".format(self.text)
+
+
+# Expression Error class definition
+class ExpressionError(StandardError):
+    """ Custom error raised when an expression is invalid """
+
+    def __init__(self, strerror):
+        StandardError.__init__(self, strerror)
+        self.strerror = strerror
+
+    def __str__(self):
+        return self.strerror
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+""" Module for simplifying a sequence before its execution """
+
+#-------------------------------------------------------------------------------
+# Name:        SequenceOptimizer
+# Purpose:     Inline, merge and prune the blocks of a parsed sequence
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+from collections import OrderedDict
+from copy import deepcopy
+from sequence.common.constant import XBM, LOGGER
+from sequence.common.parser import XMLBlock
+from sequence.common.expression import Expression, is_expression
+
+
+# Kinds of changes
+INLINE = u'inline'
+MERGE = u'merge'
+BRANCH = u'branch'
+PRUNE = u'prune'
+
+
+# Optimize a sequence
+def optimize_sequence(xml_sequence):
+    """
+    Simplify a parsed sequence and its subsequences in place
+    Return an OptimizationReport listing the changes.
+
+    - The macros running a single action once are replaced by the action
+    - The consecutive waits of the same kind are merged
+    - The branches with one input and one output are removed
+    - The blocks which cannot be reached from the Begin block are removed
+
+    The timing of the execution is kept: only the blocks without a
+    duration of their own are removed. The paths of the inlined actions
+    in the logs and the journal are the ones of their macro.
+    """
+    report = OptimizationReport(xml_sequence)
+    SequenceOptimizer(report).optimize(xml_sequence)
+    return report
+
+
+# Sequence optimizer class definition
+class SequenceOptimizer():
+    """
+    Class to apply the optimization passes to a sequence tree
+    """
+
+    def __init__(self, report):
+        """
+        Initialize the optimizer
+
+        :param report: OptimizationReport -- report of the changes
+        """
+        self.report = report
+        self.visited = set()
+
+    def optimize(self, xml_sequence):
+        """
+        Optimize the subsequences first, then the sequence itself
+        (an inlined subsequence can make its caller inlinable)
+        """
+        if id(xml_sequence) in self.visited:
+            return
+        self.visited.add(id(xml_sequence))
+        for subsequence in list(xml_sequence.subsequences):
+            self.optimize(subsequence)
+        self.inline_macros(xml_sequence)
+        self.remove_branches(xml_sequence)
+        self.merge_waits(xml_sequence)
+        self.prune_blocks(xml_sequence)
+
+    def inline_macros(self, xml_sequence):
+        """
+        Replace the macros running a single action once by the action
+        """
+        inlined = set()
+        for index, block in enumerate(xml_sequence.blocks):
+            action_block = self.get_inlinable_action(block)
+            if action_block is None:
+                continue
+            new_block = XMLBlock(block.block_id, XBM.ACTION)
+            new_block.properties = deepcopy(action_block.properties)
+            new_block.parameters = OrderedDict(action_block.parameters)
+            new_block.action = action_block.action
+            new_block.extra = dict(block.extra)
+            self.replace_block(xml_sequence, index, block, new_block)
+            inlined.add(block.subsequence)
+            msg = u"Macro '{}' replaced by its action '{}' ({})"
+            msg = msg.format(block.block_id, action_block.block_id,
+                             action_block.properties.module)
+            self.report.add(xml_sequence, INLINE, msg)
+        # Remove the subsequences which are not used anymore
+        for subsequence in inlined:
+            if subsequence is not xml_sequence.backup and \
+               not any(subsequence in (block.subsequence,
+                                       block.else_subsequence)
+                       for block in xml_sequence.blocks):
+                xml_sequence.subsequences.remove(subsequence)
+
+    def get_inlinable_action(self, block):
+        """
+        Return the action block of a macro which can be inlined, or None
+        """
+        subsequence = block.subsequence
+        if block.block_type != XBM.MACRO or subsequence is None:
+            return None
+        properties = block.properties
+        if properties.iteration != 1 or properties.tick or \
+           properties.remote or block.parameters:
+            return None
+        # The subsequence holds its own backup and resource declarations
+        if subsequence.backup is not None or subsequence.resources:
+            return None
+        # Begin -> Action -> End
+        begin = subsequence.begin
+        if begin is None or len(subsequence.blocks) != 3 or \
+           len(begin.outputs) != 1:
+            return None
+        action_block = begin.outputs[0]
+        if action_block.block_type != XBM.ACTION or \
+           len(action_block.outputs) != 1 or \
+           action_block.outputs[0].block_type != XBM.END:
+            return None
+        # The expressions are evaluated in the scope of the macro
+        if any(isinstance(value, Expression) or is_expression(value)
+               for value in action_block.parameters.values()):
+            return None
+        return action_block
+
+    def replace_block(self, xml_sequence, index, block, new_block):
+        """
+        Replace a block by another one with the same links
+        """
+        new_block.inputs = block.inputs
+        new_block.outputs = block.outputs
+        for inp in block.inputs:
+            inp.outputs[inp.outputs.index(block)] = new_block
+        for out in block.outputs:
+            out.inputs[out.inputs.index(block)] = new_block
+        xml_sequence.blocks[index] = new_block
+
+    def bypass_block(self, xml_sequence, block):
+        """
+        Remove a block with one input and one output, linking them together
+        Return False if they are already linked.
+        """
+        inp, out = block.inputs[0], block.outputs[0]
+        if out in inp.outputs:
+            return False
+        inp.outputs[inp.outputs.index(block)] = out
+        out.inputs[out.inputs.index(block)] = inp
+        xml_sequence.blocks.remove(block)
+        return True
+
+    def remove_branches(self, xml_sequence):
+        """
+        Remove the branches which neither start nor join threads
+        """
+        for block in list(xml_sequence.blocks):
+            if block.block_type == XBM.BRANCH and \
+               len(block.inputs) == 1 and len(block.outputs) == 1 and \
+               self.bypass_block(xml_sequence, block):
+                msg = u"Branch '{}' removed (one input and one output)"
+                self.report.add(xml_sequence, BRANCH,
+                                msg.format(block.block_id))
+
+    def merge_waits(self, xml_sequence):
+        """
+        Merge the consecutive waits: the relative times are added and
+        the absolute times are replaced by the latest one
+        """
+        for block in list(xml_sequence.blocks):
+            if block not in xml_sequence.blocks or \
+               block.block_type != XBM.WAIT:
+                continue
+            while len(block.outputs) == 1:
+                following = block.outputs[0]
+                if following.block_type != XBM.WAIT or \
+                   len(following.inputs) != 1 or \
+                   following.properties.absolute != block.properties.absolute:
+                    break
+                if not self.bypass_block(xml_sequence, following):
+                    break
+                if block.properties.absolute:
+                    block.properties.time = max(block.properties.time,
+                                                following.properties.time)
+                else:
+                    block.properties.time += following.properties.time
+                msg = u"Wait '{}' merged into '{}' ({}s)"
+                msg = msg.format(following.block_id, block.block_id,
+                                 block.properties.time)
+                self.report.add(xml_sequence, MERGE, msg)
+
+    def prune_blocks(self, xml_sequence):
+        """
+        Remove the blocks which cannot be reached from the Begin block
+        """
+        if xml_sequence.begin is None:
+            return
+        reached = set()
+        stack = [xml_sequence.begin]
+        while stack:
+            block = stack.pop()
+            if block in reached:
+                continue
+            reached.add(block)
+            stack.extend(block.outputs or [])
+        for block in list(xml_sequence.blocks):
+            if block in reached:
+                continue
+            xml_sequence.remove_block(block)
+            if block in xml_sequence.end:
+                xml_sequence.end.remove(block)
+            msg = u"Block '{}' removed (unreachable)"
+            self.report.add(xml_sequence, PRUNE, msg.format(block.block_id))
+
+
+# Optimization report class definition
+class OptimizationReport():
+    """
+    Class listing the changes made by the optimizer
+    """
+
+    def __init__(self, xml_sequence):
+        """
+        Initialize the report
+
+        :param xml_sequence: XMLSequence -- root of the optimized sequence
+        """
+        self.xml_sequence = xml_sequence
+        self.changes = []
+
+    def __len__(self):
+        return len(self.changes)
+
+    def add(self, xml_sequence, kind, msg):
+        """
+        Add a change made in a sequence
+        """
+        self.changes.append((xml_sequence.sequence_id, kind, msg))
+
+    def count(self, kind):
+        """
+        Return the number of changes of a kind
+        """
+        return sum(1 for _, change_kind, _ in self.changes
+                   if change_kind == kind)
+
+    def format(self):
+        """
+        Return a list of lines describing the changes
+        """
+        lines = [u"{} : {}".format(sequence_id, msg)
+                 for sequence_id, _, msg in self.changes]
+        summary = u"{} macros inlined, {} waits merged, {} branches removed,"
+        summary += u" {} blocks pruned"
+        lines.append(summary.format(self.count(INLINE), self.count(MERGE),
+                                    self.count(BRANCH), self.count(PRUNE)))
+        return lines
+
+    def log(self):
+        """
+        Log the changes with the sequence logger
+        """
+        log_dict = {'sequenceID': self.xml_sequence.sequence_id,
+                    'ID':         'Optimizer',
+                    'level':      self.xml_sequence.level,
+                    'type':       'OPTIMIZE'}
+        for line in self.format():
+            LOGGER.info(line, extra=log_dict)
@@ -22,7 +22,8 @@ import re
 
 
 # Import from packages
-from sequence.common.constant import XSM, XBM, XSA
+from sequence.common.constant import XSM, XBM, XSA, BPL, MMD
+from sequence.common.event import parse_source, TriggerError
 try: from sequence.action.abstract import create_action
 except: pass
 
@@ -54,10 +55,12 @@ class XMLSequence():
         self.blocks = []
         self.subsequences = []
         self.backup = None
+        self.backup_policy = BPL.EAGER
         self.begin = None
         self.end = []
         self.execution = execution
         self.extra = {}
+        self.resources = OrderedDict()
 
     def set_backup(self, backup):
         """
@@ -85,6 +88,8 @@ class XMLSequence():
                 nodes_dict[sub_node.tag] = sub_node
             elif sub_node.tag == XSM.EXTRA:
                 self.extra.update(sub_node.attrib)
+            elif sub_node.tag == XSM.RESOURCES:
+                self.parse_resources(sub_node)
             else :
                 msg = u"Unknow markup in sequence {}: {}"
                 msg = msg.format(self.sequence_id, sub_node.tag)
@@ -125,6 +130,32 @@ class XMLSequence():
 
 
 
+    def parse_resources(self, node):
+        """
+        Parse an xml node as a list of resource declarations
+        """
+        for sub_node in node:
+            if sub_node.tag != XSM.RESOURCE:
+                msg = u"Unknow markup in resources of sequence {}: {}"
+                msg = msg.format(self.sequence_id, sub_node.tag)
+                raise SequenceSynthaxError(msg)
+            if XSA.NAME not in sub_node.keys():
+                msg = u"A resource appears to have no Name attribute"
+                raise SequenceSynthaxError(msg)
+            name = sub_node.attrib[XSA.NAME]
+            try:
+                capacity = int(sub_node.attrib.get(XSA.CAPACITY, 1))
+                rate = float(sub_node.attrib.get(XSA.RATE, 0.0))
+            except ValueError:
+                msg = u"Invalid capacity or rate for the resource {}"
+                msg = msg.format(name)
+                raise SequenceSynthaxError(msg)
+            if capacity < 1 or rate < 0:
+                msg = u"Invalid capacity or rate for the resource {}"
+                msg = msg.format(name)
+                raise SequenceSynthaxError(msg)
+            self.resources[name] = capacity, rate
+
     def parse_subsequences(self, node):
         """
         Parse an xml node as list of subsequences
@@ -142,22 +173,28 @@ class XMLSequence():
                     subsequences_dict[sequence_id] = subsequence
         # Create useful subsequences
         sub_created = {}
+        def get_subsequence(sub_id):
+            if sub_id in subsequences_dict:
+                subsequence = XMLSequence(sub_id, level=self.level+1,
+                                          execution=self.execution)
+                sub = subsequences_dict.pop(sub_id)
+                subsequence.parse_sequence(sub)
+                self.subsequences.append(subsequence)
+                sub_created[sub_id] = subsequence
+                return subsequence
+            elif sub_id in sub_created:
+                return sub_created[sub_id]
+            elif sub_id != BlockProperties.DEFAULT_VALUES[XSA.SEQUENCEID]:
+                msg = u"There is no subsequence called {}"
+                msg = msg.format(sub_id)
+                raise SequenceSynthaxError(msg)
         for block in self.blocks:
-            if block.block_type == XBM.MACRO:
+            if block.block_type in (XBM.MACRO, XBM.LOOP, XBM.IF):
                 sub_id = block.properties.sequence_id
-                if sub_id in subsequences_dict:
-                    block.subsequence = XMLSequence(sub_id, level=self.level+1,
-                                                    execution=self.execution)
-                    sub = subsequences_dict.pop(sub_id)
-                    block.subsequence.parse_sequence(sub)
-                    self.subsequences.append(block.subsequence)
-                    sub_created[sub_id] = block.subsequence
-                elif sub_id in sub_created:
-                    block.subsequence = sub_created[sub_id]
-                elif sub_id != BlockProperties.DEFAULT_VALUES[XSA.SEQUENCEID]:
-                    msg = u"There is no subsequence called {}"
-                    msg = msg.format(sub_id)
-                    raise SequenceSynthaxError(msg)
+                block.subsequence = get_subsequence(sub_id)
+            if block.block_type == XBM.IF:
+                sub_id = block.properties.else_sequence_id
+                block.else_subsequence = get_subsequence(sub_id)
         # Create useless subsequences
         if not self.execution:
             for sub_id, xml in subsequences_dict.items():
@@ -185,6 +222,12 @@ class XMLSequence():
             msg = u"The markup '{}' appears to have no '{}' attribute"
             msg = msg.format(XSM.BACKUP, XSA.SEQUENCEID)
             raise SequenceSynthaxError(msg)
+        # Get the backup policy
+        policy = backup_node.attrib.get(XSA.POLICY, BPL.EAGER)
+        if policy not in (BPL.EAGER, BPL.LAZY, BPL.PREWARM):
+            msg = u"Invalid backup policy : {}".format(policy)
+            raise SequenceSynthaxError(msg)
+        self.backup_policy = policy
         # Test if there is subsequences to use
         if subsequence_node is None:
             msg = u"There is no subsequences to use for backup"
@@ -220,13 +263,15 @@ class XMLSequence():
         """
         Create links between blocks
         """
+        blocks = {}
+        for block in self.blocks:
+            blocks.setdefault(block.block_id, block)
         for first_block in self.blocks:
             if first_block.outputs:
                 for out in first_block.outputs:
                     try :
-                        second_block = next(b for b in self.blocks
-                                            if b.block_id == out)
-                    except StopIteration :
+                        second_block = blocks[out]
+                    except KeyError :
                         msg = u"The block {} references a non-existing block "
                         msg += "({})"
                         msg = msg.format(first_block.block_id, out)
@@ -246,7 +291,7 @@ class XMLSequence():
         Create actions (only for execution)
         """
         for block in self.blocks:
-            if block.block_type == XBM.ACTION:
+            if block.block_type == XBM.ACTION or block.has_predicate():
                 block.create_action()
 
     def check_sequence(self):
@@ -271,6 +316,31 @@ class XMLSequence():
         if count_end == 0 :
             msg = u"No End block"
             raise InvalidSequenceError(msg)
+        # Check conditional blocks
+        for block in self.blocks:
+            if block.block_type == XBM.IF and not block.has_predicate():
+                msg = u"The block '{}' has no predicate module"
+                msg = msg.format(block.block_id)
+                raise InvalidSequenceError(msg)
+        # Check macro modes
+        modes = [MMD.SEQUENTIAL, MMD.PARALLEL, MMD.PIPELINED]
+        for block in self.blocks:
+            if block.block_type == XBM.MACRO and \
+               (block.properties.mode not in modes or
+                block.properties.concurrency < 0):
+                msg = u"The block '{}' has an invalid mode or concurrency "
+                msg += u"(modes: {})"
+                msg = msg.format(block.block_id, u", ".join(modes))
+                raise InvalidSequenceError(msg)
+        # Check trigger blocks
+        for block in self.blocks:
+            if block.block_type == XBM.TRIGGER:
+                try:
+                    parse_source(block.properties.source)
+                except TriggerError as exc:
+                    msg = u"The block '{}' has an invalid source: {}"
+                    msg = msg.format(block.block_id, exc)
+                    raise InvalidSequenceError(msg)
         # Check for broken links
         for block in self.blocks:
             if block.outputs:
@@ -286,9 +356,7 @@ class XMLSequence():
                         msg = msg.format(block.block_id, inp)
                         raise InvalidSequenceError(msg)
         # Check for circular links
-        current  = self.begin
-        blocks = []
-        blocks = self.recursive_check(current, blocks)
+        blocks = self.check_links(self.begin)
         # Check for excluded blocks
         diff = len(self.blocks) - len(blocks)
         if diff != 0:
@@ -296,49 +364,79 @@ class XMLSequence():
             msg = msg.format(diff)
             raise InvalidSequenceError(msg)
 
-    def recursive_check(self, current, blocks):
-        if current in blocks:
-            msg = u"A circular link involves the block '{}'"
-            msg = msg.format(current.block_id)
-            raise InvalidSequenceError(msg)
-        blocks = list(blocks) + [current]
-        if current.outputs is None:
-            return blocks
-        return {block
-                    for outputs in current.outputs
-                        for block in self.recursive_check(outputs, blocks)}
-
-    def get_element(self):
+    def check_links(self, begin):
+        """
+        Return the set of blocks reached from a block, and raise an error
+        if a circular link is found (depth-first walk, each block and
+        each link is visited once)
+        """
+        reached = set([begin])
+        path = set([begin])
+        stack = [(begin, iter(begin.outputs or []))]
+        while stack:
+            current, outputs = stack[-1]
+            block = next(outputs, None)
+            if block is None:
+                path.discard(current)
+                stack.pop()
+            elif block in path:
+                msg = u"A circular link involves the block '{}'"
+                msg = msg.format(block.block_id)
+                raise InvalidSequenceError(msg)
+            elif block not in reached:
+                reached.add(block)
+                path.add(block)
+                stack.append((block, iter(block.outputs or [])))
+        return reached
+
+    def get_element(self, defaults=True):
         """
         Build and return the XML node corresponding to the sequence
+
+        :param defaults: bool -- export the block properties with their
+                                 default value
         """
         # Init block element
         attrib = {XSA.SEQUENCEID : self.sequence_id}
         sequence_element = ET.Element(XSM.SEQUENCE, attrib)
+        # Append resources element
+        if self.resources:
+            resources_element = ET.Element(XSM.RESOURCES)
+            for name, (capacity, rate) in self.resources.items():
+                attrib = {XSA.NAME: name,
+                          XSA.CAPACITY: unicode(capacity),
+                          XSA.RATE: unicode(rate)}
+                resources_element.append(ET.Element(XSM.RESOURCE, attrib))
+            sequence_element.append(resources_element)
         # Append blocks element
         blocks_element = ET.Element(XSM.BLOCKS)
         for block in self.blocks:
-            blocks_element.append(block.get_element())
+            blocks_element.append(block.get_element(defaults))
         sequence_element.append(blocks_element)
         # Append subsequences element
         if self.subsequences:
             subsequences_element = ET.Element(XSM.SUBSEQUENCES)
             for subsequence in self.subsequences:
-                subsequences_element.append(subsequence.get_element())
+                subsequences_element.append(
+                    subsequence.get_element(defaults))
             sequence_element.append(subsequences_element)
         # Append backup element
         if self.backup:
             attrib = {XSA.SEQUENCEID : self.backup.sequence_id}
+            if self.backup_policy != BPL.EAGER:
+                attrib[XSA.POLICY] = self.backup_policy
             sequence_element.append(ET.Element(XSM.BACKUP, attrib))
         # Return
         return sequence_element
 
-    def xml_export(self, filename, pretty=True):
+    def xml_export(self, filename, pretty=True, defaults=True):
         """
         Export XML Sequence to an XML file
+        (the properties with their default value are omitted if defaults
+        is False)
         """
         # Convert Element to ElementTree
-        sequence_element = ET.ElementTree(self.get_element())
+        sequence_element = ET.ElementTree(self.get_element(defaults))
         # Choose the target
         if pretty:
             target = StringIO()
@@ -383,7 +481,10 @@ class XMLBlock():
                  XBM.MACRO:         [1, 1, 1],
                  XBM.BRANCH:        [2, 2, 1],
                  XBM.TIMEINIT:      [1, 1, 0],
-                 XBM.WAIT:          [1, 1, 1]}
+                 XBM.WAIT:          [1, 1, 1],
+                 XBM.LOOP:          [1, 1, 1],
+                 XBM.IF:            [1, 1, 1],
+                 XBM.TRIGGER:       [1, 1, 1]}
 
     def __init__(self, block_id, block_type):
         """
@@ -401,6 +502,7 @@ class XMLBlock():
         if self.TEST_DICT[block_type][1]:
             self.outputs = []
         self.subsequence = None
+        self.else_subsequence = None
         self.properties = BlockProperties(block_type)
         self.parameters = {}
         self.action = None
@@ -458,7 +560,7 @@ class XMLBlock():
                 raise SequenceSynthaxError(msg)
         self.properties.check_type(self.block_type, self.block_id)
 
-    def get_element(self):
+    def get_element(self, defaults=True):
         """
         Build and return the XML node corresponding to the block
         """
@@ -477,7 +579,7 @@ class XMLBlock():
         # Build block element
         block_element.append(ET.Element(XSM.INPUTOUTPUT, io_attrib))
         if self.properties:
-            block_element.append(self.properties.get_element())
+            block_element.append(self.properties.get_element(defaults))
         if self.parameters:
             params = {key:unicode(value)
                           for key,value in self.parameters.iteritems()}
@@ -499,11 +601,24 @@ class XMLBlock():
         """
         return self.TEST_DICT[self.block_type][1] > 1
 
+    def has_predicate(self):
+        """
+        Return True if the block is a control block with a predicate action
+        """
+        return self.block_type in (XBM.LOOP, XBM.IF) and \
+               self.properties.module != \
+               BlockProperties.DEFAULT_VALUES[XSA.MODULE]
+
     def create_action(self):
         """
         Create action from Actions module
+        (predicate actions of control blocks run once per evaluation)
         """
-        self.action = create_action(self)
+        if self.block_type == XBM.ACTION:
+            self.action = create_action(self)
+        else:
+            self.action = create_action(self, iteration=1, tick=0.0)
+            self.action.set_predicate(True)
 
 
 # Block properties class definition
@@ -518,25 +633,44 @@ class BlockProperties():
                              (XSA.TICK,'tick'),
                              (XSA.TIME,'time'),
                              (XSA.ABSOLUTE,'absolute'),
-                             (XSA.SEQUENCEID,'sequence_id')])
+                             (XSA.SEQUENCEID,'sequence_id'),
+                             (XSA.REMOTE,'remote'),
+                             (XSA.ELSE,'else_sequence_id'),
+                             (XSA.RESOURCE,'resource'),
+                             (XSA.SOURCE,'source'),
+                             (XSA.TIMEOUT,'timeout'),
+                             (XSA.TABLE,'table'),
+                             (XSA.MODE,'mode'),
+                             (XSA.CONCURRENCY,'concurrency')])
 
     DEFAULT_VALUES = OrderedDict([(XSA.MODULE, u'EmptyModule'),
                                   (XSA.ITERATION, 1),
                                   (XSA.TICK, 0.0),
                                   (XSA.TIME, 1.0),
                                   (XSA.ABSOLUTE, True),
-                                  (XSA.SEQUENCEID,u'NoSubsequence')])
+                                  (XSA.SEQUENCEID,u'NoSubsequence'),
+                                  (XSA.REMOTE, False),
+                                  (XSA.ELSE,u'NoSubsequence'),
+                                  (XSA.RESOURCE,u''),
+                                  (XSA.SOURCE,u'event:trigger'),
+                                  (XSA.TIMEOUT,0.0),
+                                  (XSA.TABLE,u''),
+                                  (XSA.MODE,u'sequential'),
+                                  (XSA.CONCURRENCY,0)])
 
     # Test dictionnary for xml block validity
     # 0 is absent, 1 is present
-    # Module, Iteration, Tick ... :  M  I  T  T  A  S
-    TEST_DICT = {XBM.BEGIN:         [0, 0, 0, 0, 0, 0],
-                 XBM.END:           [0, 0, 0, 0, 0, 0],
-                 XBM.ACTION:        [1, 1, 1, 0, 0, 0],
-                 XBM.MACRO:         [0, 1, 1, 0, 0, 1],
-                 XBM.BRANCH:        [0, 0, 0, 0, 0, 0],
-                 XBM.TIMEINIT:      [0, 0, 0, 0, 0, 0],
-                 XBM.WAIT:          [0, 0, 0, 1, 1, 0]}
+    # Module, Iteration, Tick ... :  M  I  T  T  A  S  R  E  R  S  T  T  M  C
+    TEST_DICT = {XBM.BEGIN:         [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                 XBM.END:           [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                 XBM.ACTION:        [1, 1, 1, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0],
+                 XBM.MACRO:         [0, 1, 1, 0, 0, 1, 1, 0, 0, 0, 0, 0, 1, 1],
+                 XBM.BRANCH:        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                 XBM.TIMEINIT:      [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                 XBM.WAIT:          [0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                 XBM.LOOP:          [1, 1, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+                 XBM.IF:            [1, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0],
+                 XBM.TRIGGER:       [0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 0, 0]}
 
     def __init__(self, block_type):
         """
@@ -552,13 +686,22 @@ class BlockProperties():
         """
         Parse an xml node as block properties
         """
+        self.set_dictionary(self.cast_dictionary(node.attrib))
+
+    def cast_dictionary(self, attrib):
+        """
+        Cast a dictionary of XML attributes (strings or python values)
+        to the types of the properties and return it
+        """
         dictionary = {}
-        for name, value in node.attrib.items() :
+        for name, value in attrib.items() :
             if name in self.ATTR_DICT:
                 cast = type(self.DEFAULT_VALUES[name])
                 try:
                     if cast != bool:
                         dictionary[name] = cast(value)
+                    elif isinstance(value, bool):
+                        dictionary[name] = value
                     else:
                         if value.lower() in ["true","1"]:
                             dictionary[name] = True
@@ -573,7 +716,7 @@ class BlockProperties():
             else :
                 msg = u"Unknow property : {}".format(name)
                 raise SequenceSynthaxError(msg)
-        self.set_dictionary(dictionary)
+        return dictionary
 
     def set_dictionary(self, dictionary):
         """
@@ -586,12 +729,15 @@ class BlockProperties():
             setattr(self, self.ATTR_DICT[name], value)
         return boolean
 
-    def get_element(self):
+    def get_element(self, defaults=True):
         """
         Return XML element of the block properties
+        (without the properties with their default value if defaults is
+        False)
         """
         attrib = {name:unicode(value)
-                  for name, value in self.get_dictionnary().items()}
+                  for name, value in self.get_dictionnary().items()
+                  if defaults or value != self.DEFAULT_VALUES[name]}
         return ET.Element(XSM.PROPERTIES, attrib)
 
     def get_dictionnary(self):
@@ -611,7 +757,9 @@ class BlockProperties():
         """
         test_list = self.TEST_DICT[block_type]
         tab = [XSA.MODULE, XSA.ITERATION, XSA.TICK,
-               XSA.TIME, XSA.ABSOLUTE, XSA.SEQUENCEID]
+               XSA.TIME, XSA.ABSOLUTE, XSA.SEQUENCEID, XSA.REMOTE, XSA.ELSE,
+               XSA.RESOURCE, XSA.SOURCE, XSA.TIMEOUT, XSA.TABLE, XSA.MODE,
+               XSA.CONCURRENCY]
         for i, attr in enumerate(tab):
             if getattr(self, self.ATTR_DICT[attr]) and not test_list[i]:
                 msg = u"The block '{}' souldn't have a property '{}'"
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+""" Module for the communication between sequence processes """
+
+#-------------------------------------------------------------------------------
+# Name:        Protocol
+# Purpose:     Socket addresses, message framing and log record transport
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+import os
+import json
+import socket
+import logging
+import SocketServer
+from lxml import etree as ET
+
+
+# Log record attributes to transport
+RECORD_ATTRIBUTES = ['name', 'levelno', 'levelname', 'msg', 'created',
+                     'msecs', 'thread', 'threadName', 'sequenceID', 'ID',
+                     'level', 'type', 'tag']
+
+
+# Parse an address
+def parse_address(address):
+    """
+    Parse an address string
+
+    "host:port" is a TCP address, anything else is a Unix socket path.
+    Return a (family, address) tuple.
+    """
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and '/' not in host:
+        return socket.AF_INET, (host or 'localhost', int(port))
+    return socket.AF_UNIX, address
+
+
+# Create a server
+def create_server(address, handler_class, threading=False):
+    """
+    Create a socket server listening to an address string
+
+    :param address: str -- TCP ("host:port") or Unix socket address
+    :param handler_class: request handler class of the server
+    :param threading: bool -- handle each request in a new thread
+    """
+    family, address = parse_address(address)
+    if family == socket.AF_UNIX:
+        if os.path.exists(address):
+            os.remove(address)
+        if threading:
+            server_class = SocketServer.ThreadingUnixStreamServer
+        else:
+            server_class = SocketServer.UnixStreamServer
+    else:
+        if threading:
+            server_class = SocketServer.ThreadingTCPServer
+        else:
+            server_class = SocketServer.TCPServer
+
+    class SequenceServer(server_class):
+        allow_reuse_address = True
+        daemon_threads = True
+
+    return SequenceServer(address, handler_class)
+
+
+# Connect to an address
+def connect(address, timeout=None):
+    """
+    Connect to an address string and return the socket
+    """
+    family, address = parse_address(address)
+    if family == socket.AF_UNIX:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.settimeout(None)
+        return sock
+    sock = socket.create_connection(address, timeout)
+    sock.settimeout(None)
+    return sock
+
+
+# Message framing
+def send_message(wfile, message):
+    """
+    Send a message (a JSON serializable dictionary) as a single line
+    """
+    wfile.write(json.dumps(message) + '\n')
+    wfile.flush()
+
+
+def read_message(rfile):
+    """
+    Read a message, return None if the stream is closed
+    """
+    line = rfile.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+# Sequence transport
+def serialize_sequence(xml_sequence):
+    """
+    Serialize an XML sequence to send it to another process
+    """
+    return ET.tostring(xml_sequence.get_element(), encoding=unicode)
+
+
+# Log record transport
+def record_to_message(record):
+    """
+    Convert a log record from the execution logger into a message
+    """
+    message = {name: getattr(record, name, None)
+               for name in RECORD_ATTRIBUTES}
+    if message['msg'] is not None and \
+       not isinstance(message['msg'], basestring):
+        message['msg'] = unicode(message['msg'])
+    return {'type': 'log', 'record': message}
+
+
+def message_to_record(message):
+    """
+    Convert a message into a log record for the execution logger
+    """
+    return logging.makeLogRecord(message['record'])
+
+
+# Message handler class definition
+class MessageHandler(logging.Handler):
+    """
+    Log handler sending the execution log records as messages
+    """
+
+    def __init__(self, send, level=logging.NOTSET):
+        """
+        Initialize the handler with a function sending the messages
+        """
+        logging.Handler.__init__(self, level)
+        self.send = send
+
+    def emit(self, record):
+        """
+        Send the record as a message
+        """
+        try:
+            self.send(record_to_message(record))
+        except (IOError, socket.error):
+            pass
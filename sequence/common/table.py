@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+""" Module for reading the parameter tables of the actions """
+
+#-------------------------------------------------------------------------------
+# Name:        Table
+# Purpose:     Read parameter rows from memory-mapped CSV or NumPy files
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+import os
+import csv
+import mmap
+from array import array
+
+# Optional imports
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Open a table
+def open_table(path, names):
+    """
+    Open a parameter table according to its extension
+
+    :param path: str -- path of the CSV or .npy file
+    :param names: list -- names of the parameters the columns can set
+    """
+    if os.path.splitext(path)[1].lower() == '.npy':
+        table = NpyTable(path, names)
+    else:
+        table = CsvTable(path)
+    unknown = [name for name in table.columns if name not in names]
+    if unknown:
+        msg = u"Table '{}' has unknown columns: {}"
+        raise TableError(msg.format(path, u", ".join(unknown)))
+    if not len(table):
+        raise TableError(u"Table '{}' is empty".format(path))
+    return table
+
+
+# Count the rows of a table
+def get_row_count(path):
+    """
+    Return the number of rows of a table, or None if it cannot be read
+    """
+    try:
+        if os.path.splitext(path)[1].lower() == '.npy':
+            return len(numpy.load(path, mmap_mode='r'))
+        return len(CsvTable(path))
+    except Exception:
+        return None
+
+
+# CSV table class definition
+class CsvTable():
+    """
+    Class to read the rows of a CSV file through a memory map
+
+    The first line holds the names of the columns. Only the offsets of
+    the lines are kept in memory, the rows are parsed when requested.
+    """
+
+    def __init__(self, path):
+        """
+        Map the file and index its lines
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:
+                raise TableError(u"Table '{}' is empty".format(path))
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = array('L', [0])
+        position = self.map.find(b'\n')
+        while position != -1:
+            self.offsets.append(position + 1)
+            position = self.map.find(b'\n', position + 1)
+        if self.offsets[-1] != len(self.map):
+            self.offsets.append(len(self.map))
+        self.columns = [name.strip() for name in self.get_line(0)]
+
+    def __len__(self):
+        """
+        Return the number of rows (without the header)
+        """
+        return len(self.offsets) - 2
+
+    def get_line(self, index):
+        """
+        Return the fields of a line of the file
+        """
+        line = self.map[self.offsets[index]:self.offsets[index+1]]
+        fields = next(csv.reader([line.rstrip(b'\r\n')]), [])
+        return [field.decode('utf-8') for field in fields]
+
+    def get_row(self, index):
+        """
+        Return the (name, value) pairs of a row, as strings
+        """
+        fields = self.get_line(index + 1)
+        if len(fields) != len(self.columns):
+            msg = u"Row {} of table '{}' has {} fields instead of {}"
+            raise TableError(msg.format(index + 1, self.path, len(fields),
+                                        len(self.columns)))
+        return zip(self.columns, fields)
+
+    def close(self):
+        """
+        Close the memory map
+        """
+        self.map.close()
+
+
+# NumPy table class definition
+class NpyTable():
+    """
+    Class to read the rows of a .npy file through a memory map
+
+    The columns are the fields of a structured array. The columns of a 2D
+    array are the parameters, in their definition order.
+    """
+
+    def __init__(self, path, names):
+        """
+        Map the file
+        """
+        if numpy is None:
+            raise TableError(u"NumPy is required to read '{}'".format(path))
+        self.path = path
+        self.array = numpy.load(path, mmap_mode='r')
+        if self.array.dtype.names:
+            self.columns = list(self.array.dtype.names)
+        elif self.array.ndim == 2 and self.array.shape[1] <= len(names):
+            self.columns = list(names)[:self.array.shape[1]]
+        else:
+            msg = u"Table '{}' should be a structured array or a 2D array "
+            msg += u"with at most one column per parameter"
+            raise TableError(msg.format(path))
+
+    def __len__(self):
+        """
+        Return the number of rows
+        """
+        return len(self.array)
+
+    def get_row(self, index):
+        """
+        Return the (name, value) pairs of a row
+        """
+        row = self.array[index]
+        return [(name, row[i].item())
+                for i, name in enumerate(self.columns)]
+
+    def close(self):
+        """
+        Release the memory map
+        """
+        self.array = None
+
+
+# Table Error class definition
+class TableError(StandardError):
+    """ Custom error raised when a parameter table cannot be read """
+
+    def __init__(self, strerror):
+        StandardError.__init__(self, strerror)
+        self.strerror = strerror
+
+    def __str__(self):
+        return self.strerror
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+
+""" Module for distributed subsequence execution """
+
+#-------------------------------------------------------------------------------
+# Name:        Agent
+# Purpose:     Run subsequences on worker agent processes
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+import json
+import socket
+import SocketServer
+from Queue import Queue
+from collections import deque
+from StringIO import StringIO
+from threading import Thread, Lock
+
+# Imports from sequence
+from sequence.common.constant import LOGGER
+from sequence.common.parser import parse_sequence_file
+from sequence.common.protocol import (create_server, connect, send_message,
+                                      read_message, message_to_record,
+                                      serialize_sequence, MessageHandler)
+from sequence.common.expression import Scope
+from sequence.core.runable import RootSequenceThread
+
+
+# Agent request handler class definition
+class AgentRequestHandler(SocketServer.StreamRequestHandler):
+    """
+    Handle a request to run a sequence on the agent
+    """
+
+    def setup(self):
+        """
+        Setup the streams and the write lock
+        """
+        SocketServer.StreamRequestHandler.setup(self)
+        self.lock = Lock()
+        self.root = None
+
+    def send(self, message):
+        """
+        Send a message to the client
+        """
+        with self.lock:
+            send_message(self.wfile, message)
+
+    def handle(self):
+        """
+        Run the requested sequence and stream the logs back
+        """
+        # Get the request
+        message = read_message(self.rfile)
+        if not message or message.get('type') != 'run':
+            return
+        # Load the sequence
+        try:
+            data = StringIO(message['sequence'].encode('utf-8'))
+            xml_sequence = parse_sequence_file(data, message.get('depth'))
+            scope = Scope(None, message.get('scope') or {})
+            self.root = RootSequenceThread(xml_sequence, scope=scope)
+        except Exception as exc:
+            self.send({'type': 'error', 'message': unicode(exc)})
+            return
+        # Stream logs and listen to stop requests while running
+        handler = MessageHandler(self.send)
+        LOGGER.addHandler(handler)
+        listener = Thread(target=self.listen, name="AgentListener")
+        listener.daemon = True
+        try:
+            self.root.start()
+            listener.start()
+            self.root.join()
+        finally:
+            LOGGER.removeHandler(handler)
+        self.send({'type': 'result', 'value': bool(self.root.return_value)})
+
+    def listen(self):
+        """
+        Stop the sequence on stop request or if the client disconnects
+        """
+        while self.root.is_alive():
+            try:
+                message = read_message(self.rfile)
+            except (IOError, socket.error, ValueError):
+                message = None
+            if message is None or message.get('type') == 'stop':
+                if self.root.is_alive():
+                    self.root.stop()
+                return
+
+
+# Agent server
+def create_agent_server(address):
+    """
+    Create a worker agent server listening to an address string
+
+    The agent runs one sequence at a time, in the order of the requests.
+    """
+    return create_server(address, AgentRequestHandler)
+
+
+# Remote run class definition
+class RemoteRun():
+    """
+    Class to run a sequence on a worker agent
+    """
+
+    def __init__(self, address):
+        """
+        Initialize the remote run with the agent address
+        """
+        self.address = address
+        self.sock = None
+        self.wfile = None
+        self.lock = Lock()
+
+    def set(self):
+        """
+        Send a stop request to the agent (stop mecanism starter interface)
+        """
+        with self.lock:
+            if self.wfile is None:
+                return
+            try:
+                send_message(self.wfile, {'type': 'stop'})
+            except (IOError, socket.error):
+                pass
+
+    def run(self, data, stop_thread, log_dict, depth=None, scope=None):
+        """
+        Run the serialized sequence on the agent and return the result
+        The scope is a dictionary of the names given to the sequence.
+        """
+        # Connect
+        try:
+            self.sock = connect(self.address)
+        except (IOError, socket.error) as exc:
+            msg = u"Agent {} unreachable: {}".format(self.address, exc)
+            LOGGER.error(msg, extra=log_dict)
+            return False
+        rfile = self.sock.makefile('rb')
+        with self.lock:
+            self.wfile = self.sock.makefile('wb')
+        stop_thread.add_starter(self)
+        try:
+            # Send the request
+            request = {'type': 'run', 'sequence': data, 'depth': depth,
+                       'scope': scope}
+            with self.lock:
+                send_message(self.wfile, request)
+            if stop_thread.is_set():
+                self.set()
+            # Handle the messages
+            while True:
+                message = read_message(rfile)
+                if message is None:
+                    msg = u"Connection to agent {} lost".format(self.address)
+                    LOGGER.error(msg, extra=log_dict)
+                    return False
+                if message['type'] == 'log':
+                    LOGGER.handle(message_to_record(message))
+                elif message['type'] == 'error':
+                    LOGGER.error(message['message'], extra=log_dict)
+                    return False
+                elif message['type'] == 'result':
+                    return message['value']
+        except (IOError, socket.error, ValueError) as exc:
+            msg = u"Agent {} failed: {}".format(self.address, exc)
+            LOGGER.error(msg, extra=log_dict)
+            return False
+        finally:
+            stop_thread.remove_starter(self)
+            with self.lock:
+                self.wfile.close()
+                self.wfile = None
+            rfile.close()
+            self.sock.close()
+
+
+# Agent waiter class definition
+class AgentWaiter():
+    """
+    Class to wait for a free agent
+    The agent address is put in the queue on release, and the None
+    sentinel on stop (stop mecanism starter interface).
+    """
+
+    def __init__(self):
+        """
+        Initialize the waiter queue
+        """
+        self.queue = Queue()
+
+    def set(self):
+        """
+        Wake up the waiter with the None sentinel
+        """
+        self.queue.put(None)
+
+
+# Agent pool class definition
+class AgentPool():
+    """
+    Class to dispatch sequences on a set of worker agents
+    Each agent runs one sequence at a time, the free agents are given
+    to the waiters in their arrival order.
+
+    The remote blocks are the Macro blocks: each iteration runs the
+    subsequence on an agent with the arguments evaluated by the caller.
+    The resources and the blackboard are not shared with the agents (the
+    remote subsequences using them are rejected at load) and the journal
+    records the remote iterations as a whole.
+    """
+
+    def __init__(self, addresses):
+        """
+        Initialize the pool with a list of agent address strings
+        """
+        self.addresses = list(addresses)
+        self.free = deque(self.addresses)
+        self.waiters = deque()
+        self.lock = Lock()
+
+    def __len__(self):
+        """
+        Return the number of agents
+        """
+        return len(self.addresses)
+
+    def acquire(self, stop_thread):
+        """
+        Wait for a free agent, return None if the stop mecanism is set
+        """
+        with self.lock:
+            if stop_thread.is_set():
+                return None
+            if self.free:
+                return self.free.popleft()
+            waiter = AgentWaiter()
+            self.waiters.append(waiter)
+        stop_thread.add_starter(waiter)
+        try:
+            if stop_thread.is_set():
+                waiter.set()
+            address = waiter.queue.get()
+        finally:
+            stop_thread.remove_starter(waiter)
+            with self.lock:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+        # The agent may be given along with the sentinel
+        while address is None and not waiter.queue.empty():
+            address = waiter.queue.get()
+        if address is not None and stop_thread.is_set():
+            self.release(address)
+            return None
+        return address
+
+    def release(self, address):
+        """
+        Give an agent back to the first waiter, or to the pool
+        """
+        with self.lock:
+            if self.waiters:
+                self.waiters.popleft().queue.put(address)
+            else:
+                self.free.append(address)
+
+    def run(self, xml_sequence, stop_thread, log_dict, depth=None,
+            scope=None):
+        """
+        Run an XML sequence (or its serialized form) on a free agent
+        The scope is a dictionary of JSON serializable values.
+        """
+        data = xml_sequence
+        if not isinstance(data, basestring):
+            data = serialize_sequence(xml_sequence)
+        try:
+            json.dumps(scope)
+        except (TypeError, ValueError) as exc:
+            msg = u"The arguments cannot be sent to an agent: {}"
+            LOGGER.error(msg.format(exc), extra=log_dict)
+            return False
+        address = self.acquire(stop_thread)
+        if address is None:
+            return False
+        try:
+            msg = u"Dispatched to agent {}".format(address)
+            LOGGER.info(msg, extra=log_dict)
+            return RemoteRun(address).run(data, stop_thread, log_dict, depth,
+                                          scope)
+        finally:
+            self.release(address)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+""" Module for the data shared between the actions of an execution """
+
+#-------------------------------------------------------------------------------
+# Name:        Blackboard
+# Purpose:     Typed data channels between actions
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+from threading import Condition, Lock, Timer
+from timeit import default_timer as time
+
+
+# Blackboard class definition
+class Blackboard():
+    """
+    Class implementing named data channels shared by the actions of
+    an execution
+
+    A channel holds the last value published. The type of the first value
+    published is the type of the channel. Values are passed by reference,
+    so large objects (such as numpy arrays) are never copied: consumers
+    should not modify them.
+    """
+
+    def __init__(self):
+        """
+        Initialize the blackboard
+        """
+        self.values = {}
+        self.types = {}
+        self.condition = Condition(Lock())
+
+    def publish(self, name, value):
+        """
+        Publish a value on a channel and wake up the consumers
+        """
+        with self.condition:
+            channel_type = self.types.setdefault(name, type(value))
+            if not isinstance(value, channel_type):
+                msg = u"Channel '{}' expects {} values, got {}"
+                msg = msg.format(name, channel_type.__name__,
+                                 type(value).__name__)
+                raise BlackboardError(msg)
+            self.values[name] = value
+            self.condition.notify_all()
+
+    def replay(self, publications):
+        """
+        Publish again a list of (name, value) publications
+        (the outputs of an action whose result is reused from the cache)
+        """
+        for name, value in publications:
+            self.publish(name, value)
+
+    def consume(self, name, timeout=None, stop_thread=None):
+        """
+        Return the value of a channel, waiting for a first publication
+        if required
+
+        :param name: str -- name of the channel
+        :param timeout: float -- maximum waiting time (no limit if None)
+        :param stop_thread: stop mecanism interrupting the wait
+        """
+        timer = None
+        deadline = None if timeout is None else time() + timeout
+        try:
+            with self.condition:
+                while name not in self.values:
+                    if stop_thread and stop_thread.is_set():
+                        msg = u"Stopped while waiting for channel '{}'"
+                        raise BlackboardError(msg.format(name))
+                    if deadline is not None and time() >= deadline:
+                        msg = u"Timeout while waiting for channel '{}'"
+                        raise BlackboardError(msg.format(name))
+                    # Timed waits are polled in python 2: use a timer instead
+                    if deadline is not None and \
+                       (timer is None or timer.finished.is_set()):
+                        timer = Timer(deadline - time(), self.wake_up)
+                        timer.daemon = True
+                        timer.start()
+                    self.condition.wait()
+                return self.values[name]
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    def get(self, name, default=None):
+        """
+        Return the value of a channel without waiting
+        """
+        with self.condition:
+            return self.values.get(name, default)
+
+    def wake_up(self):
+        """
+        Wake up the consumers
+        """
+        with self.condition:
+            self.condition.notify_all()
+
+    def set(self):
+        """
+        Wake up the consumers so they can check the stop mecanism
+        (stop mecanism starter interface)
+        """
+        self.wake_up()
+
+
+# Blackboard Error class definition
+class BlackboardError(StandardError):
+    """ Custom error raised when a channel cannot be used """
+
+    def __init__(self, strerror):
+        StandardError.__init__(self, strerror)
+        self.strerror = strerror
+
+    def __str__(self):
+        return self.strerror
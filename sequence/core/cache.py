@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+""" Module for caching the results of the cacheable actions """
+
+#-------------------------------------------------------------------------------
+# Name:        Cache
+# Purpose:     Reuse the results of idempotent actions
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+from collections import OrderedDict
+from threading import Condition, Lock
+from timeit import default_timer as time
+
+# Imports from sequence
+from sequence.common.constant import LOGGER
+
+
+# Maximum number of cached results
+CACHE_SIZE = 256
+
+
+# Action cache class definition
+class ActionCache():
+    """
+    Class implementing a size-bounded LRU cache with a time to live
+
+    The results are keyed by the module and the cast parameters of the
+    actions. Each result is stored with the outputs of the execution
+    (its blackboard publications) so that they can be replayed on a hit.
+    Only the successful results of uninterrupted executions are stored,
+    and an execution waits for a concurrent execution of the same key
+    instead of running it twice.
+    """
+
+    def __init__(self, size=CACHE_SIZE):
+        """
+        Initialize the cache
+
+        :param size: int -- maximum number of cached results
+        """
+        self.size = size
+        self.entries = OrderedDict()
+        self.pending = set()
+        self.condition = Condition(Lock())
+        self.hits = 0
+        self.misses = 0
+
+    def call(self, key, ttl, function, stop_thread):
+        """
+        Return the cached result of a key, or call the function to get it
+        Return a (result, outputs, hit) tuple: hit is None if the stop
+        mecanism has been set while waiting for a concurrent execution.
+
+        :param key: hashable -- key of the result
+        :param ttl: float -- time to live of the result (no limit if None)
+        :param function: callable returning a (result, outputs) tuple
+        :param stop_thread: stop mecanism interrupting the wait
+        """
+        with self.condition:
+            while True:
+                if stop_thread.is_set():
+                    return False, [], None
+                entry = self.entries.pop(key, None)
+                if entry is not None and entry[0] > time():
+                    self.entries[key] = entry
+                    self.hits += 1
+                    return entry[1], entry[2], True
+                if key not in self.pending:
+                    break
+                self.condition.wait()
+            self.pending.add(key)
+            self.misses += 1
+        result, outputs = False, []
+        try:
+            result, outputs = function()
+        finally:
+            with self.condition:
+                self.pending.discard(key)
+                if result and not stop_thread.is_set():
+                    expiry = time() + ttl if ttl is not None else float('inf')
+                    self.entries[key] = (expiry, result, outputs)
+                    while len(self.entries) > self.size:
+                        self.entries.popitem(last=False)
+                self.condition.notify_all()
+        return result, outputs, False
+
+    def get_counters(self):
+        """
+        Return the (hits, misses) counters
+        """
+        with self.condition:
+            return self.hits, self.misses
+
+    def log_statistics(self, log_dict, counters):
+        """
+        Log the hits and misses since the given counters
+        """
+        hits, misses = [new - old for new, old
+                        in zip(self.get_counters(), counters)]
+        if hits or misses:
+            msg = u"Action cache : {} hits, {} misses"
+            LOGGER.info(msg.format(hits, misses), extra=log_dict)
+
+    def clear(self):
+        """
+        Remove all the cached results
+        """
+        with self.condition:
+            self.entries.clear()
+
+    def set(self):
+        """
+        Wake up the waiting executions so they can check the stop mecanism
+        (stop mecanism starter interface)
+        """
+        with self.condition:
+            self.condition.notify_all()
+
+
+# Cache shared by all the executions of the process
+ACTION_CACHE = ActionCache()
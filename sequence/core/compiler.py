@@ -0,0 +1,607 @@
+# -*- coding: utf-8 -*-
+
+""" Module for compiling sequences into python modules """
+
+#-------------------------------------------------------------------------------
+# Name:        Compiler
+# Purpose:     Run sequences as generated straight-line python code
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+import os
+import imp
+import struct
+import marshal
+import hashlib
+import py_compile
+from threading import Thread, Event, Condition, Lock
+from time import sleep
+from timeit import default_timer as time
+
+# Imports from sequence
+from sequence.common.constant import XBM, LOGGER, BPL, MMD, EVT
+from sequence.common.expression import Expression, is_expression
+from sequence.action.abstract import create_action
+from sequence.core.resource import ResourceManager
+from sequence.core.blackboard import Blackboard
+from sequence.core.cache import ACTION_CACHE
+from sequence.core.runable import StopThread, RootSequenceThread
+from sequence.core.observer import notify
+from sequence.core.eventlog import EVENT_RING, LOGGING_ADAPTER
+
+
+# Directory of the compiled modules
+CACHE_DIRECTORY = os.environ.get('SEQUENCE_CACHE', os.path.join(
+    os.path.expanduser('~'), '.cache', 'python-sequence'))
+
+# Compiled modules of the process, indexed by the hash of their source
+CODE_CACHE = {}
+CODE_CACHE_LOCK = Lock()
+
+# Blocks with a straight-line translation
+SUPPORTED_BLOCKS = (XBM.BEGIN, XBM.END, XBM.ACTION, XBM.BRANCH,
+                    XBM.TIMEINIT, XBM.WAIT, XBM.MACRO)
+
+
+# Get the threads of a sequence
+def get_threads(xml_sequence):
+    """
+    Split a sequence into threads, as the interpreter does
+    Return a list of (blocks, starter, joiner) tuples: the starter is the
+    branch starting the thread (None for the first thread) and the joiner
+    the branch joining it (None if the thread reaches an End block).
+    """
+    threads = []
+    stack = [(xml_sequence.begin, None)]
+    while stack:
+        block, starter = stack.pop()
+        blocks, joiner = [], None
+        while True:
+            blocks.append(block)
+            if not block.outputs:
+                break
+            stack.extend((out, block) for out in block.outputs[1:])
+            following = block.outputs[0]
+            if following.inputs[-1] is not block:
+                joiner = following
+                break
+            block = following
+        threads.append((blocks, starter, joiner))
+    return threads
+
+
+# Sequence compiler class definition
+class SequenceCompiler():
+    """
+    Class to translate a sequence into the source of a python module
+
+    Each subsequence call gets its own function, with one nested function
+    per thread if the subsequence has branches. The actions are referred
+    to by their index in the blocks list, the waits are inlined.
+    """
+
+    def __init__(self, xml_sequence):
+        """
+        Initialize the compiler
+
+        :param xml_sequence: XMLSequence -- validated sequence to compile
+        """
+        self.xml_sequence = xml_sequence
+        self.blocks = []
+        self.lines = []
+        self.count = 0
+
+    def check(self, xml_sequence, root=True):
+        """
+        Raise a CompilationError if a block has no straight-line translation
+        """
+        if xml_sequence.backup is not None and not root:
+            msg = u"Sequence '{}' has a backup"
+            raise CompilationError(msg.format(xml_sequence.sequence_id))
+        for block in xml_sequence.blocks:
+            where = u"{}/{}".format(xml_sequence.sequence_id, block.block_id)
+            if block.block_type not in SUPPORTED_BLOCKS:
+                msg = u"{} blocks are not supported ({})"
+                raise CompilationError(msg.format(block.block_type, where))
+            if block.block_type == XBM.MACRO:
+                if block.parameters:
+                    msg = u"Macro arguments are not supported ({})"
+                    raise CompilationError(msg.format(where))
+                if block.properties.mode != MMD.SEQUENTIAL and \
+                   block.properties.iteration > 1:
+                    msg = u"Concurrent macros are not supported ({})"
+                    raise CompilationError(msg.format(where))
+                if block.subsequence:
+                    self.check(block.subsequence, False)
+            if block.block_type == XBM.ACTION and \
+               any(isinstance(value, Expression) or is_expression(value)
+                   for value in block.parameters.values()):
+                msg = u"Parameter expressions are not supported ({})"
+                raise CompilationError(msg.format(where))
+
+    def generate(self):
+        """
+        Return the source of the module
+        """
+        self.check(self.xml_sequence)
+        self.lines = [
+            u"# -*- coding: utf-8 -*-",
+            u"# Generated from sequence '{}'".format(
+                self.xml_sequence.sequence_id),
+            u"",
+            u"def build(rt):",
+            u"    run, wait, time = rt.execute, rt.wait, rt.time",
+            u"    stopped, strand = rt.stop_thread.is_set, rt.strand"]
+        name = self.add_sequence(self.xml_sequence)
+        self.lines.append(u"    return {}".format(name))
+        self.lines.append(u"")
+        return u"\n".join(self.lines)
+
+    def add_sequence(self, xml_sequence):
+        """
+        Add the function running a sequence and return its name
+        """
+        name = u"sequence_{}".format(self.count)
+        self.count += 1
+        # The subsequences are defined first
+        threads = get_threads(xml_sequence)
+        calls = {}
+        for blocks, _, _ in threads:
+            for block in blocks:
+                if block.block_type == XBM.MACRO and block.subsequence:
+                    calls[block] = self.add_sequence(block.subsequence)
+        self.lines.append(u"")
+        self.lines.append(u"    def {}():".format(name))
+        self.lines.append(u"        # Sequence '{}'".format(
+            xml_sequence.sequence_id))
+        self.lines.append(u"        ref = [time()]")
+        # Single thread: straight-line code
+        if len(threads) == 1:
+            self.add_thread(threads[0][0], calls, threads, u" " * 8)
+            return name
+        # Several threads: one function per thread
+        self.lines.append(u"        s = [strand() for _ in xrange({})]"
+                          .format(len(threads)))
+        for index, (blocks, _, _) in enumerate(threads):
+            self.lines.append(u"")
+            self.lines.append(u"        def thread_{}():".format(index))
+            self.add_thread(blocks, calls, threads, u" " * 12)
+        ends = [index for index, (_, _, joiner) in enumerate(threads)
+                if joiner is None]
+        self.lines.append(u"")
+        self.lines.append(u"        s[0].run(thread_0)")
+        self.lines.append(u"        results = [thread.join() for thread in s]")
+        self.lines.append(u"        return all([{}])".format(
+            u", ".join(u"results[{}]".format(index) for index in ends)))
+        return name
+
+    def add_thread(self, blocks, calls, threads, indent):
+        """
+        Add the straight-line code of a thread
+        """
+        lines = self.lines
+        for block in blocks:
+            kind = block.block_type
+            properties = block.properties
+            if kind == XBM.ACTION:
+                lines.append(indent + u"if not run({}): return False"
+                             .format(len(self.blocks)))
+                self.blocks.append(block)
+            elif kind == XBM.WAIT and properties.absolute:
+                lines.append(indent + u"if not wait(ref[0] + {!r} - time()): "
+                             u"return False".format(properties.time))
+            elif kind == XBM.WAIT:
+                lines.append(indent + u"if not wait({!r}): return False"
+                             .format(properties.time))
+            elif kind == XBM.TIMEINIT:
+                lines.append(indent + u"ref[0] = time()")
+            elif kind == XBM.MACRO and block in calls:
+                name = calls[block]
+                tick = properties.tick
+                if properties.iteration == 1 and not tick:
+                    lines.append(indent + u"if not {}(): return False"
+                                 .format(name))
+                    continue
+                lines.append(indent + u"for _ in xrange({}):"
+                             .format(properties.iteration))
+                lines.append(indent + u"    if not {}(): return False"
+                             .format(name))
+                if tick:
+                    lines.append(indent + u"    if not wait({!r}): "
+                                 u"return False".format(tick))
+            elif kind == XBM.BRANCH:
+                for index, (_, starter, joiner) in enumerate(threads):
+                    if joiner is block:
+                        lines.append(indent + u"s[{}].join()".format(index))
+                for index, (_, starter, joiner) in enumerate(threads):
+                    if starter is block:
+                        lines.append(indent + u"s[{0}].start(thread_{0})"
+                                     .format(index))
+        lines.append(indent + u"return not stopped()")
+
+
+# Compile a sequence
+def compile_sequence(xml_sequence, directory=CACHE_DIRECTORY):
+    """
+    Compile a sequence and return a (code, blocks) tuple: the code of the
+    module and the action blocks it refers to
+
+    The modules are cached as .pyc files in the given directory, indexed
+    by the hash of their source, so that a sequence is compiled once.
+    Raise a CompilationError if the sequence cannot be compiled.
+
+    :param xml_sequence: XMLSequence -- validated sequence to compile
+    :param directory: str -- directory of the cache (no file if None)
+    """
+    compiler = SequenceCompiler(xml_sequence)
+    source = compiler.generate().encode('utf-8')
+    key = hashlib.sha1(source).hexdigest()
+    with CODE_CACHE_LOCK:
+        code = CODE_CACHE.get(key)
+        if code is None:
+            code = load_module(source, key, directory)
+            CODE_CACHE[key] = code
+    return code, compiler.blocks
+
+
+def load_module(source, key, directory):
+    """
+    Return the code of a module, from its .pyc file if it is valid
+    The source file is written for the tracebacks and compiled to its
+    .pyc file by py_compile.
+    """
+    if directory is None:
+        return compile(source, '<sequence {}>'.format(key), 'exec')
+    path = os.path.join(directory, key + '.py')
+    code = read_compiled(path)
+    if code is not None:
+        return code
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(source)
+        os.rename(path + '.tmp', path)
+        py_compile.compile(path, doraise=True)
+    except (EnvironmentError, py_compile.PyCompileError):
+        pass
+    code = read_compiled(path)
+    if code is None:
+        code = compile(source, path, 'exec')
+    return code
+
+
+def read_compiled(path):
+    """
+    Return the code of the .pyc file of a source file, or None if it is
+    missing or if its magic number or its timestamp do not match
+    """
+    try:
+        mtime = int(os.stat(path).st_mtime) & 0xFFFFFFFF
+        with open(path + 'c', 'rb') as f:
+            data = f.read()
+    except EnvironmentError:
+        return None
+    if data[:4] != imp.get_magic() or len(data) < 8 or \
+       struct.unpack('<I', data[4:8])[0] != mtime:
+        return None
+    try:
+        return marshal.loads(data[8:])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+# Compiled sequence thread class definition
+class CompiledSequenceThread(Thread):
+    """
+    Class to run a compiled sequence in a thread
+
+    It replaces the RootSequenceThread for the sequences made of actions,
+    waits, branches and sequential macros: the blocks are run without
+    execution objects and without block logs (the actions still log
+    their steps). The backup of the root sequence runs with the
+    interpreter.
+    """
+
+    def __init__(self, xml_sequence, directory=CACHE_DIRECTORY,
+                 observers=None):
+        """
+        Compile the sequence and create its actions
+        Raise a CompilationError if the sequence cannot be compiled.
+
+        :param xml_sequence: XMLSequence -- validated sequence to run
+        :param directory: str -- directory of the compiled modules
+        :param observers: list -- observers of the execution
+        """
+        Thread.__init__(self)
+        code, blocks = compile_sequence(xml_sequence, directory)
+        # Attributes shared with the root sequence thread (backup)
+        self.xml_sequence = xml_sequence
+        self.next_execution = None
+        self.failover_time = None
+        self.journal = None
+        self.agents = None
+        self.session = None
+        self.lookahead = 0
+        self.backup_level = 0
+        self.failure = None
+        self.return_value = None
+        self.prewarmed = []
+        self.observers = [] if observers is None else observers
+        self.finished_callbacks = []
+        self.resources = ResourceManager(xml_sequence)
+        self.blackboard = Blackboard()
+        self.runable_sequence_finished = Event()
+        # Stop mecanism
+        self.stop_thread = StopThread(self)
+        self.stop_thread.add_starter(self.resources)
+        self.stop_thread.add_starter(self.blackboard)
+        self.stop_thread.add_starter(ACTION_CACHE)
+        self.stop_thread.add_starter(self)
+        self.condition = Condition(Lock())
+        # Actions
+        self.blocks = blocks
+        self.actions = [create_action(block) for block in blocks]
+        self.log_dicts = []
+        self.block_resources = []
+        sequence_ids = get_sequence_ids(xml_sequence)
+        for block in blocks:
+            self.log_dicts.append({'sequenceID': sequence_ids[block][0],
+                                   'ID':         block.block_id,
+                                   'level':      sequence_ids[block][1],
+                                   'type':       block.block_type.upper(),
+                                   'tag':        u''})
+            self.block_resources.append(
+                [name.strip()
+                 for name in block.properties.resource.split(';')
+                 if name.strip()])
+        # Backup (run by the interpreter)
+        self.backup = None
+        if xml_sequence.backup and xml_sequence.backup_policy != BPL.LAZY:
+            self.backup = RootSequenceThread(xml_sequence.backup,
+                                             self.stop_thread)
+            if xml_sequence.backup_policy == BPL.PREWARM:
+                self.backup.prewarm()
+                self.prewarmed.append(self.backup)
+        # Build the sequence function
+        namespace = {}
+        exec code in namespace
+        self.function = namespace['build'](self)
+
+    def run(self):
+        """
+        Run the compiled sequence
+        """
+        # Forward the execution log records while running
+        LOGGING_ADAPTER.open()
+        if self.failover_time is not None:
+            msg = u"Failover latency : {:.1f} ms"
+            msg = msg.format((time() - self.failover_time) * 1000)
+            LOGGER.info(msg, extra=self.stop_thread.log_dict)
+        cache_counters = ACTION_CACHE.get_counters()
+        self.stop_thread.enable()
+        try:
+            self.return_value = self.function()
+        except Exception as exc:
+            LOGGER.error(repr(exc), extra=self.stop_thread.log_dict)
+            self.return_value = False
+        if not self.return_value:
+            self.stop_thread.set()
+            self.stop_thread.add_backup(self.get_backup())
+        self.stop_thread.disable()
+        # Wait for the stop mecanism to finish
+        self.runable_sequence_finished.set()
+        if self.stop_thread.is_alive():
+            self.stop_thread.join()
+        # Close the actions warmed up for the backups which have not run
+        for backup in self.prewarmed:
+            if backup.ident is None:
+                backup.discard_warm_up()
+        # Report the resource usage
+        log_dict = {'sequenceID': self.xml_sequence.sequence_id,
+                    'ID':         'Resources',
+                    'level':      self.xml_sequence.level,
+                    'type':       'RESOURCE'}
+        self.resources.log_statistics(log_dict)
+        log_dict = dict(log_dict, ID='Cache', type='CACHE')
+        ACTION_CACHE.log_statistics(log_dict, cache_counters)
+        LOGGING_ADAPTER.close()
+        # Launch the next execution
+        if self.next_execution:
+            self.next_execution.start()
+        # Notify the end of the execution
+        for callback in self.finished_callbacks:
+            callback(self)
+
+    def get_backup(self):
+        """
+        Return the backup sequence, build it if required
+        """
+        if self.backup is None and self.xml_sequence.backup:
+            self.backup = RootSequenceThread(self.xml_sequence.backup,
+                                             self.stop_thread)
+        return self.backup
+
+    # Methods called by the compiled code
+    def run_action(self, index):
+        """
+        Run an action, holding its resources
+        """
+        action, log_dict = self.actions[index], self.log_dicts[index]
+        names = self.block_resources[index]
+        if not names:
+            return action.execute(self.stop_thread, log_dict)
+        if not self.resources.acquire(names, self.stop_thread, log_dict):
+            return False
+        try:
+            return action.execute(self.stop_thread, log_dict)
+        finally:
+            self.resources.release(names)
+
+    def execute(self, index):
+        """
+        Run the action of a block
+        Return False if it failed or if the execution is stopped.
+        """
+        if self.stop_thread.is_set():
+            return False
+        observers = self.observers
+        if observers:
+            notify(observers, self.log_dicts[index], EVT.BLOCK_START)
+        action = self.actions[index]
+        if not action.cacheable:
+            result = self.run_action(index)
+        else:
+            result, outputs, hit = ACTION_CACHE.call(
+                action.get_cache_key(), action.cache_ttl,
+                lambda: (self.run_action(index), action.get_publications()),
+                self.stop_thread)
+            if hit:
+                EVENT_RING.info(u"Result reused from the cache",
+                                self.log_dicts[index])
+                action.skip()
+                self.blackboard.replay(outputs)
+        if not result and not self.stop_thread.is_set():
+            self.set_failure(index)
+            self.stop_thread.set()
+        if observers:
+            notify(observers, self.log_dicts[index], EVT.BLOCK_END,
+                   result=bool(result))
+        return result
+
+    def wait(self, delay):
+        """
+        Wait for a delay (not interrupted by the stop mecanism, as in the
+        interpreter)
+        Return False if the execution is stopped.
+        """
+        if delay > 0:
+            sleep(delay)
+        return not self.stop_thread.is_set()
+
+    def time(self):
+        """
+        Return the time used by the time references
+        """
+        return time()
+
+    def strand(self):
+        """
+        Return a new thread of the compiled code
+        """
+        return Strand(self)
+
+    def set_failure(self, index):
+        """
+        Record the first failing block as a (sequence ID, block ID) tuple
+        """
+        if self.failure is None:
+            log_dict = self.log_dicts[index]
+            self.failure = (log_dict['sequenceID'], log_dict['ID'])
+
+    def set(self):
+        """
+        Interrupt the joins (stop mecanism starter interface)
+        """
+        with self.condition:
+            self.condition.notify_all()
+
+    def stop(self):
+        """
+        Stop the current sequence execution.
+        """
+        self.stop_thread.set()
+
+
+# Strand class definition
+class Strand():
+    """
+    Class implementing a thread of the compiled code
+
+    A strand which has not been started when the execution is stopped
+    cannot be started anymore, so that joining it does not block.
+    """
+
+    def __init__(self, runtime):
+        """
+        Initialize the strand
+        """
+        self.condition = runtime.condition
+        self.stop_thread = runtime.stop_thread
+        self.started = False
+        self.finished = False
+        self.result = False
+
+    def start(self, function):
+        """
+        Run a function in a new thread
+        """
+        with self.condition:
+            if self.stop_thread.is_set():
+                self.finished = True
+                return
+            self.started = True
+        thread = Thread(target=self.run, args=(function,))
+        thread.daemon = True
+        thread.start()
+
+    def run(self, function):
+        """
+        Run a function in the current thread
+        """
+        result = False
+        try:
+            result = function()
+        finally:
+            with self.condition:
+                self.result = result
+                self.finished = True
+                self.condition.notify_all()
+
+    def join(self):
+        """
+        Wait for the strand to finish and return its result
+        """
+        with self.condition:
+            while not self.finished:
+                if not self.started and self.stop_thread.is_set():
+                    self.finished = True
+                    break
+                self.condition.wait()
+            return self.result
+
+
+# Get the sequence of the blocks
+def get_sequence_ids(xml_sequence):
+    """
+    Return a dictionary giving the (sequence ID, level) of the blocks of a
+    sequence and its subsequences
+    """
+    result = {}
+    stack = [xml_sequence]
+    while stack:
+        sequence = stack.pop()
+        for block in sequence.blocks:
+            result[block] = sequence.sequence_id, sequence.level
+            if block.subsequence:
+                stack.append(block.subsequence)
+    return result
+
+
+# Compilation Error class definition
+class CompilationError(StandardError):
+    """ Custom error raised when a sequence cannot be compiled """
+
+    def __init__(self, strerror):
+        StandardError.__init__(self, strerror)
+        self.strerror = strerror
+
+    def __str__(self):
+        return self.strerror
@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+
+""" Module for the headless execution daemon """
+
+#-------------------------------------------------------------------------------
+# Name:        SequenceDaemon
+# Purpose:     Long-lived process loading and running sequences on request
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+import os
+import errno
+import fcntl
+import signal
+import socket
+import logging
+import SocketServer
+from threading import Thread, Lock
+
+# Imports from sequence
+from sequence.common.constant import LOGGER
+from sequence.common.parser import parse_sequence_file
+from sequence.common.protocol import (create_server, connect, send_message,
+                                      read_message, message_to_record,
+                                      MessageHandler)
+from sequence.action.abstract import get_action_list
+from sequence.core.engine import SequenceEngine
+from sequence.core.eventlog import LOGGING_ADAPTER
+
+
+# Daemon request handler class definition
+class DaemonRequestHandler(SocketServer.StreamRequestHandler):
+    """
+    Handle the requests of a daemon client
+    """
+
+    def setup(self):
+        """
+        Setup the streams and the write lock
+        """
+        SocketServer.StreamRequestHandler.setup(self)
+        self.lock = Lock()
+        self.server.sequence_daemon.add_client(self)
+
+    def send(self, message):
+        """
+        Send a message to the client
+        """
+        with self.lock:
+            send_message(self.wfile, message)
+
+    def handle(self):
+        """
+        Handle the requests until the client disconnects
+        """
+        daemon = self.server.sequence_daemon
+        try:
+            while True:
+                message = read_message(self.rfile)
+                if message is None:
+                    break
+                daemon.handle_request(message, self)
+        except (IOError, socket.error, ValueError):
+            pass
+        finally:
+            daemon.unsubscribe(self)
+            daemon.remove_client(self)
+
+
+# Sequence daemon class definition
+class SequenceDaemon():
+    """
+    Class to keep action modules imported and sequences compiled
+    between executions
+
+    The daemon accepts load, start, stop and status requests and streams
+    the execution log records to the clients that started the execution.
+    Once an execution is over, the same sequence is compiled again so the
+    next start request runs immediately.
+
+    In fork mode, each execution runs in a child process forked from the
+    daemon, where the modules are imported and the sequence compiled
+    (copy-on-write). The child releases the sockets of the daemon, streams
+    its log records and its result through a pipe, and a stop request
+    sends it SIGTERM.
+    """
+
+    def __init__(self, address, fork=False):
+        """
+        Initialize the daemon with the address to listen to
+
+        :param address: str -- host:port or unix socket path
+        :param fork: bool -- run each execution in a forked process
+        """
+        self.address = address
+        self.engine = SequenceEngine()
+        self.cache = {}
+        self.current = None
+        self.result = None
+        self.fork = fork
+        self.child = None
+        self.lock = Lock()
+        self.subscribers = set()
+        self.subscribers_lock = Lock()
+        self.clients = set()
+        # Preload the action modules
+        self.actions = get_action_list()
+        # Stream execution logs to subscribers
+        self.handler = MessageHandler(self.broadcast)
+        LOGGER.addHandler(self.handler)
+        self.server = create_server(address, DaemonRequestHandler, True)
+        self.server.sequence_daemon = self
+
+    def serve_forever(self):
+        """
+        Serve requests until shutdown
+        """
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+
+    def shutdown(self):
+        """
+        Stop serving requests
+        """
+        self.server.shutdown()
+
+    #### Clients and subscribers ####
+
+    def add_client(self, handler):
+        """
+        Register the handler of a client connection
+        """
+        with self.subscribers_lock:
+            self.clients.add(handler)
+
+    def remove_client(self, handler):
+        """
+        Unregister the handler of a client connection
+        """
+        with self.subscribers_lock:
+            self.clients.discard(handler)
+
+    def subscribe(self, handler):
+        """
+        Subscribe a client to the execution events
+        """
+        with self.subscribers_lock:
+            self.subscribers.add(handler)
+
+    def unsubscribe(self, handler):
+        """
+        Unsubscribe a client from the execution events
+        """
+        with self.subscribers_lock:
+            self.subscribers.discard(handler)
+
+    def broadcast(self, message):
+        """
+        Send a message to all the subscribers
+        """
+        with self.subscribers_lock:
+            subscribers = list(self.subscribers)
+        for handler in subscribers:
+            try:
+                handler.send(message)
+            except (IOError, socket.error):
+                self.unsubscribe(handler)
+
+    #### Sequence handling ####
+
+    def get_sequence(self, file_name, max_depth=None):
+        """
+        Return the parsed sequence of a file, using the cache if the file
+        has not been modified since the last parsing
+        """
+        file_name = os.path.abspath(file_name)
+        key = file_name, max_depth
+        mtime = os.path.getmtime(file_name)
+        if key not in self.cache or self.cache[key][0] != mtime:
+            self.cache[key] = mtime, parse_sequence_file(file_name, max_depth)
+        return self.cache[key][1]
+
+    def handle_request(self, message, handler):
+        """
+        Handle a request message and send the reply
+        The reply is sent before any notification of the end of execution.
+        """
+        with self.lock:
+            try:
+                reply = self.process_request(message, handler)
+            except Exception as exc:
+                reply = {'type': 'error', 'message': unicode(exc)}
+            handler.send(reply)
+
+    def process_request(self, message, handler):
+        """
+        Process a request message and return the reply
+        """
+        kind = message.get('type')
+        if kind == 'load':
+            return self.load(message['file'], message.get('depth'))
+        if kind == 'start':
+            if message.get('watch', True):
+                self.subscribe(handler)
+            return self.start()
+        if kind == 'stop':
+            if self.child is not None:
+                os.kill(self.child, signal.SIGTERM)
+            elif self.engine.is_started():
+                self.engine.interrupt()
+            else:
+                msg = u"No sequence running"
+                return {'type': 'error', 'message': msg}
+            return {'type': 'stopping'}
+        if kind == 'status':
+            return self.status()
+        msg = u"Unknown request : {}".format(kind)
+        return {'type': 'error', 'message': msg}
+
+    def load(self, file_name, max_depth=None):
+        """
+        Compile a sequence for the next start request
+        """
+        if self.is_running():
+            msg = u"A sequence is already running"
+            return {'type': 'error', 'message': msg}
+        xml_sequence = self.get_sequence(file_name, max_depth)
+        self.engine.load_sequence(xml_sequence)
+        self.current = xml_sequence
+        return {'type': 'loaded', 'sequence_id': xml_sequence.sequence_id}
+
+    def is_running(self):
+        """
+        Return True if an execution is running
+        """
+        return self.engine.is_started() or self.child is not None
+
+    def start(self):
+        """
+        Start the compiled sequence
+        """
+        if not self.engine.is_loaded() or self.is_running():
+            msg = u"No sequence ready to start"
+            return {'type': 'error', 'message': msg}
+        if self.fork:
+            return self.start_child()
+        root = self.engine.sequence
+        self.engine.start()
+        monitor = Thread(target=self.monitor, args=(root,),
+                         name="DaemonMonitor")
+        monitor.daemon = True
+        monitor.start()
+        return {'type': 'started',
+                'sequence_id': root.xml_sequence.sequence_id}
+
+    def monitor(self, root):
+        """
+        Wait for an execution to finish, notify the subscribers and
+        compile the sequence again
+        """
+        root.join()
+        with self.lock:
+            self.engine.wait()
+            self.result = bool(root.return_value)
+            if self.current is not None:
+                self.engine.load_sequence(self.current)
+        self.broadcast({'type': 'finished', 'result': self.result,
+                        'sequence_id': root.xml_sequence.sequence_id})
+        with self.subscribers_lock:
+            self.subscribers.clear()
+
+    def start_child(self):
+        """
+        Fork a process running the compiled sequence
+        The daemon keeps its compiled sequence for the next execution.
+        """
+        sequence_id = self.engine.sequence.xml_sequence.sequence_id
+        read_fd, write_fd = os.pipe()
+        # Do not fork while another thread holds the logging locks
+        logging._acquireLock()
+        try:
+            with LOGGING_ADAPTER.lock:
+                pid = os.fork()
+        finally:
+            logging._releaseLock()
+        if pid == 0:
+            os.close(read_fd)
+            self.release_sockets()
+            self.run_child(write_fd)
+        os.close(write_fd)
+        self.child = pid
+        monitor = Thread(target=self.monitor_child,
+                         args=(pid, read_fd, sequence_id),
+                         name="DaemonMonitor")
+        monitor.daemon = True
+        monitor.start()
+        return {'type': 'started', 'sequence_id': sequence_id, 'pid': pid}
+
+    def release_sockets(self):
+        """
+        Release the listening socket and the client connections inherited
+        by a forked process
+        The socket objects of the connections are still referenced by the
+        threads of the daemon, so their descriptors are replaced by
+        /dev/null instead of being closed.
+        """
+        self.server.socket.close()
+        null_fd = os.open(os.devnull, os.O_RDWR)
+        try:
+            for handler in self.clients:
+                os.dup2(null_fd, handler.connection.fileno())
+        finally:
+            os.close(null_fd)
+
+    def run_child(self, write_fd):
+        """
+        Run the compiled sequence in the forked process and exit
+        (the exit code is 0 if the execution succeeded)
+        """
+        code = 1
+        try:
+            wfile = os.fdopen(write_fd, 'wb')
+            handler = MessageHandler(lambda message:
+                                     send_message(wfile, message))
+            LOGGER.removeHandler(self.handler)
+            LOGGER.addHandler(handler)
+            # Wake up on the end of the execution or on SIGTERM
+            wake_fd, notify_fd = os.pipe()
+            flags = fcntl.fcntl(notify_fd, fcntl.F_GETFL)
+            fcntl.fcntl(notify_fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+            signal.set_wakeup_fd(notify_fd)
+            signal.signal(signal.SIGTERM,
+                          lambda *args: self.engine.interrupt())
+            root = self.engine.sequence
+            handle = self.engine.start()
+            handle.add_done_callback(lambda handle:
+                                     os.write(notify_fd, b'\0'))
+            while not handle.done():
+                try:
+                    os.read(wake_fd, 64)
+                except OSError as exc:
+                    if exc.errno != errno.EINTR:
+                        raise
+            self.engine.wait()
+            result = bool(root.return_value)
+            handler.acquire()
+            try:
+                send_message(wfile, {'type': 'finished', 'result': result})
+            finally:
+                handler.release()
+            code = 0 if result else 1
+        except BaseException:
+            pass
+        finally:
+            os._exit(code)
+
+    def monitor_child(self, pid, read_fd, sequence_id):
+        """
+        Forward the messages of a forked execution to the subscribers,
+        then reap the process and notify its result
+        """
+        result = None
+        with os.fdopen(read_fd, 'rb') as rfile:
+            try:
+                while True:
+                    message = read_message(rfile)
+                    if message is None:
+                        break
+                    if message['type'] == 'finished':
+                        result = message['result']
+                    else:
+                        self.broadcast(message)
+            except ValueError:
+                pass
+        _, status = os.waitpid(pid, 0)
+        with self.lock:
+            self.child = None
+            self.result = bool(result)
+        message = {'type': 'finished', 'result': self.result,
+                   'sequence_id': sequence_id}
+        if result is None:
+            msg = u"The execution process {} exited with status {}"
+            message['message'] = msg.format(pid, status)
+        self.broadcast(message)
+        with self.subscribers_lock:
+            self.subscribers.clear()
+
+    def status(self):
+        """
+        Return the status of the daemon
+        """
+        sequence_id = None
+        if self.current is not None:
+            sequence_id = self.current.sequence_id
+        return {'type': 'status',
+                'sequence_id': sequence_id,
+                'loaded': self.engine.is_loaded(),
+                'started': self.is_running(),
+                'fork': self.fork,
+                'pid': self.child,
+                'interrupted': self.engine.is_interrupted(),
+                'result': self.result,
+                'actions': len(self.actions)}
+
+
+# Daemon client class definition
+class DaemonClient():
+    """
+    Class to send requests to a sequence daemon
+    """
+
+    def __init__(self, address, timeout=None):
+        """
+        Connect to the daemon
+        """
+        self.sock = connect(address, timeout)
+        self.rfile = self.sock.makefile('rb')
+        self.wfile = self.sock.makefile('wb')
+
+    def close(self):
+        """
+        Close the connection
+        """
+        self.wfile.close()
+        self.rfile.close()
+        self.sock.close()
+
+    def request(self, message):
+        """
+        Send a request and return the reply (log records are handled
+        by the execution logger)
+        """
+        send_message(self.wfile, message)
+        return self.next_message()
+
+    def next_message(self):
+        """
+        Return the next message that is not a log record
+        """
+        while True:
+            message = read_message(self.rfile)
+            if message is None:
+                raise IOError("Connection to the daemon lost")
+            if message['type'] != 'log':
+                return message
+            LOGGER.handle(message_to_record(message))
+
+    def load(self, file_name, max_depth=None):
+        """ Request the daemon to compile a sequence file """
+        file_name = os.path.abspath(file_name)
+        return self.request({'type': 'load', 'file': file_name,
+                             'depth': max_depth})
+
+    def start(self, watch=True):
+        """ Request the daemon to start the compiled sequence """
+        return self.request({'type': 'start', 'watch': watch})
+
+    def stop(self):
+        """ Request the daemon to stop the running sequence """
+        return self.request({'type': 'stop'})
+
+    def status(self):
+        """ Request the status of the daemon """
+        return self.request({'type': 'status'})
+
+    def wait(self):
+        """
+        Handle the execution log records until the execution is finished
+        Return the result of the execution
+        """
+        while True:
+            message = self.next_message()
+            if message['type'] == 'finished':
+                return message['result']
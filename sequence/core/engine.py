@@ -17,8 +17,14 @@
 # Imports
 import logging
 from sequence.common.parser import parse_sequence_file
+from sequence.common.optimizer import optimize_sequence
 from sequence.common.constant import LOGGER
-from sequence.core.runable import RootSequenceThread
+from sequence.core.runable import RootSequenceThread, WARM_UP_WORKERS
+from sequence.core.compiler import CompiledSequenceThread, CompilationError
+from sequence.core.agent import AgentPool
+from sequence.core.handle import ExecutionHandle
+from sequence.core.journal import (ExecutionJournal, JournalError,
+                                   fingerprint, default_journal_path)
 
 
 # Sequence Engine
@@ -38,33 +44,170 @@ class SequenceEngine():
         self.loaded = False
         self.started = False
         self.interrupted = False
+        self.observers = []
 
-    def load(self, xml_file, max_depth = None, backup = None):
+    def add_observer(self, observer):
+        """
+        Add an observer called with an ExecutionEvent for each block
+        start and end, action phase start and end, stop and backup start
+        of the executions (including the loaded sequence)
+        """
+        self.observers.append(observer)
+        if self.loaded:
+            self.sequence.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """
+        Remove an observer of the executions
+        """
+        self.observers.remove(observer)
+        if self.loaded and observer in self.sequence.observers:
+            self.sequence.observers.remove(observer)
+
+    def load(self, xml_file, max_depth = None, backup = None,
+             journal = None, resume = False, agents = None,
+             warm_up = False, lookahead = 0, session = None,
+             optimize = False, compiled = False):
         """
         Load an xml file
 
         :param xml_file: str -- path of the xml file to load
         :param max_depth: int -- maximum depth for sequence creation
         :param backup: str -- path of the xml backup file
+        :param journal: str -- path of the journal file used to checkpoint
+                               the execution (no checkpoint if None)
+        :param resume: bool -- skip the blocks completed by a previous
+                               execution recorded in the journal file
+        :param agents: list -- addresses of the worker agents running
+                               the remote macros
+        :param warm_up: bool -- run the PreRun of all the actions at load
+        :param lookahead: int -- number of actions which PreRun is run
+                                 ahead of each thread during the execution
+        :param session: EngineSession -- keep the actions alive across
+                                         the runs of the session
+        :param optimize: bool -- inline the trivial macros, merge the waits
+                                 and prune the blocks before the execution
+        :param compiled: bool -- run the sequence as a compiled python module
+                                 if possible
         """
         if self.loaded and self.started:
             if not self.interrupted:
                 return
             self.wait()
         xml_sequence = parse_sequence_file(xml_file, max_depth, backup)
-        self.sequence = RootSequenceThread(xml_sequence)
+        if optimize:
+            optimize_sequence(xml_sequence).log()
+        if resume and not journal:
+            journal = default_journal_path(xml_file)
+        self.load_sequence(xml_sequence, journal, resume, agents,
+                           warm_up, lookahead, session, compiled)
+
+    def load_sequence(self, xml_sequence, journal = None, resume = False,
+                      agents = None, warm_up = False, lookahead = 0,
+                      session = None, compiled = False):
+        """
+        Load an XML sequence already parsed for execution
+
+        :param xml_sequence: XMLSequence -- the sequence to load
+        :param journal: str -- path of the journal file used to checkpoint
+                               the execution (no checkpoint if None)
+        :param resume: bool -- skip the blocks completed by a previous
+                               execution recorded in the journal file
+                               (a JournalError is raised without journal)
+        :param agents: list -- addresses of the worker agents running
+                               the remote macros
+        :param warm_up: bool -- run the PreRun of all the actions at load
+        :param lookahead: int -- number of actions which PreRun is run
+                                 ahead of each thread during the execution
+        :param session: EngineSession -- keep the actions alive across
+                                         the runs of the session
+        :param compiled: bool -- run the sequence as a compiled python module
+                                 if possible (the interpreter is used for
+                                 the unsupported blocks and options)
+        """
+        if self.loaded and self.started:
+            if not self.interrupted:
+                return
+            self.wait()
+        if resume and not journal:
+            msg = u"No journal to resume the execution of {} from"
+            raise JournalError(msg.format(xml_sequence.sequence_id))
+        if compiled:
+            sequence = self.compile_sequence(xml_sequence, journal, agents,
+                                             warm_up, lookahead, session)
+            if sequence is not None:
+                self.sequence = sequence
+                self.loaded = True
+                self.started = False
+                self.interrupted = False
+                return
+        if journal:
+            journal = ExecutionJournal(journal, fingerprint(xml_sequence),
+                                       resume)
+        if agents:
+            agents = AgentPool(agents)
+        sequence = RootSequenceThread(xml_sequence, journal=journal,
+                                      agents=agents, lookahead=lookahead,
+                                      session=session,
+                                      observers=list(self.observers))
+        if warm_up:
+            failed = sequence.warm_up(WARM_UP_WORKERS)
+            if failed:
+                # Close the actions opened by the warm-up
+                sequence.discard_warm_up()
+                names = u", ".join(u"{}/{}".format(ex.log_dict['sequenceID'],
+                                                   ex.block.block_id)
+                                   for ex in failed)
+                raise WarmUpError(u"Warm-up failed for {}".format(names))
+        self.sequence = sequence
         self.loaded = True
         self.started = False
         self.interrupted = False
 
-    def start(self):
+    def compile_sequence(self, xml_sequence, journal, agents, warm_up,
+                         lookahead, session):
         """
-        Start the sequence
+        Return the compiled sequence thread of a sequence, or None if it
+        should run with the interpreter
         """
-        if self.loaded and not self.started:
-            self.sequence.start()
-            self.started = True
-            self.interrupted = False
+        options = [name for name, value in [('journal', journal),
+                                            ('agents', agents),
+                                            ('warm-up', warm_up),
+                                            ('lookahead', lookahead),
+                                            ('session', session)] if value]
+        try:
+            if options:
+                msg = u"Options not supported : {}"
+                raise CompilationError(msg.format(u", ".join(options)))
+            return CompiledSequenceThread(xml_sequence,
+                                          observers=list(self.observers))
+        except CompilationError as exc:
+            log_dict = {'sequenceID': xml_sequence.sequence_id,
+                        'ID':         'Compiler',
+                        'level':      xml_sequence.level,
+                        'type':       'COMPILE'}
+            msg = u"Running with the interpreter : {}".format(exc)
+            LOGGER.info(msg, extra=log_dict)
+            return None
+
+    def start(self, progress_callback=None):
+        """
+        Start the sequence and return its ExecutionHandle
+        (None if there is no sequence to start)
+
+        :param progress_callback: callable -- called with the sequence ID,
+                                  the block ID and the state of each block
+                                  from the start of the execution
+        """
+        if not self.loaded or self.started:
+            return None
+        handle = ExecutionHandle(self.sequence)
+        if progress_callback:
+            handle.add_progress_callback(progress_callback)
+        self.sequence.start()
+        self.started = True
+        self.interrupted = False
+        return handle
 
     def wait(self, timeout=None):
         """
@@ -95,6 +238,18 @@ class SequenceEngine():
 
 
 
+# Warm-up Error class definition
+class WarmUpError(StandardError):
+    """ Custom error raised when the warm-up of an action failed """
+
+    def __init__(self, strerror):
+        StandardError.__init__(self, strerror)
+        self.strerror = strerror
+
+    def __str__(self):
+        return self.strerror
+
+
 # Console logging
 class SequenceLoggingFormatter(logging.Formatter):
     """
@@ -108,7 +263,8 @@ class SequenceLoggingFormatter(logging.Formatter):
         time = time.format(self.formatTime(record, '%H:%M:%S'),
                            int(record.msecs))
         string = u'{} | {:5} | {:16} | {:11} | {:16} | {:7} |'
-        string = string.format(time, record.thread, record.sequenceID,
+        sequence_id = record.sequenceID + (getattr(record, 'tag', None) or u'')
+        string = string.format(time, record.thread, sequence_id,
                                record.type, record.ID, record.levelname)
         if record.msg :
             msg = record.msg
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+""" Module for the execution log records written on the hot path """
+
+#-------------------------------------------------------------------------------
+# Name:        EventRing
+# Purpose:     Buffer the execution log records and forward them lazily
+#              to the logging module
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+from itertools import count
+from threading import Thread, Event, Lock, RLock, current_thread
+from time import time as walltime
+from logging import DEBUG, INFO, WARNING, ERROR, CRITICAL
+from sequence.common.constant import LOGGER
+
+
+# Event ring class definition
+class EventRing():
+    """
+    Preallocated ring buffer of the execution log records
+
+    A record is a tuple (index, time, thread, level, msg, log_dict).
+    The writers never wait: each record takes the next index of a counter
+    (atomic in CPython) and its slot in the ring. If the readers fall
+    behind, the oldest records are overwritten and reported as lost.
+    The on_write callback, if any, is called after each record (it is
+    used to forward the records right away when no execution is running).
+    """
+
+    def __init__(self, size=2**14):
+        """
+        Initialize the ring
+
+        :param size: int -- number of slots (power of 2)
+        """
+        if size < 1 or size & (size - 1):
+            raise ValueError(u"The size of the ring must be a power of 2")
+        self.size = size
+        self.mask = size - 1
+        self.slots = [None] * size
+        self.counter = count()
+        self.on_write = None
+
+    def write(self, level, msg, log_dict):
+        """
+        Write a record in the ring
+        """
+        index = next(self.counter)
+        self.slots[index & self.mask] = (index, walltime(), current_thread(),
+                                         level, msg, log_dict)
+        on_write = self.on_write
+        if on_write is not None:
+            on_write()
+
+    def debug(self, msg, log_dict):
+        """ Write a record with debug level """
+        self.write(DEBUG, msg, log_dict)
+
+    def info(self, msg, log_dict):
+        """ Write a record with info level """
+        self.write(INFO, msg, log_dict)
+
+    def warning(self, msg, log_dict):
+        """ Write a record with warning level """
+        self.write(WARNING, msg, log_dict)
+
+    def error(self, msg, log_dict):
+        """ Write a record with error level """
+        self.write(ERROR, msg, log_dict)
+
+    def critical(self, msg, log_dict):
+        """ Write a record with critical level """
+        self.write(CRITICAL, msg, log_dict)
+
+    def pending(self, index):
+        """
+        Return True if the record with the given index has been written
+        """
+        record = self.slots[index & self.mask]
+        return record is not None and record[0] >= index
+
+    def read(self, index):
+        """
+        Read the records written from the given index
+        Return the records, the next index to read and the number of
+        records lost (overwritten before being read).
+        """
+        records = []
+        lost = 0
+        while True:
+            record = self.slots[index & self.mask]
+            # Not written yet
+            if record is None or record[0] < index:
+                break
+            # Overwritten: skip to the oldest record that may remain
+            if record[0] > index:
+                oldest = record[0] - self.size + 1
+                lost += oldest - index
+                index = oldest
+                continue
+            records.append(record)
+            index += 1
+        return records, index, lost
+
+
+# Logging adapter class definition
+class LoggingAdapter():
+    """
+    Filter of the execution logger forwarding the records of an event ring
+    to its handlers
+
+    The records are consumed periodically while executions are running,
+    at the end of each execution and before each record logged directly,
+    so the handlers receive all the records in order. When no execution
+    is running, the records are forwarded as soon as they are written.
+    A log record is only created if a handler accepts the level of the
+    record.
+    """
+
+    def __init__(self, ring, logger, interval=0.05):
+        """
+        Initialize the adapter
+
+        :param ring: EventRing -- ring to consume
+        :param logger: Logger -- logger whose handlers receive the records
+        :param interval: float -- time between two periodic consumptions
+        """
+        self.ring = ring
+        self.logger = logger
+        self.interval = interval
+        self.index = 0
+        self.lock = RLock()
+        self.state_lock = Lock()
+        self.users = 0
+        self.flusher = None
+        self.stop_event = None
+        ring.on_write = self.flush
+
+    def filter(self, record):
+        """
+        Consume the pending records before a record logged directly
+        """
+        if self.ring.pending(self.index):
+            self.flush()
+        return True
+
+    #### Adapter life cycle ####
+
+    def open(self):
+        """
+        Consume the records periodically until the matching close
+        (called when an execution starts)
+        """
+        with self.state_lock:
+            self.users += 1
+            if self.flusher is None:
+                self.ring.on_write = None
+                self.stop_event = Event()
+                self.flusher = Thread(target=self.flush_loop,
+                                      args=(self.stop_event,),
+                                      name="LoggingAdapter")
+                self.flusher.daemon = True
+                self.flusher.start()
+
+    def close(self):
+        """
+        Consume the remaining records (called when an execution is over)
+        The flusher thread is stopped once the last execution is over.
+        """
+        flusher = None
+        with self.state_lock:
+            self.users -= 1
+            if not self.users:
+                flusher, self.flusher = self.flusher, None
+                self.ring.on_write = self.flush
+                self.stop_event.set()
+        if flusher is not None:
+            flusher.join()
+        self.flush()
+
+    def flush_loop(self, stop_event):
+        """
+        Consume the records periodically until the stop event is set
+        """
+        while not stop_event.wait(self.interval):
+            self.flush()
+
+    #### Consumption ####
+
+    def flush(self):
+        """
+        Forward the pending records to the handlers of the logger
+        """
+        with self.lock:
+            records, self.index, lost = self.ring.read(self.index)
+            if lost and records:
+                msg = u"{} execution log records lost".format(lost)
+                self.emit((None, records[0][1], records[0][2], WARNING, msg,
+                           records[0][5]))
+            handled = {}
+            for record in records:
+                level = record[3]
+                if level not in handled:
+                    handled[level] = self.is_handled(level)
+                if handled[level]:
+                    self.emit(record)
+
+    def is_handled(self, level):
+        """
+        Return True if a handler of the logger accepts the level
+        """
+        if not self.logger.isEnabledFor(level):
+            return False
+        logger = self.logger
+        while logger:
+            for handler in logger.handlers:
+                if level >= handler.level:
+                    return True
+            if not logger.propagate:
+                break
+            logger = logger.parent
+        return False
+
+    def emit(self, record):
+        """
+        Create the log record of a ring record and pass it to the handlers
+        """
+        _, created, thread, level, msg, log_dict = record
+        logger = self.logger
+        log_record = logger.makeRecord(logger.name, level, u"", 0, msg,
+                                       None, None, extra=log_dict)
+        log_record.relativeCreated += (created - log_record.created) * 1000
+        log_record.created = created
+        log_record.msecs = (created - long(created)) * 1000
+        log_record.thread = thread.ident
+        log_record.threadName = thread.name
+        logger.callHandlers(log_record)
+
+
+# Ring shared by all the executions of the process
+EVENT_RING = EventRing()
+
+# Adapter forwarding the ring records to the execution logger
+LOGGING_ADAPTER = LoggingAdapter(EVENT_RING, LOGGER)
+LOGGER.addFilter(LOGGING_ADAPTER)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+""" Module for the handles of the sequence executions """
+
+#-------------------------------------------------------------------------------
+# Name:        ExecutionHandle
+# Purpose:     Follow a sequence execution without waiting threads
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+from threading import Event, Lock
+from sequence.common.constant import LOGGER
+from sequence.core.observer import ProgressObserver
+
+# Optional imports
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+
+
+# Execution handle class definition
+class ExecutionHandle():
+    """
+    Class to follow a sequence execution, returned by SequenceEngine.start
+
+    The done callbacks are called with the handle once the execution and
+    its backups are over. The progress callbacks are called with the
+    sequence ID, the block ID and the state of the block (BES) each time
+    a block starts or ends. Both are called from the execution threads:
+    they should be short, they cannot call SequenceEngine.wait, and a GUI
+    should forward them with a signal.
+    """
+
+    def __init__(self, root):
+        """
+        Initialize the handle of a root sequence thread (not started yet)
+        """
+        self.root = root
+        self.sequence_id = root.xml_sequence.sequence_id
+        self.finished = Event()
+        self.lock = Lock()
+        self.done_callbacks = []
+        root.finished_callbacks.append(self.set_finished)
+
+    def done(self):
+        """
+        Return True if the execution is over
+        """
+        return self.finished.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the execution to finish
+        Return False if the timeout is expired, True otherwise
+        """
+        self.finished.wait(timeout)
+        return self.finished.is_set()
+
+    def result(self, timeout=None):
+        """
+        Wait for the execution to finish and return True if it succeeded
+        Raise an ExecutionTimeoutError if the timeout is expired.
+        """
+        if not self.wait(timeout):
+            msg = u"The execution of {} is not over after {}s"
+            raise ExecutionTimeoutError(msg.format(self.sequence_id, timeout))
+        return bool(self.root.return_value)
+
+    @property
+    def failure(self):
+        """
+        First failing block as a (sequence ID, block ID) tuple, or None
+        """
+        return self.root.failure
+
+    def stop(self):
+        """
+        Stop the execution
+        """
+        self.root.stop()
+
+    def add_done_callback(self, callback):
+        """
+        Add a callback called with the handle when the execution is over
+        (right away if it is already over)
+        """
+        with self.lock:
+            if not self.finished.is_set():
+                self.done_callbacks.append(callback)
+                return
+        self.call(callback)
+
+    def add_progress_callback(self, callback):
+        """
+        Add a callback called with the sequence ID, the block ID and the
+        state of the blocks (the blocks started before are not reported)
+        """
+        self.add_observer(ProgressObserver(callback))
+
+    def add_observer(self, observer):
+        """
+        Add an observer called with the ExecutionEvent of the execution
+        (the events sent before are not reported)
+        """
+        self.root.observers.append(observer)
+
+    def as_future(self):
+        """
+        Return a concurrent.futures.Future set with the result of the
+        execution, to be waited or awaited by other frameworks
+        (requires the futures package)
+        """
+        if futures is None:
+            raise ImportError(u"The futures package is required")
+        future = futures.Future()
+        future.set_running_or_notify_cancel()
+        self.add_done_callback(
+            lambda handle: future.set_result(bool(handle.root.return_value)))
+        return future
+
+    def set_finished(self, root):
+        """
+        Mark the execution as over and call the done callbacks
+        (called by the root sequence thread)
+        """
+        with self.lock:
+            self.finished.set()
+            callbacks, self.done_callbacks = self.done_callbacks, []
+        for callback in callbacks:
+            self.call(callback)
+
+    def call(self, callback):
+        """
+        Call a done callback, logging its errors
+        """
+        try:
+            callback(self)
+        except Exception as exc:
+            msg = u"Error in a done callback : {!r}".format(exc)
+            LOGGER.error(msg, extra=self.root.stop_thread.log_dict)
+
+
+# Execution Timeout Error class definition
+class ExecutionTimeoutError(StandardError):
+    """ Custom error raised when an execution is not over in time """
+
+    def __init__(self, strerror):
+        StandardError.__init__(self, strerror)
+        self.strerror = strerror
+
+    def __str__(self):
+        return self.strerror
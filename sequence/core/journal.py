@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+""" Module for checkpointing sequence executions """
+
+#-------------------------------------------------------------------------------
+# Name:        ExecutionJournal
+# Purpose:     Checkpoint the progress of an execution to resume it later
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+import os
+import json
+import hashlib
+from collections import deque
+from threading import Thread, Event
+from lxml import etree as ET
+
+
+# Execution journal class definition
+class ExecutionJournal():
+    """
+    Class to record the progress of an execution in a journal file
+
+    The progress is made of the completed blocks of each runable sequence,
+    the iteration index of each macro, the choice of each conditional block
+    and the time references.
+    Records are buffered and written in batches by a flusher thread,
+    so recording a progress costs a single append on the hot path.
+    The progress of an iteration is dropped once the iteration is recorded
+    as completed, and the journal file is rewritten with the current
+    progress when it is mostly made of dropped records, so a long running
+    loop keeps a bounded journal.
+    """
+
+    def __init__(self, file_name, fingerprint, resume=False, interval=1.0,
+                 compact_size=1000):
+        """
+        Initialize the journal
+
+        :param file_name: str -- path of the journal file
+        :param fingerprint: str -- fingerprint of the compiled sequence
+        :param resume: bool -- load the progress saved in the journal file
+        :param interval: float -- time between two writes (in seconds)
+        :param compact_size: int -- number of dropped records above which
+                                    the journal file is rewritten
+        """
+        self.file_name = file_name
+        self.fingerprint = fingerprint
+        self.interval = interval
+        self.compact_size = compact_size
+        self.completed = set()
+        self.references = {}
+        self.iterations = {}
+        self.choices = {}
+        self.lines = 0
+        self.buffer = deque()
+        self.stop_event = Event()
+        self.flusher = None
+        self.journal_file = None
+        if resume and os.path.isfile(file_name):
+            self.load()
+
+    def load(self):
+        """
+        Load the progress saved in the journal file
+        """
+        with open(self.file_name) as journal_file:
+            lines = journal_file.read().splitlines()
+        if not lines:
+            return
+        header = json.loads(lines[0])
+        if header.get('fingerprint') != self.fingerprint:
+            msg = u"The journal {} doesn't match the loaded sequence"
+            msg = msg.format(self.file_name)
+            raise JournalError(msg)
+        for line in lines[1:]:
+            # Ignore a line truncated by an interruption
+            try:
+                self.apply(json.loads(line))
+            except ValueError:
+                break
+
+    def apply(self, record):
+        """
+        Apply a journal record to the progress
+        """
+        kind, path, value = record
+        if kind == 'block':
+            self.completed.add((path, value))
+        elif kind == 'reference':
+            self.references[path] = value
+        elif kind == 'iteration':
+            self.iterations[path] = value
+            self.drop(u"{}#{}".format(path, value))
+        elif kind == 'choice':
+            self.choices[path] = value
+
+    def drop(self, prefix):
+        """
+        Drop the progress of the sequences under a path prefix
+        (the path of a completed iteration)
+        """
+        def match(path):
+            return path == prefix or path.startswith(prefix + u'/')
+        if any(match(path) for path, _ in self.completed):
+            self.completed = set(item for item in self.completed
+                                 if not match(item[0]))
+        for table in (self.references, self.iterations, self.choices):
+            for path in [path for path in table if match(path)]:
+                del table[path]
+
+    def size(self):
+        """
+        Return the number of records of the current progress
+        """
+        return len(self.completed) + len(self.references) + \
+               len(self.iterations) + len(self.choices)
+
+    def records(self):
+        """
+        Generate the records corresponding to the current progress
+        """
+        for path, block_id in self.completed:
+            yield ['block', path, block_id]
+        for path, value in self.references.items():
+            yield ['reference', path, value]
+        for path, value in self.iterations.items():
+            yield ['iteration', path, value]
+        for path, value in self.choices.items():
+            yield ['choice', path, value]
+
+    #### Journal life cycle ####
+
+    def open(self):
+        """
+        Rewrite the journal file and start the flusher thread
+        """
+        self.journal_file = open(self.file_name, 'w')
+        self.lines = 0
+        self.write([{'fingerprint': self.fingerprint}])
+        self.write(self.records())
+        self.stop_event.clear()
+        self.flusher = Thread(target=self.flush_loop, name="JournalFlusher")
+        self.flusher.daemon = True
+        self.flusher.start()
+
+    def close(self, discard=False):
+        """
+        Stop the flusher thread, flush the remaining records and close the
+        journal file. The journal file is deleted if discard is True.
+        """
+        if self.journal_file is None:
+            return
+        self.stop_event.set()
+        self.flusher.join()
+        self.flush()
+        self.journal_file.close()
+        self.journal_file = None
+        if discard:
+            os.remove(self.file_name)
+
+    def flush_loop(self):
+        """
+        Write the buffered records periodically
+        """
+        while not self.stop_event.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        """
+        Apply and write the buffered records
+        The journal file is compacted if it has too many dropped records.
+        """
+        records = []
+        while self.buffer:
+            record = self.buffer.popleft()
+            self.apply(record)
+            records.append(record)
+        if records:
+            self.write(records)
+        if self.lines > 2 * self.size() + self.compact_size:
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrite the journal file with the current progress only
+        """
+        temp_name = self.file_name + '.tmp'
+        lines = [{'fingerprint': self.fingerprint}] + list(self.records())
+        with open(temp_name, 'w') as temp_file:
+            temp_file.write(self.dumps(lines))
+        self.journal_file.close()
+        os.rename(temp_name, self.file_name)
+        self.journal_file = open(self.file_name, 'a')
+        self.lines = len(lines)
+
+    def write(self, records):
+        """
+        Write records to the journal file
+        """
+        records = list(records)
+        self.journal_file.write(self.dumps(records))
+        self.journal_file.flush()
+        self.lines += len(records)
+
+    def dumps(self, records):
+        """
+        Return the lines of the journal file for a list of records
+        """
+        return "".join(json.dumps(record) + "\n" for record in records)
+
+    #### Recording methods ####
+
+    def record_block(self, path, block_id):
+        """ Record a completed block """
+        self.buffer.append(['block', path, block_id])
+
+    def record_reference(self, path, value):
+        """ Record a time reference (as a wall-clock timestamp) """
+        self.buffer.append(['reference', path, value])
+
+    def record_iteration(self, path, index):
+        """
+        Record the number of completed iterations of a macro
+        (the progress of the last completed iteration is dropped)
+        """
+        self.buffer.append(['iteration', path, index])
+
+    def record_choice(self, path, choice):
+        """ Record the branch chosen by a conditional block """
+        self.buffer.append(['choice', path, choice])
+
+    #### Query methods ####
+
+    def is_completed(self, path, block_id):
+        """ Test if a block has been completed in a previous execution """
+        return (path, block_id) in self.completed
+
+    def get_reference(self, path):
+        """ Return the saved time reference of a sequence, or None """
+        return self.references.get(path)
+
+    def get_iteration(self, path):
+        """ Return the number of completed iterations of a macro """
+        return self.iterations.get(path, 0)
+
+    def get_choice(self, path):
+        """ Return the branch chosen by a conditional block, or 0 """
+        return self.choices.get(path, 0)
+
+
+# Sequence fingerprint
+def fingerprint(xml_sequence):
+    """
+    Return a fingerprint identifying a compiled XML sequence
+    """
+    data = ET.tostring(xml_sequence.get_element())
+    return hashlib.sha1(data).hexdigest()
+
+
+# Default journal path
+def default_journal_path(xml_file):
+    """
+    Return the default journal path associated to a sequence file
+    """
+    return xml_file + '.journal'
+
+
+# Journal Error class definition
+class JournalError(StandardError):
+    """ Custom error raised when a journal cannot be used """
+
+    def __init__(self, strerror):
+        StandardError.__init__(self, strerror)
+        self.strerror = strerror
+
+    def __str__(self):
+        return self.strerror
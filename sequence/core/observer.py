@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+""" Module for observing the sequence executions """
+
+#-------------------------------------------------------------------------------
+# Name:        ExecutionEvent
+# Purpose:     Notify the observers of an execution with compact events
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+from timeit import default_timer as time
+from sequence.common.constant import LOGGER, EVT, BES
+
+
+# Notify the observers
+def notify(observers, log_dict, kind, phase=None, result=None):
+    """
+    Create an event and call the observers with it, logging their errors
+    The callers only call it if the list of observers is not empty.
+
+    :param observers: list -- callables taking an ExecutionEvent
+    :param log_dict: dict -- logging dictionary of the block
+    :param kind: str -- kind of event (EVT)
+    :param phase: str -- phase of the action (PreRun, Run or PostRun)
+    :param result: bool -- result of the block or of the phase
+    """
+    event = ExecutionEvent(kind, log_dict['sequenceID'], log_dict['ID'],
+                           phase, result)
+    for observer in observers:
+        try:
+            observer(event)
+        except Exception as exc:
+            msg = u"Error in an execution observer : {!r}".format(exc)
+            LOGGER.error(msg, extra=log_dict)
+
+
+# Execution event class definition
+class ExecutionEvent(object):
+    """
+    Class for the events sent to the observers of an execution
+
+    - BLOCK_START and BLOCK_END: a block starts or ends (with its result)
+    - PHASE_START and PHASE_END: a phase of an action starts or ends
+      (PreRun, Run or PostRun, with its result)
+    - STOP: the stop mecanism of a sequence is set
+    - BACKUP_START: a backup sequence starts
+
+    The events of a backup carry the sequence ID of the backup.
+    """
+
+    __slots__ = ('kind', 'time', 'sequence_id', 'block_id', 'phase', 'result')
+
+    def __init__(self, kind, sequence_id, block_id, phase=None, result=None):
+        self.kind = kind
+        self.time = time()
+        self.sequence_id = sequence_id
+        self.block_id = block_id
+        self.phase = phase
+        self.result = result
+
+    def __repr__(self):
+        values = [self.kind, self.sequence_id, self.block_id]
+        values += [value for value in (self.phase, self.result)
+                   if value is not None]
+        return u"ExecutionEvent({})".format(u", ".join(map(repr, values)))
+
+
+# Progress observer class definition
+class ProgressObserver():
+    """
+    Observer calling a callback with the sequence ID, the block ID and
+    the execution state (BES) of the blocks
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def __call__(self, event):
+        if event.kind == EVT.BLOCK_START:
+            self.callback(event.sequence_id, event.block_id, BES.BG)
+        elif event.kind == EVT.BLOCK_END:
+            state = BES.OK if event.result else BES.KO
+            self.callback(event.sequence_id, event.block_id, state)
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+""" Module for the shared resources of an execution """
+
+#-------------------------------------------------------------------------------
+# Name:        Resource
+# Purpose:     Cap the concurrent accesses to shared devices
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+from collections import deque, OrderedDict
+from threading import Condition, Lock
+from timeit import default_timer as time
+
+# Imports from sequence
+from sequence.common.constant import LOGGER
+
+
+# Resource class definition
+class Resource():
+    """
+    Class implementing a fair semaphore with an optional rate limit
+
+    The contenders are served in their arrival order. If a rate is given,
+    the acquisitions are limited by a token bucket filled with ``rate``
+    tokens per second, holding up to ``capacity`` tokens.
+    """
+
+    def __init__(self, name, capacity=1, rate=0.0):
+        """
+        Initialize the resource
+
+        :param name: str -- name of the resource
+        :param capacity: int -- maximum number of simultaneous holders
+        :param rate: float -- maximum acquisitions per second (0 if none)
+        """
+        self.name = name
+        self.capacity = capacity
+        self.rate = rate
+        self.available = capacity
+        self.queue = deque()
+        self.condition = Condition(Lock())
+        # Token bucket
+        self.tokens = float(capacity)
+        self.stamp = time()
+        # Statistics
+        self.count = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def take_token(self):
+        """
+        Take a token from the bucket
+        Return the delay before a token is available (0 if taken)
+        """
+        if not self.rate:
+            return 0
+        now = time()
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self, stop_thread):
+        """
+        Wait for the resource in arrival order
+        Return the waiting time, or None if the stop mecanism is set
+        """
+        ticket = object()
+        start = time()
+        with self.condition:
+            self.queue.append(ticket)
+            try:
+                while True:
+                    if stop_thread.is_set():
+                        return None
+                    if self.queue[0] is ticket and self.available:
+                        delay = self.take_token()
+                        if not delay:
+                            break
+                        self.condition.wait(delay)
+                    else:
+                        self.condition.wait()
+            finally:
+                self.queue.remove(ticket)
+                self.condition.notify_all()
+            self.available -= 1
+            waited = time() - start
+            self.count += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if waited > 0.001:
+                self.waits += 1
+            return waited
+
+    def release(self):
+        """
+        Release the resource
+        """
+        with self.condition:
+            self.available += 1
+            self.condition.notify_all()
+
+    def wake_up(self):
+        """
+        Wake up the contenders so they can check the stop mecanism
+        """
+        with self.condition:
+            self.condition.notify_all()
+
+    def get_statistics(self):
+        """
+        Return a string describing the waiting times
+        """
+        mean = self.total_wait / self.count if self.count else 0.0
+        msg = u"Resource {} : {} acquisitions, {} waits, "
+        msg += u"mean wait {:.3f}s, max wait {:.3f}s"
+        return msg.format(self.name, self.count, self.waits,
+                          mean, self.max_wait)
+
+
+# Resource manager class definition
+class ResourceManager():
+    """
+    Class to manage the resources of an execution
+
+    The resources are declared in the sequence and its subsequences.
+    An undeclared resource is a mutex.
+    """
+
+    def __init__(self, xml_sequence=None):
+        """
+        Initialize the manager with the declarations of an XML sequence
+        """
+        self.resources = OrderedDict()
+        self.lock = Lock()
+        if xml_sequence is not None:
+            self.declare(xml_sequence)
+
+    def declare(self, xml_sequence):
+        """
+        Create the resources declared in a sequence and its subsequences
+        """
+        stack, visited = [xml_sequence], set()
+        while stack:
+            sequence = stack.pop()
+            if id(sequence) in visited:
+                continue
+            visited.add(id(sequence))
+            for name, (capacity, rate) in sequence.resources.items():
+                if name not in self.resources:
+                    self.resources[name] = Resource(name, capacity, rate)
+            stack.extend(sequence.subsequences)
+
+    def get(self, name):
+        """
+        Return a resource, create it as a mutex if undeclared
+        """
+        with self.lock:
+            if name not in self.resources:
+                self.resources[name] = Resource(name)
+            return self.resources[name]
+
+    def acquire(self, names, stop_thread, log_dict):
+        """
+        Acquire resources in a consistent order to avoid dead locks
+        Return False if the stop mecanism has been set while waiting
+        """
+        acquired = []
+        for name in sorted(names):
+            resource = self.get(name)
+            waited = resource.acquire(stop_thread)
+            if waited is None:
+                self.release(acquired)
+                return False
+            acquired.append(name)
+            if waited > 0.001:
+                msg = u"Resource {} acquired (waited {:.3f}s)"
+                LOGGER.info(msg.format(name, waited), extra=log_dict)
+        return True
+
+    def release(self, names):
+        """
+        Release resources
+        """
+        for name in names:
+            self.get(name).release()
+
+    def set(self):
+        """
+        Wake up all the contenders (stop mecanism starter interface)
+        """
+        with self.lock:
+            resources = self.resources.values()
+        for resource in resources:
+            resource.wake_up()
+
+    def log_statistics(self, log_dict):
+        """
+        Log the waiting time statistics of the used resources
+        """
+        for resource in self.resources.values():
+            if resource.count:
+                LOGGER.info(resource.get_statistics(), extra=log_dict)
@@ -15,11 +15,25 @@
 
 
 # Imports
-from threading import Thread, Event
-from time import sleep
+from threading import Thread, Event, Lock, Condition
+from multiprocessing.pool import ThreadPool
+from time import sleep, time as walltime
 from timeit import default_timer as time
-from sequence.common.constant import XBM, LOGGER, BES
+from sequence.common.constant import XBM, LOGGER, BES, BPL, MMD, EVT
 from sequence.action.abstract import create_action
+from sequence.common.parser import InvalidSequenceError
+from sequence.common.protocol import serialize_sequence
+from sequence.core.resource import ResourceManager
+from sequence.core.blackboard import Blackboard
+from sequence.core.cache import ACTION_CACHE
+from sequence.core.observer import notify
+from sequence.core.eventlog import EVENT_RING, LOGGING_ADAPTER
+from sequence.common.event import FdEvent, Trigger, parse_source
+from sequence.common.expression import Scope, Expression, ExpressionError
+from sequence.common.expression import compile_arguments
+
+# Number of threads running the warm-up of the actions
+WARM_UP_WORKERS = 4
 
 # Runable Sequence class definition
 class RunableSequence():
@@ -28,13 +42,29 @@ class RunableSequence():
     class TimeReference():
         """ Class for creating a specific time reference """
 
-        def __init__(self):
+        def __init__(self, journal=None, path=None):
             """ Initializer the time reference """
             self.ref = time()
+            self.journal = journal
+            self.path = path
 
         def reset(self):
             """ Reset the time reference """
             self.ref = time()
+            if self.journal:
+                wall_ref = walltime() - (time() - self.ref)
+                self.journal.record_reference(self.path, wall_ref)
+
+        def restore(self):
+            """
+            Restore the time reference saved in the journal
+            Return False if there is no reference to restore
+            """
+            wall_ref = self.journal and self.journal.get_reference(self.path)
+            if wall_ref is None:
+                return False
+            self.ref = time() - (walltime() - wall_ref)
+            return True
 
         def wait(self, arg):
             """ Wait until the time reference equals the time parameter """
@@ -43,12 +73,16 @@ class RunableSequence():
                 sleep(delta)
                 delta = arg + self.ref -  time()
 
-    def __init__(self, xml_sequence, stop_thread, root=False):
+    def __init__(self, xml_sequence, stop_thread, root=False, path=None,
+                 tag=u'', gate=None):
         """ Initialize a runable sequence
 
         :param xml_sequence: xml sequence to get a runable sequence from
         :param stop_thread: the stop mecansim to associate
         :param root: True if assiociated to a RootSequenceThread
+        :param path: unique path of the sequence in the execution (journal)
+        :param tag: iteration tag of the logs (concurrent macro iterations)
+        :param gate: PipelineGate ordering the blocks of pipelined iterations
         """
         self.xml_sequence = xml_sequence
         self.threads = []
@@ -56,8 +90,15 @@ class RunableSequence():
         self.starter = Event()
         self.end_threads = []
         self.backup = None
+        self.backup_lock = Lock()
         self.root = root
-        self.time_ref = self.TimeReference()
+        self.started = False
+        self.path = path or xml_sequence.sequence_id
+        self.tag = tag
+        self.gate = gate
+        self.scope = Scope()
+        self.journal = stop_thread.main_thread.journal
+        self.time_ref = self.TimeReference(self.journal, self.path)
         self.stop_thread = stop_thread
         self.stop_thread.add_starter(self.starter)
         self.load()
@@ -86,16 +127,62 @@ class RunableSequence():
         for thread in self.threads:
             if thread.current_block in self.branch_dict:
                 self.branch_dict[thread.current_block].add_thread(thread)
-        # Load backup_sequence:
-        if self.xml_sequence.backup:
+        # Load backup_sequence (unless it is built when required)
+        policy = self.xml_sequence.backup_policy
+        if self.xml_sequence.backup and policy != BPL.LAZY:
             self.backup = RootSequenceThread(self.xml_sequence.backup,
                                                       self.stop_thread)
+            if policy == BPL.PREWARM:
+                self.backup.prewarm()
+                self.stop_thread.main_thread.prewarmed.append(self.backup)
 
-    def run(self):
-        """ Run the sequence """
+    def get_backup(self):
+        """ Return the backup sequence, build it if required """
+        if self.backup is None and self.xml_sequence.backup:
+            with self.backup_lock:
+                if self.backup is None:
+                    self.backup = RootSequenceThread(self.xml_sequence.backup,
+                                                     self.stop_thread)
+        return self.backup
+
+    def get_executions(self):
+        """ Generate the executions of the sequence and its subsequences """
+        for thread in self.threads:
+            for execution in thread.execution_chain:
+                yield execution
+                for sequence in execution.get_sequences():
+                    for sub_execution in sequence.get_executions():
+                        yield sub_execution
+
+    def reset(self):
+        """ Prepare the sequence to run again, reusing its executions """
+        clones = {thread: thread.clone() for thread in self.threads}
+        for execution in self.branch_dict.values():
+            execution.wait_list = [clones[thread]
+                                   for thread in execution.wait_list]
+            execution.event.clear()
+        self.end_threads = [clones[thread] for thread in self.end_threads]
+        self.threads = [clones[thread] for thread in self.threads]
+        self.starter.clear()
+
+    def run(self, path=None, scope=None):
+        """ Run the sequence
+
+        :param path: unique path of this run in the execution (journal)
+        :param scope: Scope -- names available in the expressions of the
+                               parameters (macro arguments)
+        """
+        if self.started:
+            self.reset()
+        self.started = True
+        if path:
+            self.path = self.time_ref.path = path
+        if scope is not None:
+            self.scope = scope
         for thread in self.threads:
             thread.start()
-        self.time_ref.reset()
+        if not self.time_ref.restore():
+            self.time_ref.reset()
         self.starter.set()
         res = True
         for end_thread in self.end_threads:
@@ -107,12 +194,17 @@ class RunableSequence():
 # Beautiful Decorator
 def logdecorator(f):
     def wrapper(self, *args, **kwargs):
-        LOGGER.debug(BES.BG, extra=self.log_dict)
+        EVENT_RING.debug(BES.BG, self.log_dict)
+        observers = self.stop_thread.main_thread.observers
+        if observers:
+            notify(observers, self.log_dict, EVT.BLOCK_START)
         res = f(self, *args, **kwargs)
         if res:
-            LOGGER.debug(BES.OK, extra=self.log_dict)
+            EVENT_RING.debug(BES.OK, self.log_dict)
         else:
-            LOGGER.debug(BES.KO, extra=self.log_dict)
+            EVENT_RING.debug(BES.KO, self.log_dict)
+        if observers:
+            notify(observers, self.log_dict, EVT.BLOCK_END, result=bool(res))
         return res
     return wrapper
 
@@ -135,16 +227,60 @@ class AbstractExecution():
         self.log_dict = {'sequenceID': thread.sequence.xml_sequence.sequence_id,
                          'ID':    self.block.block_id,
                          'level': self.level,
-                         'type':  self.block.block_type.upper()}
+                         'type':  self.block.block_type.upper(),
+                         'tag':   thread.sequence.tag}
 
     @logdecorator
     def execute(self):
         """
         Method to override
         """
-        LOGGER.info(None, extra=self.log_dict)
+        EVENT_RING.info(None, self.log_dict)
         return True
 
+    @property
+    def path(self):
+        """
+        Unique path of the execution (the sequence can run several times)
+        """
+        return u"{}/{}".format(self.thread.sequence.path, self.block.block_id)
+
+    def resume(self):
+        """
+        Skip the execution if it has been completed in a previous execution
+        Return True if the execution has been skipped
+        """
+        path = self.thread.sequence.path
+        if not self.thread.journal.is_completed(path, self.block.block_id):
+            return False
+        EVENT_RING.info('Skipped (completed before)', self.log_dict)
+        return True
+
+    def checkpoint(self):
+        """
+        Record the execution as completed
+        """
+        path = self.thread.sequence.path
+        self.thread.journal.record_block(path, self.block.block_id)
+
+    def get_sequences(self):
+        """
+        Return the runable subsequences of the execution
+        """
+        return []
+
+    def warm_up(self):
+        """
+        Prepare the execution ahead of time
+        """
+        pass
+
+    def warm_up_async(self, pool):
+        """
+        Prepare the execution ahead of time in a thread pool
+        """
+        pass
+
 
 class BranchExecution(AbstractExecution):
     """
@@ -176,13 +312,19 @@ class BranchExecution(AbstractExecution):
             thread.join()
         if len(self.block.inputs) > 1:
             msg = "The {} threads have met".format(len(self.block.inputs))
-            LOGGER.info(msg, extra=self.log_dict)
+            EVENT_RING.info(msg, self.log_dict)
         if len(self.block.outputs) > 1:
             msg = "{} threads have been started".format(len(self.block.outputs))
-            LOGGER.info(msg, extra=self.log_dict)
+            EVENT_RING.info(msg, self.log_dict)
         self.event.set()
         return True
 
+    def resume(self):
+        """
+        Branches always run since they start and join threads
+        """
+        return False
+
 class ResetTimeExecution(AbstractExecution):
     """
     Class implementing a time reset execution
@@ -194,7 +336,7 @@ class ResetTimeExecution(AbstractExecution):
         Run the execution
         """
         self.time_ref.reset()
-        LOGGER.info(None, extra=self.log_dict)
+        EVENT_RING.info(None, self.log_dict)
         return True
 
 class WaitExecution(AbstractExecution):
@@ -217,15 +359,71 @@ class WaitExecution(AbstractExecution):
          """
         if self.absolute:
             msg = 'Wait for t={}s'.format(self.time)
-            LOGGER.info(msg, extra=self.log_dict)
+            EVENT_RING.info(msg, self.log_dict)
             self.time_ref.wait(self.time)
         else :
             msg = 'Wait {}s'.format(self.time)
-            LOGGER.info(msg, extra=self.log_dict)
+            EVENT_RING.info(msg, self.log_dict)
             sleep(self.time)
-        LOGGER.info('Done', extra=self.log_dict)
+        EVENT_RING.info('Done', self.log_dict)
         return True
 
+class TriggerExecution(AbstractExecution):
+    """
+    Class implementing a trigger execution
+    """
+
+    def __init__(self, thread):
+        """
+        Initialize the execution with the parent thread
+        """
+        AbstractExecution.__init__(self, thread)
+        self.timeout = self.block.properties.timeout or None
+        self.source = self.block.properties.source
+        parse_source(self.source)
+        # The pipe of the stop event only exists during the wait
+        self.lock = Lock()
+        self.stop_event = None
+        self.stop_thread.add_starter(self)
+
+    def set(self):
+        """
+        Interrupt the wait of the trigger
+        (stop mecanism starter interface)
+        """
+        with self.lock:
+            if self.stop_event:
+                self.stop_event.set()
+
+    @logdecorator
+    def execute(self):
+        """
+        Run the execution
+        """
+        msg = u"Wait for {}".format(self.source)
+        if self.timeout:
+            msg += u" (timeout {}s)".format(self.timeout)
+        EVENT_RING.info(msg, self.log_dict)
+        stop_event = FdEvent()
+        with self.lock:
+            self.stop_event = stop_event
+        if self.stop_thread.is_set():
+            stop_event.set()
+        try:
+            result = Trigger(self.source, stop_event).wait(self.timeout)
+        except EnvironmentError as exc:
+            EVENT_RING.error(repr(exc), self.log_dict)
+            return False
+        finally:
+            with self.lock:
+                self.stop_event = None
+            stop_event.close()
+        if result:
+            EVENT_RING.info('Triggered', self.log_dict)
+        elif not self.stop_thread.is_set():
+            EVENT_RING.warning('Timeout', self.log_dict)
+        return result
+
 class ActionExecution(AbstractExecution):
     """
     Class implementing an action execution
@@ -235,14 +433,77 @@ class ActionExecution(AbstractExecution):
         Initialize the execution with the parent thread
         """
         AbstractExecution.__init__(self, thread)
-        self.action = create_action(self.block)
+        main_thread = thread.stop_thread.main_thread
+        if main_thread.session:
+            key = (main_thread.backup_level, self.path)
+            self.action = main_thread.session.get_action(self.block, key)
+        else:
+            self.action = create_action(self.block)
+        self.warming = None
+        self.resources = [name.strip()
+                          for name in self.block.properties.resource.split(';')
+                          if name.strip()]
+
+    def warm_up(self):
+        """
+        Run the PreRun of the action ahead of time
+        """
+        return self.action.warm_up(self.log_dict)
+
+    def warm_up_async(self, pool):
+        """
+        Run the PreRun of the action ahead of time in a thread pool
+        """
+        if self.warming is None:
+            self.warming = pool.apply_async(self.warm_up)
 
     @logdecorator
     def execute(self):
         """
         Run the execution
         """
-        return self.action.execute(self.stop_thread, self.log_dict)
+        # Wait for the warm-up to finish
+        if self.warming is not None:
+            self.warming.wait()
+            self.warming = None
+        # Evaluate the expressions of the parameters
+        if not self.action.evaluate(self.thread.sequence.scope,
+                                    self.log_dict):
+            return False
+        if not self.action.cacheable:
+            return self.run_action()
+        # Reuse the result of an equivalent execution
+        result, outputs, hit = ACTION_CACHE.call(self.action.get_cache_key(),
+                                                 self.action.cache_ttl,
+                                                 self.run_cached,
+                                                 self.stop_thread)
+        if hit:
+            EVENT_RING.info(u"Result reused from the cache", self.log_dict)
+            self.action.skip()
+            self.stop_thread.main_thread.blackboard.replay(outputs)
+        return result
+
+    def run_cached(self):
+        """
+        Run the action, return its result and its publications
+        """
+        return self.run_action(), self.action.get_publications()
+
+    def run_action(self):
+        """
+        Run the action, holding its resources
+        """
+        if not self.resources:
+            return self.action.execute(self.stop_thread, self.log_dict)
+        # Hold the resources during the action execution
+        manager = self.stop_thread.main_thread.resources
+        if not manager.acquire(self.resources, self.stop_thread,
+                               self.log_dict):
+            return False
+        try:
+            return self.action.execute(self.stop_thread, self.log_dict)
+        finally:
+            manager.release(self.resources)
 
 class SubsequenceExecution(AbstractExecution):
     """
@@ -258,10 +519,70 @@ class SubsequenceExecution(AbstractExecution):
         self.tick = self.block.properties.tick
         self.iteration = self.block.properties.iteration
         self.sequence_id = self.block.properties.sequence_id
-        if self.block.subsequence:
+        self.mode = self.block.properties.mode
+        self.concurrency = self.block.properties.concurrency
+        self.agents = thread.stop_thread.main_thread.agents
+        self.remote = bool(self.block.properties.remote and self.agents)
+        # Arguments given to the subsequence (compiled once)
+        self.arguments = compile_arguments(self.block.parameters)
+        # The logs of concurrent iterations are tagged with their number
+        concurrent = self.mode != MMD.SEQUENTIAL and self.iteration > 1
+        tags = [thread.sequence.tag + (u"#{}".format(i+1) if concurrent
+                                       else u'')
+                for i in range(self.iteration)]
+        # The pipelined iterations enter each block in order
+        self.pipeline = None
+        if self.mode == MMD.PIPELINED and concurrent and not self.remote:
+            self.pipeline = Pipeline(self.iteration)
+            self.stop_thread.add_starter(self.pipeline)
+        if self.block.subsequence and self.remote:
+            self.check_remote(self.block.subsequence)
+            self.data = serialize_sequence(self.block.subsequence)
+            self.sequences = [None] * self.iteration
+        elif self.block.subsequence:
             self.sequences = [RunableSequence(self.block.subsequence,
-                                              self.thread.stop_thread)
-                              for _ in range(self.iteration)]
+                                              self.thread.stop_thread,
+                                              path=u"{}#{}".format(self.path,
+                                                                   i+1),
+                                              tag=tags[i],
+                                              gate=self.pipeline and
+                                              self.pipeline.gates[i])
+                              for i in range(self.iteration)]
+
+    def get_sequences(self):
+        """
+        Return the runable subsequences of the execution
+        """
+        return [sequence for sequence in self.sequences if sequence]
+
+    def check_remote(self, xml_sequence):
+        """
+        Check that a subsequence can run on an agent: the resources and
+        the blackboard of the execution are not shared with the agents
+        """
+        for block in xml_sequence.blocks:
+            if block.properties.resource:
+                msg = u"The block '{}' of the remote macro '{}' uses "
+                msg += u"resources"
+                raise InvalidSequenceError(msg.format(block.block_id,
+                                                      self.block.block_id))
+            action = getattr(block, 'action', None)
+            if action is not None and action.uses_blackboard():
+                msg = u"The block '{}' of the remote macro '{}' uses "
+                msg += u"the blackboard"
+                raise InvalidSequenceError(msg.format(block.block_id,
+                                                      self.block.block_id))
+        for subsequence in xml_sequence.subsequences:
+            self.check_remote(subsequence)
+
+    def run_predicate(self):
+        """
+        Run the predicate action of the loop and conditional blocks
+        """
+        if not self.predicate.evaluate(self.thread.sequence.scope,
+                                       self.log_dict):
+            return False
+        return self.predicate.execute(self.stop_thread, self.log_dict)
 
     @logdecorator
     def execute(self):
@@ -270,21 +591,328 @@ class SubsequenceExecution(AbstractExecution):
         """
         if not self.sequences:
             msg = u"No subsequence to run"
-            LOGGER.info(msg, extra=self.log_dict)
+            EVENT_RING.info(msg, self.log_dict)
             return True
-        for i, sequence in enumerate(self.sequences):
-            msg = u"Call : {} ".format(self.sequence_id)
-            if self.iteration > 1:
-                msg += u"(iteration {})".format(i+1)
-            LOGGER.info(msg, extra=self.log_dict)
-            if not sequence.run():
+        journal = self.thread.journal
+        first = journal.get_iteration(self.path) if journal else 0
+        for i in range(first):
+            msg = u"Skip : {} (iteration {})".format(self.sequence_id, i+1)
+            EVENT_RING.info(msg, self.log_dict)
+        if self.mode != MMD.SEQUENTIAL and self.iteration > 1:
+            return self.execute_concurrent(first)
+        for i in range(first, self.iteration):
+            if not self.run_iteration(i):
                 return False
             if self.tick:
                 msg = 'Tick ({}s)'.format(self.tick)
-                LOGGER.info(msg, extra=self.log_dict)
+                EVENT_RING.info(msg, self.log_dict)
                 sleep(self.tick)
+            if journal:
+                journal.record_iteration(self.path, i+1)
         return True
 
+    def run_iteration(self, index):
+        """
+        Run an iteration of the subsequence
+        """
+        msg = u"Call : {} ".format(self.sequence_id)
+        if self.iteration > 1:
+            msg += u"(iteration {})".format(index+1)
+        EVENT_RING.info(msg, self.log_dict)
+        scope = self.get_scope(index)
+        if scope is None:
+            return False
+        if self.remote:
+            return self.agents.run(self.data, self.stop_thread, self.log_dict,
+                                   scope=scope.flatten())
+        return self.sequences[index].run(u"{}#{}".format(self.path, index+1),
+                                         scope)
+
+    def get_scope(self, index):
+        """
+        Return the scope of an iteration, with the arguments evaluated in
+        the scope of the calling sequence (None if an evaluation failed)
+        """
+        parent = self.thread.sequence.scope
+        scope = Scope(parent, iteration=index+1)
+        for name, value in self.arguments.items():
+            if isinstance(value, Expression):
+                try:
+                    value = value.evaluate(parent)
+                except ExpressionError as exc:
+                    msg = u"Argument '{}': {}".format(name, exc)
+                    EVENT_RING.error(msg, self.log_dict)
+                    return None
+            scope[name] = value
+        return scope
+
+    def execute_concurrent(self, first):
+        """
+        Run the iterations in parallel or pipelined mode, with at most
+        "concurrency" iterations at once (no limit if 0)
+        The tick is the minimum delay between the starts of two iterations.
+        """
+        if self.pipeline:
+            self.pipeline.reset(first)
+        lock = Lock()
+        state = {'next': first, 'start': time(), 'done': set(),
+                 'recorded': first, 'result': True}
+        journal = self.thread.journal
+        def work():
+            while True:
+                # Get the next iteration and wait for its start time
+                with lock:
+                    index = state['next']
+                    if index >= self.iteration or not state['result'] or \
+                       self.stop_thread.is_set():
+                        return
+                    state['next'] += 1
+                    delay = state['start'] - time()
+                    state['start'] = max(state['start'], time()) + self.tick
+                if delay > 0:
+                    sleep(delay)
+                result = self.run_iteration(index)
+                if self.pipeline:
+                    self.pipeline.gates[index].finish()
+                with lock:
+                    if not result:
+                        # Stop the other iterations
+                        if state['result'] and not self.stop_thread.is_set():
+                            self.stop_thread.main_thread.set_failure(self)
+                            self.stop_thread.set()
+                        state['result'] = False
+                        continue
+                    # Record the completed iterations in order
+                    state['done'].add(index)
+                    while state['recorded'] in state['done']:
+                        state['recorded'] += 1
+                        if journal:
+                            journal.record_iteration(self.path,
+                                                     state['recorded'])
+        count = self.iteration - first
+        workers = [Thread(target=work, name=u"{}-{}".format(self.path, i+1))
+                   for i in range(min(self.concurrency or count, count))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return state['result'] and not self.stop_thread.is_set()
+
+class LoopExecution(SubsequenceExecution):
+    """
+    Class implementing a loop execution
+
+    The subsequence is compiled once and run again for each iteration.
+    The loop runs for a number of iterations (forever if 0) and, if a
+    predicate action is defined, while the predicate returns True.
+    """
+
+    def __init__(self, thread):
+        """
+        Initialize the execution with the parent thread
+        """
+        AbstractExecution.__init__(self, thread)
+        self.tick = self.block.properties.tick
+        self.iteration = self.block.properties.iteration
+        self.sequence_id = self.block.properties.sequence_id
+        self.predicate = None
+        if self.block.has_predicate():
+            self.predicate = create_action(self.block, iteration=1, tick=0.0)
+            self.predicate.set_predicate(True)
+        self.sequence = None
+        if self.block.subsequence:
+            self.sequence = RunableSequence(self.block.subsequence,
+                                            self.thread.stop_thread,
+                                            path=u"{}#1".format(self.path),
+                                            tag=thread.sequence.tag)
+
+    def get_sequences(self):
+        """
+        Return the runable subsequences of the execution
+        """
+        return [self.sequence] if self.sequence else []
+
+    @logdecorator
+    def execute(self):
+        """
+        Run the execution
+        """
+        journal = self.thread.journal
+        count = journal.get_iteration(self.path) if journal else 0
+        if count:
+            msg = u"Skip : {} ({} iterations)".format(self.sequence_id, count)
+            EVENT_RING.info(msg, self.log_dict)
+        while not self.iteration or count < self.iteration:
+            if self.stop_thread.is_set():
+                return False
+            if self.predicate and \
+               not self.run_predicate():
+                if self.stop_thread.is_set():
+                    return False
+                break
+            count += 1
+            msg = u"Call : {} (iteration {})".format(self.sequence_id, count)
+            EVENT_RING.info(msg, self.log_dict)
+            if self.sequence and \
+               not self.sequence.run(u"{}#{}".format(self.path, count),
+                                     Scope(self.thread.sequence.scope,
+                                           iteration=count)):
+                return False
+            if self.tick:
+                msg = 'Tick ({}s)'.format(self.tick)
+                EVENT_RING.info(msg, self.log_dict)
+                sleep(self.tick)
+            if journal:
+                journal.record_iteration(self.path, count)
+        msg = u"Done ({} iterations)".format(count)
+        EVENT_RING.info(msg, self.log_dict)
+        return True
+
+class ConditionalExecution(SubsequenceExecution):
+    """
+    Class implementing a conditional execution
+
+    The predicate action selects the subsequence to run: the main one if
+    it returns True, the else subsequence otherwise.
+    """
+
+    def __init__(self, thread):
+        """
+        Initialize the execution with the parent thread
+        """
+        AbstractExecution.__init__(self, thread)
+        self.predicate = None
+        if self.block.has_predicate():
+            self.predicate = create_action(self.block, iteration=1, tick=0.0)
+            self.predicate.set_predicate(True)
+        properties = self.block.properties
+        subsequences = [self.block.subsequence, self.block.else_subsequence]
+        self.branches = [(sequence_id, subsequence and
+                          RunableSequence(subsequence, self.thread.stop_thread,
+                                          path=u"{}#{}".format(self.path, i+1),
+                                          tag=thread.sequence.tag))
+                         for i, (sequence_id, subsequence) in
+                         enumerate(zip([properties.sequence_id,
+                                        properties.else_sequence_id],
+                                       subsequences))]
+
+    def get_sequences(self):
+        """
+        Return the runable subsequences of the execution
+        """
+        return [sequence for _, sequence in self.branches if sequence]
+
+    @logdecorator
+    def execute(self):
+        """
+        Run the execution
+        """
+        # Keep the choice made before an interruption (journal)
+        journal = self.thread.journal
+        choice = journal.get_choice(self.path) if journal else 0
+        if not choice:
+            result = bool(self.predicate) and self.run_predicate()
+            if self.stop_thread.is_set():
+                return False
+            choice = 1 if result else 2
+            if journal:
+                journal.record_choice(self.path, choice)
+        sequence_id, sequence = self.branches[choice-1]
+        if sequence is None:
+            msg = u"No subsequence to run"
+            EVENT_RING.info(msg, self.log_dict)
+            return True
+        msg = u"Call : {} ".format(sequence_id)
+        msg += u"(condition is {})".format(choice == 1)
+        EVENT_RING.info(msg, self.log_dict)
+        return sequence.run(u"{}#{}".format(self.path, choice),
+                            self.thread.sequence.scope)
+
+
+# Pipeline classes definition
+class Pipeline():
+    """
+    Class ordering the iterations of a pipelined macro
+
+    An iteration enters a block once the previous iteration has left it,
+    so that iteration k+1 runs the first stage while iteration k runs
+    the second one.
+    """
+
+    def __init__(self, count):
+        """
+        Initialize the pipeline for a number of iterations
+        """
+        self.condition = Condition(Lock())
+        self.gates = []
+        for index in range(count):
+            previous = self.gates[-1] if self.gates else None
+            self.gates.append(PipelineGate(self.condition, previous))
+
+    def reset(self, first=0):
+        """
+        Prepare the pipeline for a new execution
+        The iterations before the first one are considered finished.
+        """
+        with self.condition:
+            for index, gate in enumerate(self.gates):
+                gate.left = set()
+                gate.finished = index < first
+
+    def set(self):
+        """
+        Wake up the waiting iterations so they can check the stop mecanism
+        (stop mecanism starter interface)
+        """
+        with self.condition:
+            self.condition.notify_all()
+
+
+class PipelineGate():
+    """
+    Class to make an iteration of a pipelined macro wait for the previous one
+    """
+
+    def __init__(self, condition, previous=None):
+        """
+        Initialize the gate with the gate of the previous iteration
+        """
+        self.condition = condition
+        self.previous = previous
+        self.left = set()
+        self.finished = False
+
+    def enter(self, block_id, stop_thread):
+        """
+        Wait for the previous iteration to leave a block
+        Return False if the stop mecanism has been set while waiting
+        """
+        previous = self.previous
+        if previous is None:
+            return True
+        with self.condition:
+            while block_id not in previous.left and not previous.finished:
+                if stop_thread.is_set():
+                    return False
+                self.condition.wait()
+        return True
+
+    def leave(self, block_id):
+        """
+        Let the next iteration enter a block
+        """
+        with self.condition:
+            self.left.add(block_id)
+            self.condition.notify_all()
+
+    def finish(self):
+        """
+        Let the next iteration enter all the blocks
+        """
+        with self.condition:
+            self.finished = True
+            self.condition.notify_all()
+
 
 # SequenceThread class definition
 class SequenceThread(Thread):
@@ -299,7 +927,10 @@ class SequenceThread(Thread):
                   XBM.BRANCH    : BranchExecution,
                   XBM.TIMEINIT  : ResetTimeExecution,
                   XBM.WAIT      : WaitExecution,
-                  XBM.MACRO     : SubsequenceExecution}
+                  XBM.MACRO     : SubsequenceExecution,
+                  XBM.LOOP      : LoopExecution,
+                  XBM.IF        : ConditionalExecution,
+                  XBM.TRIGGER   : TriggerExecution}
 
     # Methods for thread creation
     def __init__(self, sequence, starter=None, first=None):
@@ -310,6 +941,7 @@ class SequenceThread(Thread):
         # Sequence attribute
         self.sequence = sequence
         self.stop_thread = sequence.stop_thread
+        self.journal = sequence.journal
         # Starter event and current block attributes
         self.is_complete = False
         if starter:
@@ -322,6 +954,16 @@ class SequenceThread(Thread):
         self.execution_chain = []
         self.return_value = None
 
+    def clone(self):
+        """
+        Return a new sequence thread sharing the execution chain,
+        so that a loaded sequence can run again
+        """
+        thread = SequenceThread(self.sequence, self.starter)
+        thread.execution_chain = self.execution_chain
+        thread.is_complete = True
+        return thread
+
     def build_execution(self):
         """
         Build the next execution block of the sequence thread
@@ -371,20 +1013,45 @@ class SequenceThread(Thread):
         if self.stop_thread.is_set():
             self.return_value = False
             return
+        # Warm-up of the next executions
+        lookahead = self.stop_thread.main_thread.lookahead
+        warmed = 0
         # Execution loop
-        for ex in self.execution_chain:
+        for index, ex in enumerate(self.execution_chain):
+            # Warm up the next executions
+            if lookahead:
+                pool = self.stop_thread.main_thread.get_pool()
+                first, last = max(warmed, index+1), index+1+lookahead
+                for next_ex in self.execution_chain[first:last]:
+                    next_ex.warm_up_async(pool)
+                warmed = max(warmed, last)
             # Forced stop case
             if self.stop_thread.is_set():
-                self.stop_thread.add_backup(self.sequence.backup)
+                self.stop_thread.add_backup(self.sequence.get_backup())
+                self.return_value = False
+                return
+            # Skip the executions completed before
+            if self.journal and ex.resume():
+                continue
+            # Wait for the previous iteration to leave the block (pipeline)
+            gate = self.sequence.gate
+            if gate and not gate.enter(ex.block.block_id, self.stop_thread):
+                self.stop_thread.add_backup(self.sequence.get_backup())
                 self.return_value = False
                 return
             # Loop execution
             res = ex.execute()
+            if gate:
+                gate.leave(ex.block.block_id)
+            # Checkpoint
+            if res and self.journal:
+                ex.checkpoint()
             # Result test
             if not res :
                 if not self.stop_thread.is_set():
+                    self.stop_thread.main_thread.set_failure(ex)
                     self.stop_thread.set()
-                self.stop_thread.add_backup(self.sequence.backup)
+                self.stop_thread.add_backup(self.sequence.get_backup())
                 self.return_value = False
                 return
         # Regular return
@@ -432,6 +1099,13 @@ class StopThread(Thread):
         """
         self.starters.append(starter)
 
+    def remove_starter(self, starter):
+        """
+        Remove a starter added by add_starter
+        """
+        if starter in self.starters:
+            self.starters.remove(starter)
+
     def add_backup(self, backup):
         """
         Add a backup to start when the stop mechanism is set
@@ -467,9 +1141,12 @@ class StopThread(Thread):
         Run the stop mechanism
         """
         # Logging
+        self.stop_time = time()
         LOGGER.info(None, extra=self.log_dict)
+        if self.main_thread.observers:
+            notify(self.main_thread.observers, self.log_dict, EVT.STOP)
         # Set all the starters
-        for starter in self.starters:
+        for starter in list(self.starters):
             starter.set()
         # Wait for the execution to finish
         self.main_thread.runable_sequence_finished.wait()
@@ -481,6 +1158,7 @@ class StopThread(Thread):
         backup_list = list(reversed(sorted(self.backup_list, key=key)))
         # Link the backup executions
         first_backup = prev_backup = backup_list[0]
+        first_backup.failover_time = self.stop_time
         for backup in backup_list[1:]:
             prev_backup.next_execution = backup
             prev_backup = backup
@@ -497,17 +1175,64 @@ class RootSequenceThread(Thread):
     Class to implement the root sequence and run it in a thread
     """
 
-    def __init__(self, xml_sequence, stop_thread_parent=None):
+    def __init__(self, xml_sequence, stop_thread_parent=None, journal=None,
+                 agents=None, lookahead=0, session=None, observers=None,
+                 scope=None):
         """
         Initialize the root sequence thread
+
+        :param xml_sequence: xml sequence to run
+        :param stop_thread_parent: stop mecanism of the parent sequence
+        :param journal: ExecutionJournal used to checkpoint the execution
+        :param agents: AgentPool running the remote macros
+        :param lookahead: number of actions warmed up ahead of each thread
+        :param session: EngineSession keeping the actions across the runs
+        :param observers: list of the observers of the execution
+        :param scope: Scope of the sequence (arguments of a remote macro)
         """
         Thread.__init__(self)
         # Init attributes
         self.xml_sequence = xml_sequence
+        self.scope = scope
         self.backup_root_threads = []
         self.next_execution = None
+        self.failover_time = None
+        self.warm_up_thread = None
+        self.lookahead = lookahead
+        self.pool = None
+        self.pool_lock = Lock()
+        self.journal = journal
+        self.failure = None
+        self.prewarmed = []
+        if agents is None and stop_thread_parent:
+            agents = stop_thread_parent.main_thread.agents
+        self.agents = agents
+        # The backups share the observers of the root
+        if stop_thread_parent:
+            observers = stop_thread_parent.main_thread.observers
+        elif observers is None:
+            observers = []
+        self.observers = observers
+        self.finished_callbacks = []
+        if stop_thread_parent:
+            session = stop_thread_parent.main_thread.session
+            self.backup_level = stop_thread_parent.main_thread.backup_level + 1
+        else:
+            self.backup_level = 0
+        self.session = session
+        self.owns_resources = stop_thread_parent is None
+        if stop_thread_parent:
+            self.resources = stop_thread_parent.main_thread.resources
+            self.blackboard = stop_thread_parent.main_thread.blackboard
+        else:
+            self.resources = ResourceManager(xml_sequence)
+            self.blackboard = Blackboard()
+        self.return_value = None
         # Stop thread
         self.stop_thread = StopThread(self)
+        self.stop_thread.add_starter(self.resources)
+        self.stop_thread.add_starter(self.blackboard)
+        self.stop_thread.add_starter(ACTION_CACHE)
         if stop_thread_parent:
             stop_thread_parent.add_child(self.stop_thread)
         # Create the sequence
@@ -519,17 +1244,126 @@ class RootSequenceThread(Thread):
         """
         Run the root sequence
         """
+        # Forward the execution log records while running
+        LOGGING_ADAPTER.open()
+        # Wait for the warm-up and measure the failover latency (backup)
+        if self.warm_up_thread:
+            self.warm_up_thread.join()
+        if self.failover_time is not None:
+            msg = u"Failover latency : {:.1f} ms"
+            msg = msg.format((time() - self.failover_time) * 1000)
+            LOGGER.info(msg, extra=self.stop_thread.log_dict)
+        if self.backup_level and self.observers:
+            log_dict = dict(self.stop_thread.log_dict, ID='Backup')
+            notify(self.observers, log_dict, EVT.BACKUP_START)
         # Run the runable sequence
+        if self.journal:
+            self.journal.open()
+        cache_counters = ACTION_CACHE.get_counters()
         self.stop_thread.enable()
-        self.runable_sequence.run()
+        self.return_value = self.runable_sequence.run(scope=self.scope)
         self.stop_thread.disable()
+        if self.pool:
+            self.pool.terminate()
+        # Keep the journal unless the execution succeeded
+        if self.journal:
+            self.journal.close(discard=self.return_value)
         # Wait for the stop mecanism to finish
         self.runable_sequence_finished.set()
         if self.stop_thread.is_alive():
             self.stop_thread.join()
+        # Close the actions warmed up for the backups which have not run
+        self.discard_prewarmed()
+        # Report the resource usage
+        if self.owns_resources:
+            log_dict = {'sequenceID': self.xml_sequence.sequence_id,
+                        'ID':         'Resources',
+                        'level':      self.xml_sequence.level,
+                        'type':       'RESOURCE'}
+            self.resources.log_statistics(log_dict)
+            self.log_cache_statistics(cache_counters)
+        LOGGING_ADAPTER.close()
         # Launch the next execution
         if self.next_execution:
             self.next_execution.start()
+        # Notify the end of the execution
+        for callback in self.finished_callbacks:
+            callback(self)
+
+    def log_cache_statistics(self, counters):
+        """
+        Log the cache hits and misses since the given counters
+        """
+        log_dict = {'sequenceID': self.xml_sequence.sequence_id,
+                    'ID':         'Cache',
+                    'level':      self.xml_sequence.level,
+                    'type':       'CACHE'}
+        ACTION_CACHE.log_statistics(log_dict, counters)
+
+    def prewarm(self):
+        """
+        Run the PreRun of all the actions in the background
+        """
+        self.warm_up_thread = Thread(target=self.warm_up, name="WarmUp")
+        self.warm_up_thread.daemon = True
+        self.warm_up_thread.start()
+
+    def warm_up(self, workers=1):
+        """
+        Run the PreRun of all the actions, concurrently if several workers
+        are given
+        Return the list of the executions which warm-up failed.
+        """
+        executions = [execution for execution
+                      in self.runable_sequence.get_executions()
+                      if isinstance(execution, ActionExecution)]
+        if workers > 1 and len(executions) > 1:
+            pool = ThreadPool(min(workers, len(executions)))
+            try:
+                results = pool.map(ActionExecution.warm_up, executions)
+            finally:
+                pool.terminate()
+        else:
+            results = [execution.warm_up() for execution in executions]
+        return [execution for execution, result in zip(executions, results)
+                if not result]
+
+    def discard_warm_up(self):
+        """
+        Discard the warm-up of the actions of a backup which has not run
+        (the actions are closed unless they belong to a session)
+        """
+        if self.warm_up_thread:
+            self.warm_up_thread.join()
+        for execution in self.runable_sequence.get_executions():
+            if isinstance(execution, ActionExecution):
+                execution.action.skip()
+        self.discard_prewarmed()
+
+    def discard_prewarmed(self):
+        """
+        Discard the warm-up of the prewarmed backups which have not run
+        """
+        for backup in self.prewarmed:
+            if backup.ident is None:
+                backup.discard_warm_up()
+
+    def get_pool(self):
+        """
+        Return the thread pool warming up the actions ahead of time
+        """
+        with self.pool_lock:
+            if self.pool is None:
+                self.pool = ThreadPool(WARM_UP_WORKERS)
+            return self.pool
+
+    def set_failure(self, execution):
+        """
+        Record the first failing execution as a (sequence ID, block ID) tuple
+        """
+        if self.failure is None:
+            self.failure = (execution.log_dict['sequenceID'],
+                            execution.block.block_id)
 
     def stop(self):
         """
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+""" Module for keeping the actions alive across several executions """
+
+#-------------------------------------------------------------------------------
+# Name:        Session
+# Purpose:     Reuse the action instances over repeated runs of a sequence
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+#-------------------------------------------------------------------------------
+
+
+# Imports
+from threading import Lock
+
+# Imports from sequence
+from sequence.action.abstract import create_action
+
+
+# Engine session class definition
+class EngineSession():
+    """
+    Class keeping the action instances alive across the runs of a sequence
+
+    The resources opened in the Setup method of the actions (device
+    proxies, file handles, compiled data) are kept until the session is
+    closed, where the Teardown method is called. The actions are
+    identified by their path in the execution, and recreated if their
+    module or parameters changed. A session serves one run at a time.
+    """
+
+    def __init__(self):
+        """
+        Initialize the session
+        """
+        self.actions = {}
+        self.lock = Lock()
+        self.created = 0
+        self.reused = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_action(self, xml_block, key):
+        """
+        Return the action of a block, reusing the instance of a
+        previous run if it is equivalent
+
+        :param xml_block: XMLBlock -- the action block
+        :param key: hashable -- unique identifier of the block execution
+        """
+        action = create_action(xml_block)
+        with self.lock:
+            previous = self.actions.get(key)
+            if previous is not None and previous.is_equivalent(action):
+                previous.reset()
+                self.reused += 1
+                return previous
+            self.actions[key] = action
+            self.created += 1
+        if previous is not None:
+            previous.close()
+        action.set_persistent(True)
+        return action
+
+    def close(self):
+        """
+        Close the session and tear down the actions
+        """
+        with self.lock:
+            actions = self.actions.values()
+            self.actions = {}
+        for action in actions:
+            action.close()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+""" Main module for the worker agent """
+
+# ------------------------------------------------------------------------------
+# Name:        SequenceAgent
+# Purpose:     Run the subsequences dispatched by a sequence engine
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+# ------------------------------------------------------------------------------
+
+# Imports
+import sys
+from optparse import OptionParser
+from sequence.action.abstract import patch_action_package
+from sequence.core.engine import stream_sequence_logs
+from sequence.core.agent import create_agent_server
+
+
+# Command line execution
+def main():
+    """  Main function for the worker agent """
+    # Parse arguments
+    address, debug_level, paths = parse_command_line_args()
+    # Create Log Handler
+    if debug_level:
+        stream_sequence_logs(sys.stdout, debug_level)
+    # Patch actions
+    patch_action_package(paths)
+    # Serve
+    server = create_agent_server(address)
+    print("AGENT LISTENING : {}".format(address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("AGENT STOPPED")
+    finally:
+        server.server_close()
+
+
+# Parse command line
+def parse_command_line_args():
+    """ Parse arguments given in command line """
+    usage = "%prog [options] address"
+    desc = "Run the subsequences dispatched to the given address "
+    desc += "(host:port or unix socket path)"
+    parser = OptionParser(usage=usage, description=desc, version='%prog v1.0')
+
+    msg = "Level of the logging messages (from 1 for debug to 5 for critical)"
+    parser.add_option('-l', '--log', metavar='LVL',
+                      type='int', help=msg, default=0)
+
+    msg = "Directory of user-defined actions (can be repeated)"
+    parser.add_option('-p', '--path', metavar='DIR', action='append',
+                      type='str', help=msg, default=[])
+
+    options, args = parser.parse_args()
+
+    if len(args) != 1:
+        parser.error("incorrect number of arguments")
+
+    if options.log not in range(0, 5):
+        parser.error("invalid value for logging level")
+
+    return args[0], options.log*10, options.path
+
+
+# Main execution
+if __name__ == '__main__':
+    main()
@@ -15,21 +15,45 @@
 
 # Imports
 import sys
+import json
+from time import time
+from Queue import Queue, Empty
+from threading import Thread, Lock, Event
 from optparse import OptionParser
+from sequence.common.parser import parse_sequence_file
+from sequence.common.optimizer import optimize_sequence
 from sequence.core.engine import SequenceEngine, stream_sequence_logs
+from sequence.core.session import EngineSession
 
 
 # Command line execution
 def main():
     """  Main function for console execution """
     # Parse arguments
-    file_name, depth, backup, debug_level = parse_command_line_args()
+    options, file_names = parse_command_line_args()
+    # Batch mode
+    if options.batch:
+        stream_sequence_logs(sys.stderr, options.log*10)
+        return batch(file_names, options.depth, options.back, options.agent,
+                     options.repeat, options.jobs, options.warm_up,
+                     options.lookahead, options.session, options.optimize,
+                     options.compiled)
     # Create Log Handler
-    stream_sequence_logs(sys.stdout, debug_level)
+    stream_sequence_logs(sys.stdout, options.log*10)
+    interactive(file_names[0], options.depth, options.back,
+                options.journal, options.resume, options.agent,
+                options.warm_up, options.lookahead, options.optimize,
+                options.compiled)
+
+
+def interactive(file_name, depth, backup, journal, resume, agents,
+                warm_up=False, lookahead=0, optimize=False, compiled=False):
+    """ Load a sequence and run it on user request """
     # Load sequence
     engine = SequenceEngine()
     try:
-        engine.load(file_name, depth, backup)
+        engine.load(file_name, depth, backup, journal, resume, agents,
+                    warm_up, lookahead, optimize=optimize, compiled=compiled)
     except Exception as exc:
         print(exc)
         return
@@ -40,22 +64,172 @@ def main():
         res = 'a'
     if res.lower() == 'r':
         print("RUN")
-        engine.start()
-        boolean = False
-        while not boolean:
+        handle = engine.start()
+        # The timeout lets the interpreter handle the keyboard interrupts
+        while True:
             try:
-                boolean = engine.wait(1)
+                if handle.wait(1):
+                    break
             except KeyboardInterrupt:
                 print("USER STOP")
                 engine.interrupt()
+        engine.wait()
         print("FINISHED")
 
 
+# Batch execution
+def batch(file_names, depth, backup, agents, repeat=1, jobs=1,
+          warm_up=False, lookahead=0, session=False, optimize=False,
+          compiled=False):
+    """
+    Run the sequences without user interaction and print a JSON summary
+    line per run on the standard output
+
+    Each file is parsed (and optimized) once and the parsed sequence is
+    reused for all its runs. With a session, each worker keeps the actions
+    alive across its runs. Return 0 if all the runs succeeded, 1 if a run
+    failed or was stopped and 2 if a file could not be loaded.
+    """
+    output_lock = Lock()
+    def output(summary):
+        with output_lock:
+            sys.stdout.write(json.dumps(summary) + '\n')
+            sys.stdout.flush()
+    # Parse the sequences
+    code = 0
+    runs = Queue()
+    for file_name in file_names:
+        try:
+            xml_sequence = parse_sequence_file(file_name, depth, backup)
+        except Exception as exc:
+            output({'file': file_name, 'status': 'ERROR',
+                    'message': unicode(exc)})
+            code = 2
+            continue
+        if optimize:
+            optimize_sequence(xml_sequence).log()
+        for index in range(repeat):
+            runs.put((file_name, xml_sequence, index))
+    # Run the sequences
+    runner = BatchRunner(runs, output, agents, warm_up, lookahead, session,
+                         compiled)
+    workers = [Thread(target=runner.work, name="BatchWorker{}".format(i))
+               for i in range(max(1, jobs))]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    for worker in workers:
+        while worker.is_alive():
+            try:
+                worker.join(1)
+            except KeyboardInterrupt:
+                print >> sys.stderr, "USER STOP"
+                runner.interrupt()
+    if code == 0 and runner.failed:
+        code = 1
+    return code
+
+
+# Batch runner class definition
+class BatchRunner():
+    """
+    Class to run the queued sequences from several worker threads
+    """
+
+    def __init__(self, runs, output, agents=None, warm_up=False, lookahead=0,
+                 session=False, compiled=False):
+        """
+        Initialize the runner with the queue of runs to process
+        """
+        self.runs = runs
+        self.output = output
+        self.agents = agents
+        self.warm_up = warm_up
+        self.lookahead = lookahead
+        self.session = session
+        self.compiled = compiled
+        self.failed = False
+        self.engines = set()
+        self.lock = Lock()
+        self.interrupted = Event()
+
+    def interrupt(self):
+        """
+        Interrupt the running sequences and cancel the queued ones
+        """
+        with self.lock:
+            self.interrupted.set()
+            for engine in self.engines:
+                engine.interrupt()
+
+    def work(self):
+        """
+        Process the runs until the queue is empty or the runner interrupted
+        """
+        session = EngineSession() if self.session else None
+        try:
+            while not self.interrupted.is_set():
+                try:
+                    file_name, xml_sequence, index = self.runs.get_nowait()
+                except Empty:
+                    return
+                summary = self.run(xml_sequence, session)
+                summary.update(file=file_name, run=index)
+                if summary['status'] != 'OK':
+                    self.failed = True
+                self.output(summary)
+        finally:
+            if session:
+                session.close()
+
+    def run(self, xml_sequence, session=None):
+        """
+        Run a parsed sequence and return its summary
+        """
+        engine = SequenceEngine()
+        try:
+            engine.load_sequence(xml_sequence, agents=self.agents,
+                                 warm_up=self.warm_up,
+                                 lookahead=self.lookahead, session=session,
+                                 compiled=self.compiled)
+        except Exception as exc:
+            return {'sequence_id': xml_sequence.sequence_id,
+                    'status': 'ERROR', 'message': unicode(exc)}
+        root = engine.sequence
+        with self.lock:
+            if self.interrupted.is_set():
+                engine.interrupt()
+                return {'sequence_id': xml_sequence.sequence_id,
+                        'status': 'STOPPED', 'duration': 0.,
+                        'failing_block': None}
+            self.engines.add(engine)
+            start = time()
+            engine.start()
+        try:
+            engine.wait()
+        finally:
+            with self.lock:
+                self.engines.discard(engine)
+        if self.interrupted.is_set():
+            status = 'STOPPED'
+        else:
+            status = 'OK' if root.return_value else 'KO'
+        failing_block = None
+        if root.failure is not None:
+            failing_block = '/'.join(root.failure)
+        return {'sequence_id': xml_sequence.sequence_id,
+                'status': status,
+                'duration': round(time() - start, 3),
+                'failing_block': failing_block}
+
+
 # Parse command line
 def parse_command_line_args():
     """ Parse arguments given in command line """
-    usage = "%prog [options] file_name"
-    desc = "Load and run the xml sequence given by the file-name parameter"
+    usage = "%prog [options] file_name\n       %prog -B [options] file_name..."
+    desc = "Load and run the xml sequence given by the file-name parameter. "
+    desc += "In batch mode, run the sequences without interaction and print "
+    desc += "a JSON summary line per run."
     parser = OptionParser(usage=usage, description=desc, version='%prog v1.0')
 
     msg = "Define the maximum backup depth"
@@ -70,22 +244,76 @@ def parse_command_line_args():
     parser.add_option('-l', '--log', metavar='LVL',
                       type='int', help=msg, default=2)
 
+    msg = "File name of the journal used to checkpoint the execution"
+    parser.add_option('-j', '--journal', metavar='FILE',
+                      type='str', help=msg)
+
+    msg = "Resume an interrupted execution from its journal"
+    parser.add_option('-r', '--resume', action='store_true',
+                      help=msg, default=False)
+
+    msg = "Address (host:port or socket path) of a worker agent"
+    msg += " running the remote macros (can be repeated)"
+    parser.add_option('-a', '--agent', metavar='ADDR', action='append',
+                      type='str', help=msg, default=[])
+
+    msg = "Run the PreRun of all the actions concurrently at load"
+    parser.add_option('-w', '--warm-up', action='store_true',
+                      help=msg, default=False)
+
+    msg = "Number of actions which PreRun is run ahead of each thread"
+    parser.add_option('-k', '--lookahead', metavar='K',
+                      type='int', help=msg, default=0)
+
+    msg = "Keep the actions alive across the runs of each batch worker"
+    parser.add_option('-S', '--session', action='store_true',
+                      help=msg, default=False)
+
+    msg = "Inline the trivial macros, merge the waits and prune the blocks"
+    msg += " before the execution"
+    parser.add_option('-O', '--optimize', action='store_true',
+                      help=msg, default=False)
+
+    msg = "Run the sequences as compiled python modules when possible"
+    parser.add_option('-C', '--compiled', action='store_true',
+                      help=msg, default=False)
+
+    msg = "Batch mode: run the sequences without user interaction"
+    parser.add_option('-B', '--batch', action='store_true',
+                      help=msg, default=False)
+
+    msg = "Number of runs of each sequence in batch mode"
+    parser.add_option('-n', '--repeat', metavar='N',
+                      type='int', help=msg, default=1)
+
+    msg = "Number of sequences running in parallel in batch mode"
+    parser.add_option('-J', '--jobs', metavar='K',
+                      type='int', help=msg, default=1)
+
     options, args = parser.parse_args()
 
     if len(args) == 0:
         parser.print_help()
         parser.exit()
 
-    if len(args) > 1:
+    if len(args) > 1 and not options.batch:
         parser.error("incorrect number of arguments")
 
+    if options.batch and (options.journal or options.resume):
+        parser.error("journal options are not available in batch mode")
+
+    if options.session and not options.batch:
+        parser.error("sessions are only available in batch mode")
+
+    if options.repeat < 1 or options.jobs < 1 or options.lookahead < 0:
+        parser.error("invalid value for repeat count, jobs or lookahead")
+
     if options.log not in range(1, 5):
         parser.error("invalid value for logging level")
 
-    res = args[0], options.depth, options.back, options.log*10
-    return res
+    return options, args
 
 
 # Main execution
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
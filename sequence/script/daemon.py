@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+""" Main module for the headless execution daemon """
+
+# ------------------------------------------------------------------------------
+# Name:        SequenceDaemon
+# Purpose:     Serve or send requests to a sequence execution daemon
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+# ------------------------------------------------------------------------------
+
+# Imports
+import os
+import sys
+import json
+from optparse import OptionParser
+from sequence.action.abstract import patch_action_package
+from sequence.core.engine import stream_sequence_logs
+
+
+# Commands
+COMMANDS = ['serve', 'load', 'start', 'run', 'stop', 'status']
+
+
+# Command line execution
+def main():
+    """  Main function for the daemon and its client """
+    # Parse arguments
+    address, command, file_name, debug_level, paths, fork = \
+        parse_command_line_args()
+    # Create Log Handler
+    if debug_level:
+        stream_sequence_logs(sys.stdout, debug_level)
+    # Serve
+    if command == 'serve':
+        return serve(address, paths, fork)
+    # Send requests
+    from sequence.core.daemon import DaemonClient
+    try:
+        client = DaemonClient(address)
+    except Exception as exc:
+        print(exc)
+        return 2
+    try:
+        return request(client, command, file_name)
+    except KeyboardInterrupt:
+        client.stop()
+        return 1
+    finally:
+        client.close()
+
+
+def serve(address, paths, fork=False):
+    """ Serve the daemon requests """
+    patch_action_package(paths)
+    from sequence.core.daemon import SequenceDaemon
+    daemon = SequenceDaemon(address, fork)
+    print("DAEMON LISTENING : {}".format(address))
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        print("DAEMON STOPPED")
+    return 0
+
+
+def request(client, command, file_name):
+    """ Send the requests corresponding to a command """
+    if command in ('load', 'run'):
+        reply = client.load(file_name)
+        print(json.dumps(reply))
+        if reply['type'] == 'error':
+            return 2
+    if command in ('start', 'run'):
+        reply = client.start(watch=command == 'run')
+        print(json.dumps(reply))
+        if reply['type'] == 'error':
+            return 2
+    if command == 'run':
+        result = client.wait()
+        print(json.dumps({'type': 'finished', 'result': result}))
+        return 0 if result else 1
+    if command == 'stop':
+        reply = client.stop()
+        print(json.dumps(reply))
+        if reply['type'] == 'error':
+            return 2
+    if command == 'status':
+        print(json.dumps(client.status()))
+    return 0
+
+
+# Parse command line
+def parse_command_line_args():
+    """ Parse arguments given in command line """
+    usage = "%prog [options] address {} [file_name]".format("|".join(COMMANDS))
+    desc = "Serve a sequence daemon on the given address (host:port or "
+    desc += "unix socket path), or send it a request"
+    parser = OptionParser(usage=usage, description=desc, version='%prog v1.0')
+
+    msg = "Level of the logging messages (from 1 for debug to 5 for critical)"
+    parser.add_option('-l', '--log', metavar='LVL',
+                      type='int', help=msg, default=0)
+
+    msg = "Directory of user-defined actions (can be repeated)"
+    parser.add_option('-p', '--path', metavar='DIR', action='append',
+                      type='str', help=msg, default=[])
+
+    msg = "Run each execution in a process forked from the daemon"
+    parser.add_option('-f', '--fork', action='store_true',
+                      help=msg, default=False)
+
+    options, args = parser.parse_args()
+
+    if len(args) < 2 or args[1] not in COMMANDS:
+        parser.error("incorrect arguments")
+
+    file_name = None
+    if args[1] in ('load', 'run'):
+        if len(args) != 3:
+            parser.error("a file name is required")
+        file_name = args[2]
+    elif len(args) != 2:
+        parser.error("incorrect number of arguments")
+
+    if options.log not in range(0, 5):
+        parser.error("invalid value for logging level")
+
+    if options.fork and not hasattr(os, 'fork'):
+        parser.error("fork mode is not available on this platform")
+
+    return (args[0], args[1], file_name, options.log*10, options.path,
+            options.fork)
+
+
+# Main execution
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+""" Main module for sequence duration estimation """
+
+# ------------------------------------------------------------------------------
+# Name:        SequenceEstimate
+# Purpose:     Estimate the duration of xml sequences
+#
+# Author:      michel.vincent
+#
+# Created:     18/10/2026
+# Copyright:   (c) michel.vincent 2026
+# Licence:     GPL
+# ------------------------------------------------------------------------------
+
+# Imports
+import sys
+from optparse import OptionParser
+from sequence.common.parser import parse_sequence_file
+from sequence.common.estimate import (estimate_sequence, load_history,
+                                      format_duration)
+
+
+# Command line execution
+def main():
+    """  Main function for console estimation """
+    # Parse arguments
+    file_name, depth, history_file = parse_command_line_args()
+    # Load sequence and history
+    try:
+        xml_sequence = parse_sequence_file(file_name, depth)
+        history = load_history(history_file) if history_file else None
+    except Exception as exc:
+        print(exc)
+        return 1
+    # Estimate
+    estimate = estimate_sequence(xml_sequence, history)
+    print(u"ESTIMATED DURATION : {}".format(format_duration(estimate.duration)))
+    print(u"CRITICAL PATH :")
+    for line in estimate.format(2):
+        print(line)
+    return 0
+
+
+# Parse command line
+def parse_command_line_args():
+    """ Parse arguments given in command line """
+    usage = "%prog [options] file_name"
+    desc = "Estimate the duration and the critical path of the xml sequence"
+    parser = OptionParser(usage=usage, description=desc, version='%prog v1.0')
+
+    msg = "Define the maximum backup depth"
+    parser.add_option('-d', '--depth', metavar='DEP',
+                      type='int', help=msg)
+
+    msg = "JSON file of historical durations per action module"
+    parser.add_option('-H', '--history', metavar='FILE',
+                      type='str', help=msg)
+
+    options, args = parser.parse_args()
+
+    if len(args) == 0:
+        parser.print_help()
+        parser.exit()
+
+    if len(args) > 1:
+        parser.error("incorrect number of arguments")
+
+    return args[0], options.depth, options.history
+
+
+# Main execution
+if __name__ == '__main__':
+    sys.exit(main())
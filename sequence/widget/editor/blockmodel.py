@@ -33,7 +33,7 @@ class BlockModel(QtGui.QStandardItemModel):
         """ Inner class to represent a property """
         def __init__(self, v, key):
             self.datatype = type(v)
-            self.is_sequence_id = (key == XSA.SEQUENCEID)
+            self.is_sequence_id = key in (XSA.SEQUENCEID, XSA.ELSE)
             QtGui.QStandardItem.__init__(self, unicode(v))
 
     def __init__ (self, editor, block=None, parent=None):
@@ -20,7 +20,6 @@ import sys
 import types
 from PyQt4 import QtGui, QtCore
 from functools import partial
-import logging
 
 # Widget imports
 from sequence.widget.editor.item import SequenceItem
@@ -33,22 +32,7 @@ from sequence.resource.pyqt.editor_ui import Ui_PySequenceEditor
 from sequence.action.abstract import get_action_list
 from sequence.common.constant import XBM, IMAGES_DIR
 from sequence.common.parser import parse_sequence_file, XMLSequence
-from sequence.core.engine import add_log_handler
-
-
-# Signal Handler class definition
-class SignalHandler(QtCore.QObject):
-    """
-    Class to bind PyQtSignal and the logging module
-    """
-    signal = QtCore.pyqtSignal(logging.LogRecord)
-
-    def __init__(self, level=logging.DEBUG, *args, **kwargs):
-        super(SignalHandler, self).__init__(*args, **kwargs)
-        self.level = level
-
-    def handle(self, log_record):
-        self.signal.emit(log_record)
+from sequence.common.builder import SequenceBuilder
 
 
 # EditorWidget Class Definition
@@ -106,9 +90,12 @@ class EditorWidget(QtGui.QWidget):
         self.block_mapping = {"Begin/End":   {'Begin':  XBM.BEGIN,
                                               'End'  :  XBM.END},
                               "Time":        {'Init':   XBM.TIMEINIT,
-                                              'Wait':   XBM.WAIT},
+                                              'Wait':   XBM.WAIT,
+                                              'Trigger': XBM.TRIGGER},
                               "Branch":      {'Branch': XBM.BRANCH},
-                              "Subsequence": {'Macro':  XBM.MACRO}}
+                              "Subsequence": {'Macro':  XBM.MACRO},
+                              "Control":     {'Loop':   XBM.LOOP,
+                                              'If':     XBM.IF}}
         action_list = get_action_list()
         self.module_to_name = {module: name for name, module in action_list}
         for name, module in action_list:
@@ -154,26 +141,20 @@ class EditorWidget(QtGui.QWidget):
         # Logging
         self.log(u'Sequence editor initialized.')
 
+        # Execution states
+        self.control_widget.block_progress.connect(self.set_block_state)
 
-        self.signal_handler = SignalHandler(logging.DEBUG)
-        self.signal_handler.signal.connect(self.handle_log_record)
-        add_log_handler(self.signal_handler)
 
-
-    def handle_log_record(self, log_record):
+    def set_block_state(self, sequence_id, block_id, bes):
         """
-        Handle log record from the logging module
+        Display the execution state of a block
         """
-        if log_record.levelno != logging.DEBUG:
-            return
         sub_editor = self.ui.subsequence_editor
         flags = QtCore.Qt.MatchContains | QtCore.Qt.MatchRecursive
-        seq_item = sub_editor.findItems(u"{}".format(log_record.sequenceID),
+        seq_item = sub_editor.findItems(u"{}".format(sequence_id),
                                         flags)[0]
         if not seq_item:
             return
-        block_id = log_record.ID
-        bes = log_record.msg
         for block in seq_item.scene.block_list:
             if block.xml_block.block_id == block_id:
                 block.set_execution_state(bes)
@@ -224,14 +205,17 @@ class EditorWidget(QtGui.QWidget):
     ##### File handling signals #####
 
     def on_path_requested(self):
-        if self.changed:
-            msg = "Source not saved \nSave before loading?"
-            res = QtGui.QMessageBox.question(self, 'Save before loading', msg,
-                                            QtGui.QMessageBox.Yes,
-                                            QtGui.QMessageBox.Cancel)
-            if res == QtGui.QMessageBox.Cancel or not self.on_save():
-                return
-        self.control_widget.load(self.file_path)
+        """
+        Load a snapshot of the edited sequence, without saving it
+        (the sequence can be edited during the execution)
+        """
+        try:
+            builder = SequenceBuilder.from_sequence(self.current_sequence)
+            snapshot = builder.build()
+        except StandardError as error:
+            self.log(u'ERROR : ' + unicode(error))
+            return
+        self.control_widget.load_sequence(snapshot)
 
         sub_editor = self.ui.subsequence_editor
         flags = QtCore.Qt.MatchContains | QtCore.Qt.MatchRecursive
@@ -21,6 +21,7 @@ from PyQt4 import QtGui, QtCore
 # Imports from sequence
 from sequence.resource.pyqt import control_icons_rc
 from sequence.core.engine import SequenceEngine
+from sequence.common.estimate import estimate_sequence, format_duration
 
 
 # MainWidget Class Definition
@@ -34,6 +35,8 @@ class ControlWidget(QtGui.QWidget):
     log_signal = QtCore.pyqtSignal([unicode, unicode])
     execution_started = QtCore.pyqtSignal()
     execution_finished = QtCore.pyqtSignal()
+    block_progress = QtCore.pyqtSignal([unicode, unicode, unicode])
+    engine_finished = QtCore.pyqtSignal()
 
     def __init__(self, *args, **kwargs):
         # Init widget
@@ -73,6 +76,13 @@ class ControlWidget(QtGui.QWidget):
         self.enabled = False
         self.file_path = ""
         self.path_request_enabled = False
+        self.handle = None
+        # Print dots while the engine is running
+        self.dot_timer = QtCore.QTimer(self)
+        self.dot_timer.setInterval(500)
+        self.dot_timer.timeout.connect(lambda: self.log(".", end=""))
+        # Queued from the execution thread
+        self.engine_finished.connect(self.on_finished)
         self.disable()
 
     #### Base methods ####
@@ -161,8 +171,28 @@ class ControlWidget(QtGui.QWidget):
         except StandardError as error:
             self.log(u'ERROR : '+ unicode(error))
             return
-        sequence_id = self.engine.sequence.xml_sequence.sequence_id
-        self.log(u'SEQUENCE LOADED : {}'.format(sequence_id))
+        self.set_loaded()
+
+    def load_sequence(self, xml_sequence):
+        """
+        Load a sequence already parsed or built for execution
+        """
+        self.log(u'LOAD : {}'.format(xml_sequence.sequence_id))
+        try :
+            self.engine.load_sequence(xml_sequence)
+        except StandardError as error:
+            self.log(u'ERROR : '+ unicode(error))
+            return
+        self.set_loaded()
+
+    def set_loaded(self):
+        """
+        Log the loaded sequence and update the buttons
+        """
+        xml_sequence = self.engine.sequence.xml_sequence
+        self.log(u'SEQUENCE LOADED : {}'.format(xml_sequence.sequence_id))
+        duration = estimate_sequence(xml_sequence).duration
+        self.log(u'ESTIMATED DURATION : {}'.format(format_duration(duration)))
         # Set the buttons status
         self.load_button.setEnabled(False)
         self.run_button.setEnabled(True)
@@ -174,33 +204,6 @@ class ControlWidget(QtGui.QWidget):
         """
         self.log_signal.emit(unicode(msg), unicode(end))
 
-    #### Sequence Engine Handling ####
-
-    class EngineRunner(QtCore.QThread):
-        """
-        Thread to handle the sequence engine while it's running
-        """
-        def run(self):
-            """
-            Wait for the sequence execution to terminate
-            """
-            engine = self.parent().engine
-            engine.start()
-            engine.wait()
-
-    class EngineLogger(QtCore.QThread):
-        """
-        Thread to print dots while the engine is running
-        """
-        def run(self):
-            """
-            Print dots every half of a second
-            """
-            tick = 500
-            while self.parent().run_thread.isRunning():
-                self.parent().log(".", end="")
-                self.msleep(tick)
-
     #### Signals target ####
 
     def on_load(self):
@@ -226,14 +229,14 @@ class ControlWidget(QtGui.QWidget):
             self.load_button.setEnabled(False)
             self.run_button.setEnabled(False)
             self.stop_button.setEnabled(True)
-            # Start the engine handler thread
+            # Start the engine, the signals are emitted by its threads
             self.log("RUN")
             self.log(".", end="")
             self.execution_started.emit()
-            self.run_thread = self.EngineRunner(self, finished=self.on_finished)
-            self.run_thread.start()
-            self.log_thread = self.EngineLogger(self)
-            self.log_thread.start()
+            self.dot_timer.start()
+            self.handle = self.engine.start(self.block_progress.emit)
+            self.handle.add_done_callback(
+                lambda handle: self.engine_finished.emit())
 
     def on_stop(self):
         """
@@ -260,7 +263,9 @@ class ControlWidget(QtGui.QWidget):
         """
         Update the main widget since the execution is over
         """
-        self.log_thread.wait()
+        self.dot_timer.stop()
+        self.engine.wait()
+        self.handle = None
         self.log('.')
         self.log('FINISHED')
         self.execution_finished.emit()
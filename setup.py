@@ -62,7 +62,10 @@ setup(
     cmdclass={'upload_gh_pages': UploadGhPages},
     entry_points={
         'console_scripts': [
-            'sequence-console = sequence.console:main'],
+            'sequence-console = sequence.console:main',
+            'sequence-estimate = sequence.estimate:main',
+            'sequence-agent = sequence.agent:main',
+            'sequence-daemon = sequence.daemon:main'],
         'gui_scripts': [
             'sequence-runner = sequence.runner:main',
             'sequence-editor = sequence.editor:main']},